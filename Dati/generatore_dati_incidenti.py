@@ -1,6 +1,22 @@
-import pandas as pd
-import random
-from datetime import datetime, timedelta
+import argparse
+import gzip
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+# The shared vectorized generator lives in the project root, one level above this script.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generatore_incidenti import genera_incidenti
+
+# Rows generated and written at a time inside a shard: memory stays constant whatever the total.
+CHUNK_ROWS = 1_000_000
+# Categories written by the interactive mode, as in the original generator (and in the CSV files already in Dati/)
+INTERACTIVE_PROVINCES = ['Milano', 'Roma', 'Napoli', 'Torino', 'Firenze', 'Bologna', 'Genova', 'Bari']
+INTERACTIVE_ROAD_TYPES = ['Urban', 'State', 'Highway']
+FORMATS = {'csv': '.csv', 'csv.gz': '.csv.gz', 'parquet': '.parquet'}
 
 def get_integer_input(prompt, min_val=1):
     """Get validated integer input from user"""
@@ -14,8 +30,76 @@ def get_integer_input(prompt, min_val=1):
         except ValueError:
             print("Error: Enter a valid integer")
 
+def write_shard(path, num_rows, seed_sequence, end, fmt, chunk_rows=CHUNK_ROWS):
+    """Generate one shard chunk by chunk and append each chunk to the output file"""
+    rng = np.random.default_rng(seed_sequence)
+    tmp_path = path + ".tmp"
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for start in range(0, num_rows, chunk_rows):
+                table = pa.Table.from_pandas(genera_incidenti(min(chunk_rows, num_rows - start), seed=rng, fine=end), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        opener = gzip.open if fmt == 'csv.gz' else open
+        with opener(tmp_path, 'wt', encoding='utf-8', newline='') as f:
+            for start in range(0, num_rows, chunk_rows):
+                chunk = genera_incidenti(min(chunk_rows, num_rows - start), seed=rng, fine=end)
+                chunk.to_csv(f, index=False, header=(start == 0), float_format='%.0f')
+    # The shard only appears under its final name once it is complete
+    os.replace(tmp_path, path)
+    return path, num_rows
+
+def run_sharded(rows, seed, outdir, shard_rows, fmt, workers, end=None):
+    """Write 'rows' incidents as shards of 'shard_rows' rows, optionally in parallel processes"""
+    os.makedirs(outdir, exist_ok=True)
+    num_shards = -(-rows // shard_rows)
+    # One independent random stream per shard: the output is the same whatever the number of workers
+    seeds = np.random.SeedSequence(seed).spawn(num_shards)
+    end = np.datetime64(end or datetime.now(), 's')
+    digits = len(str(num_shards - 1))
+    jobs = [(os.path.join(outdir, f"incidenti_{i:0{digits}d}{FORMATS[fmt]}"), min(shard_rows, rows - i * shard_rows), seeds[i], end, fmt)
+            for i in range(num_shards)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(write_shard, *zip(*jobs))
+            for path, num_rows in results:
+                print(f"Written '{path}' ({num_rows} records)")
+    else:
+        for job in jobs:
+            path, num_rows = write_shard(*job)
+            print(f"Written '{path}' ({num_rows} records)")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate simulated traffic incident data. "
+                                                 "Without arguments the generator asks for its parameters interactively.")
+    parser.add_argument('--rows', type=int, required=True, help="total number of incidents to generate")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for reproducible output")
+    parser.add_argument('--outdir', default='.', help="output directory for the shards")
+    parser.add_argument('--shard-rows', type=int, default=10_000_000, help="rows per output file")
+    parser.add_argument('--format', choices=list(FORMATS), default='csv', help="output format")
+    parser.add_argument('--end', default=None, help="last date of the simulated period (YYYY-MM-DD), default now; "
+                                                    "fix it together with --seed for identical output")
+    parser.add_argument('--workers', type=int, default=1, help="number of processes writing shards in parallel")
+    args = parser.parse_args(argv)
+    if args.rows < 1 or args.shard_rows < 1 or args.workers < 1:
+        parser.error("--rows, --shard-rows and --workers must be >= 1")
+    return args
+
 def main():
     """Generate simulated traffic incident CSV data"""
+    if len(sys.argv) > 1:
+        args = parse_args(sys.argv[1:])
+        run_sharded(args.rows, args.seed, args.outdir, args.shard_rows, args.format, args.workers, args.end)
+        return
+
     print("Traffic Incident Data Generator")
     print("=" * 35)
     
@@ -25,40 +109,22 @@ def main():
     max_deaths = get_integer_input("Max deaths per incident: ", 0)
     max_speed = get_integer_input("Max estimated speed (km/h): ", 30)
     
+    seed_text = input("Random seed (leave empty for a random one): ").strip()
+    seed = int(seed_text) if seed_text else None
+
     filename = input("Output filename (with .csv): ").strip()
     if not filename.endswith('.csv'):
         filename += '.csv'
-    
-    # Data for generation
-    provinces = ['Milano', 'Roma', 'Napoli', 'Torino', 'Firenze', 'Bologna', 'Genova', 'Bari']
-    road_types = ['Urban', 'State', 'Highway']
-    days = ['Lunedì', 'Martedì', 'Mercoledì', 'Giovedì', 'Venerdì', 'Sabato', 'Domenica']
-    
-    # Generate date range (last 3 years)
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=3*365)
-    
+
     print(f"\nGenerating {num_records} records...")
-    
-    records = []
-    for _ in range(num_records):
-        # Random date in range
-        random_seconds = random.randint(0, int((end_date - start_date).total_seconds()))
-        incident_date = start_date + timedelta(seconds=random_seconds)
-        
-        record = {
-            'Data_Ora_Incidente': incident_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'Provincia': random.choice(provinces),
-            'Giorno_Settimana': days[incident_date.weekday()],
-            'Tipo_Strada': random.choice(road_types),
-            'Numero_Feriti': random.randint(0, max_injured),
-            'Numero_Morti': random.randint(0, max_deaths),
-            'Velocita_Media_Stimata': random.randint(30, max_speed)
-        }
-        records.append(record)
-    
+
+    # Every column is generated as a whole NumPy array (last 3 years of incidents).
+    # The maxima make injured, deaths and speed uniform from 0 (30 km/h for speed) up to the value entered,
+    # and every row has a road type, with the provinces and road labels of the original interactive generator.
+    df = genera_incidenti(num_records, seed=seed, giorni=3*365, province=INTERACTIVE_PROVINCES, tipi_strada=INTERACTIVE_ROAD_TYPES,
+                          quota_strada_mancante=0, massimo_feriti=max_injured, massimo_morti=max_deaths, velocita_massima=max_speed)
+
     # Save to CSV
-    df = pd.DataFrame(records)
     df.to_csv(filename, index=False)
     
     print(f"Success! Created '{filename}' with {len(df)} records")
@@ -0,0 +1,181 @@
+# ==================================================================================
+# INTERVALLI DI CONFIDENZA BOOTSTRAP VETTORIALI PER GLI INDICI DESCRITTIVI
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import os  # Modulo per conoscere il numero di processori disponibili.
+import warnings  # Modulo per avvisare quando le repliche calcolate sono meno di quelle richieste.
+from concurrent.futures import ProcessPoolExecutor  # Pool di processi per un numero molto grande di repliche.
+import numpy as np  # Libreria per estrarre e valutare intere matrici di repliche in un colpo solo.
+
+# Indici per cui viene calcolato l'intervallo, nell'ordine in cui vengono restituiti.
+INDICI_BOOTSTRAP = ('media', 'mediana', 'dev_std', 'coeff_variazione', 'iqr')
+# Numero predefinito di repliche e livello di confidenza.
+REPLICHE_PREDEFINITE = 10_000
+LIVELLO_PREDEFINITO = 0.95
+# Le repliche sono divise in parti di al massimo REPLICHE_PER_PARTE repliche e ESTRAZIONI_PER_PARTE estrazioni
+# (repliche × righe), ognuna con il proprio seme derivato da quello iniziale: il risultato non dipende quindi dal
+# numero di processi usati, e con molte righe le parti restano abbastanza piccole da dividersi tra i processi.
+REPLICHE_PER_PARTE = 1_000
+ESTRAZIONI_PER_PARTE = 20_000_000
+# Numero massimo di elementi (repliche × valori) di ciascuna matrice elaborata in un colpo solo (circa 32 MB).
+ELEMENTI_PER_BLOCCO = 1 << 22
+# Fino a questo numero di valori distinti ogni replica si estrae come vettore di conteggi (distribuzione
+# multinomiale sui valori distinti), senza mai costruire il campione: il costo non dipende dal numero di righe.
+LIMITE_VALORI_DISTINTI = 5_000
+# Oltre questo numero di estrazioni (repliche × righe) le parti vengono distribuite su un pool di processi.
+SOGLIA_PARALLELO = 20_000_000
+# Con più di LIMITE_VALORI_DISTINTI valori distinti ogni replica costa un'estrazione per riga e una selezione dei
+# quartili: le repliche vengono ridotte in modo che repliche × righe non superi questo limite moltiplicato per
+# il numero di processori (circa 10 s di calcolo per processore), con un avviso.
+ESTRAZIONI_PER_PROCESSORE = 250_000_000
+# Numero minimo di repliche per un intervallo dei percentili.
+REPLICHE_MINIME = 100
+
+
+# --- INDICI DI UN BLOCCO DI REPLICHE ESPRESSE COME CONTEGGI DEI VALORI DISTINTI ---
+def indici_da_conteggi(valori, conteggi, n):
+    # 'conteggi' è una matrice (repliche × valori distinti): ogni riga è un campione bootstrap.
+    # Gli scarti da un centro comune (la media dell'intero blocco) evitano la cancellazione numerica nella varianza.
+    centro = float(valori @ conteggi.sum(axis=0)) / conteggi.sum()
+    scarti = valori - centro
+    s1, s2 = conteggi @ scarti, conteggi @ (scarti * scarti)
+    media = centro + s1 / n
+    dev_std = np.sqrt(np.maximum(s2 - s1 * s1 / n, 0) / (n - 1))
+    # Quantili con interpolazione lineare, come Series.quantile: il valore di rango r è il primo
+    # valore distinto la cui frequenza cumulata supera r.
+    cumulati = np.cumsum(conteggi, axis=1)
+    def quantile(p):
+        posizione = (n - 1) * p
+        inferiore = int(np.floor(posizione))
+        v_inf = valori[(cumulati <= inferiore).sum(axis=1)]
+        v_sup = valori[(cumulati <= min(inferiore + 1, n - 1)).sum(axis=1)]
+        return v_inf + (v_sup - v_inf) * (posizione - inferiore)
+    return {'media': media, 'mediana': quantile(0.5), 'dev_std': dev_std,
+            'coeff_variazione': np.divide(dev_std, media, out=np.zeros_like(media), where=media != 0),
+            'iqr': quantile(0.75) - quantile(0.25)}
+
+
+# --- VALORI DI ALCUNI RANGHI DI OGNI RIGA (SELEZIONE SENZA ORDINAMENTO COMPLETO) ---
+def _valori_ranghi(campioni, ranghi, inizio=0, fine=None):
+    # 'ranghi' ordinati e distinti, tutti in [inizio, fine). Riordina parzialmente 'campioni' sul posto: una
+    # np.partition sul rango centrale, poi ciascuna metà solo per i ranghi che contiene. Ogni selezione lavora
+    # su una fetta più piccola della precedente, mentre np.quantile ordina l'intera riga per ogni quantile.
+    fine = campioni.shape[1] if fine is None else fine
+    if not ranghi: return
+    centrale = ranghi[len(ranghi) // 2]
+    campioni[:, inizio:fine].partition(centrale - inizio, axis=1)
+    _valori_ranghi(campioni, ranghi[:len(ranghi) // 2], inizio, centrale)
+    _valori_ranghi(campioni, ranghi[len(ranghi) // 2 + 1:], centrale + 1, fine)
+
+
+def quantili_righe(campioni, probabilita):
+    # Quantili di ogni riga con interpolazione lineare, come np.quantile(..., axis=1); 'campioni' viene riordinato.
+    n = campioni.shape[1]
+    posizioni = (n - 1) * np.asarray(probabilita, dtype=np.float64)
+    inferiori = np.floor(posizioni).astype(np.int64)
+    superiori = np.minimum(inferiori + 1, n - 1)
+    _valori_ranghi(campioni, sorted(set(inferiori.tolist()) | set(superiori.tolist())))
+    v_inf, v_sup = campioni[:, inferiori], campioni[:, superiori]
+    return (v_inf + (v_sup - v_inf) * (posizioni - inferiori)).T
+
+
+# --- INDICI DI UN BLOCCO DI REPLICHE ESPRESSE COME MATRICE DI VALORI ---
+def indici_da_campioni(campioni):
+    # 'campioni' (repliche × valori) viene riordinato parzialmente sul posto per i quartili.
+    media = campioni.mean(axis=1)
+    dev_std = campioni.std(axis=1, ddof=1)
+    q1, mediana, q3 = quantili_righe(campioni, [0.25, 0.5, 0.75])
+    return {'media': media, 'mediana': mediana, 'dev_std': dev_std,
+            'coeff_variazione': np.divide(dev_std, media, out=np.zeros_like(media), where=media != 0), 'iqr': q3 - q1}
+
+
+# --- REPLICHE DI UNA PARTE (eseguita anche in un processo separato) ---
+def _repliche_parte(valori, conteggi, repliche, seme, annulla=None):
+    # Con 'conteggi' i dati sono rappresentati dai valori distinti e dalle loro frequenze; altrimenti
+    # 'valori' contiene tutte le osservazioni e le repliche si estraggono come matrici di posizioni.
+    # 'annulla' (un threading.Event, solo senza pool di processi) viene controllato tra un blocco e l'altro.
+    rng = np.random.default_rng(seme)
+    parti = []
+    per_blocco = max(1, ELEMENTI_PER_BLOCCO // valori.size)
+    for inizio in range(0, repliche, per_blocco):
+        if annulla is not None and annulla.is_set():
+            return None
+        righe = min(per_blocco, repliche - inizio)
+        if conteggi is not None:
+            n = int(conteggi.sum())
+            parti.append(indici_da_conteggi(valori, rng.multinomial(n, conteggi / n, size=righe), n))
+        else:
+            # Posizioni a 32 bit quando bastano: metà memoria e metà tempo per estrarle.
+            tipo = np.int32 if valori.size <= np.iinfo(np.int32).max else np.int64
+            parti.append(indici_da_campioni(valori[rng.integers(0, valori.size, size=(righe, valori.size), dtype=tipo)]))
+    return {nome: np.concatenate([parte[nome] for parte in parti]) for nome in INDICI_BOOTSTRAP}
+
+
+# --- PREPARAZIONE DEI DATI E NUMERO MASSIMO DI REPLICHE ---
+def prepara_dati_bootstrap(valori, conteggi=None):
+    # Restituisce (valori, conteggi): i valori distinti con le loro frequenze se sono al massimo
+    # LIMITE_VALORI_DISTINTI (conteggi, velocità arrotondate...), altrimenti le osservazioni senza NaN e None.
+    valori = np.asarray(valori, dtype=np.float64)
+    if conteggi is not None:
+        return valori, np.asarray(conteggi, dtype=np.int64)
+    valori = valori[~np.isnan(valori)]
+    distinti, frequenze = np.unique(valori, return_counts=True)
+    if distinti.size <= LIMITE_VALORI_DISTINTI:
+        return distinti, frequenze
+    return valori, None
+
+
+def repliche_ammesse(valori, conteggi, repliche, processi=None):
+    # Repliche effettivamente calcolate: invariate sulle frequenze (il costo non dipende dalle righe),
+    # altrimenti limitate a ESTRAZIONI_PER_PROCESSORE × processi / righe (ma mai sotto REPLICHE_MINIME).
+    if conteggi is not None: return repliche
+    processi = processi or os.cpu_count() or 1
+    return min(repliche, max(REPLICHE_MINIME, ESTRAZIONI_PER_PROCESSORE * processi // max(valori.size, 1)))
+
+
+# --- FUNZIONE PRINCIPALE: INTERVALLI DI CONFIDENZA BOOTSTRAP (METODO DEI PERCENTILI) ---
+def intervalli_bootstrap(valori, conteggi=None, repliche=REPLICHE_PREDEFINITE, seed=None, livello=LIVELLO_PREDEFINITO, processi=None, annulla=None):
+    # 'valori' sono le osservazioni oppure, se si passano i 'conteggi', i valori distinti in ordine crescente.
+    # Restituisce ({indice: (estremo inferiore, estremo superiore)} per ciascuno degli INDICI_BOOTSTRAP, repliche usate):
+    # le repliche possono essere meno di quelle richieste (repliche_ammesse). Restituisce None se 'annulla' viene impostato.
+    # Con lo stesso 'seed' si ottengono sempre gli stessi intervalli, con o senza pool di processi.
+    # 'processi' (predefinito: tutti i processori se il lavoro supera SOGLIA_PARALLELO) limita il pool; 1 lo disattiva.
+    valori, conteggi = prepara_dati_bootstrap(valori, conteggi)
+    richieste, repliche = repliche, repliche_ammesse(valori, conteggi, repliche, processi)
+    if repliche < richieste:
+        warnings.warn(f"calcolate {repliche} repliche bootstrap invece di {richieste}: la variabile ha più di "
+                      f"{LIMITE_VALORI_DISTINTI} valori distinti e ogni replica estrae tutte le {valori.size} righe.", RuntimeWarning, stacklevel=2)
+    n = int(conteggi.sum()) if conteggi is not None else valori.size
+    if n < 2:
+        return {nome: (np.nan, np.nan) for nome in INDICI_BOOTSTRAP}, repliche
+
+    # Ogni parte costa circa (repliche della parte) × (valori distinti o righe) estrazioni.
+    elementi = valori.size
+    per_parte = max(1, min(REPLICHE_PER_PARTE, ESTRAZIONI_PER_PARTE // elementi))
+    dimensioni = [min(per_parte, repliche - inizio) for inizio in range(0, repliche, per_parte)]
+    semi = np.random.SeedSequence(seed).spawn(len(dimensioni))
+    if processi is None:
+        processi = (os.cpu_count() or 1) if repliche * elementi > SOGLIA_PARALLELO else 1
+    risultati = []
+    if processi > 1 and len(dimensioni) > 1:
+        with ProcessPoolExecutor(max_workers=min(processi, len(dimensioni))) as pool:
+            for risultato in pool.map(_repliche_parte, [valori] * len(dimensioni), [conteggi] * len(dimensioni), dimensioni, semi):
+                if annulla is not None and annulla.is_set():
+                    pool.shutdown(cancel_futures=True)
+                    return None
+                risultati.append(risultato)
+    else:
+        for dimensione, seme in zip(dimensioni, semi):
+            risultato = _repliche_parte(valori, conteggi, dimensione, seme, annulla)
+            if risultato is None:
+                return None
+            risultati.append(risultato)
+
+    alfa = (1 - livello) / 2
+    intervalli = {}
+    for nome in INDICI_BOOTSTRAP:
+        stime = np.concatenate([risultato[nome] for risultato in risultati])
+        basso, alto = np.nanquantile(stime, [alfa, 1 - alfa])
+        intervalli[nome] = (float(basso), float(alto))
+    return intervalli, repliche
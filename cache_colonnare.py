@@ -0,0 +1,166 @@
+# ==================================================================================
+# CACHE PERSISTENTE IN FORMATO COLONNARE DEI DATAFRAME GIÀ PULITI
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import hashlib  # Modulo per calcolare l'impronta del contenuto dei file.
+import json  # Modulo per salvare i metadati di ogni voce della cache.
+import os  # Modulo per la gestione di file e cartelle.
+import pickle  # Formato binario di riserva, usato solo se 'pyarrow' non è installato.
+import time  # Modulo per registrare l'istante dell'ultimo utilizzo di ogni voce.
+import pandas as pd  # Libreria per la lettura e scrittura dei DataFrame.
+
+# 'pyarrow' è facoltativo: se presente i DataFrame vengono salvati in Feather (colonnare, con categorie e date).
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# Cartella predefinita della cache, nella home dell'utente.
+CARTELLA_CACHE_PREDEFINITA = os.path.join(os.path.expanduser("~"), ".cache", "analisi_incidenti")
+# Spazio massimo occupato dalla cache: oltre questo limite vengono eliminate le voci usate meno di recente.
+DIMENSIONE_MASSIMA_CACHE = 2 * 1024 ** 3
+# Parametri dell'impronta del contenuto: numero di blocchi campionati e loro dimensione.
+BLOCCHI_IMPRONTA = 16
+BYTE_PER_BLOCCO_IMPRONTA = 64 * 1024
+
+
+# --- FUNZIONE PER CALCOLARE L'IMPRONTA DI UN FILE SORGENTE ---
+def impronta_file(filepath):
+    # L'impronta combina percorso, dimensione, data di modifica e un hash del contenuto.
+    # L'hash legge blocchi distribuiti su tutto il file (inizio e fine compresi) invece dell'intero file,
+    # così il controllo resta rapido anche su file di centinaia di MB.
+    info = os.stat(filepath)
+    hash_contenuto = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        if info.st_size <= BLOCCHI_IMPRONTA * BYTE_PER_BLOCCO_IMPRONTA:
+            hash_contenuto.update(f.read())
+        else:
+            passo = (info.st_size - BYTE_PER_BLOCCO_IMPRONTA) // (BLOCCHI_IMPRONTA - 1)
+            for i in range(BLOCCHI_IMPRONTA):
+                f.seek(i * passo)
+                hash_contenuto.update(f.read(BYTE_PER_BLOCCO_IMPRONTA))
+    return {'percorso': os.path.abspath(filepath), 'dimensione': info.st_size,
+            'modifica_ns': info.st_mtime_ns, 'hash': hash_contenuto.hexdigest()}
+
+
+# --- CLASSE CHE GESTISCE LA CACHE SU DISCO ---
+class CacheColonnare:
+    def __init__(self, cartella=CARTELLA_CACHE_PREDEFINITA, dimensione_massima=DIMENSIONE_MASSIMA_CACHE):
+        self.cartella = cartella
+        self.dimensione_massima = dimensione_massima
+        # Estensione dei file di dati in base al formato disponibile.
+        self.estensione = ".feather" if feather is not None else ".pkl"
+
+    # --- PERCORSI DEI FILE DI UNA VOCE ---
+    def _chiave(self, filepath):
+        # Ogni file sorgente ha una sola voce, identificata dal suo percorso assoluto.
+        return hashlib.sha1(os.path.abspath(filepath).encode('utf-8')).hexdigest()
+
+    def _percorsi(self, chiave):
+        base = os.path.join(self.cartella, chiave)
+        return base + self.estensione, base + ".json"
+
+    # --- LETTURA DI UNA VOCE ---
+    def carica(self, filepath):
+        # Restituisce (DataFrame, metadati) se la cache contiene una copia valida del file, altrimenti None.
+        percorso_dati, percorso_meta = self._percorsi(self._chiave(filepath))
+        if not (os.path.exists(percorso_dati) and os.path.exists(percorso_meta)):
+            return None
+        try:
+            with open(percorso_meta, 'r', encoding='utf-8') as f:
+                metadati = json.load(f)
+            # Se il file sorgente è cambiato (dimensione, data o contenuto) la voce non è più valida.
+            if metadati.get('impronta') != impronta_file(filepath):
+                self._elimina_voce(percorso_dati, percorso_meta)
+                return None
+            df = self._leggi_dati(percorso_dati)
+        except Exception:
+            # Una voce illeggibile (es. scrittura interrotta) viene scartata e il file verrà riletto dal CSV.
+            self._elimina_voce(percorso_dati, percorso_meta)
+            return None
+        # Aggiorna l'istante di ultimo utilizzo, usato dalla politica di eliminazione.
+        metadati['ultimo_accesso'] = time.time()
+        with open(percorso_meta, 'w', encoding='utf-8') as f:
+            json.dump(metadati, f)
+        return df, metadati
+
+    # --- SCRITTURA DI UNA VOCE ---
+    def salva(self, filepath, df, extra=None):
+        os.makedirs(self.cartella, exist_ok=True)
+        percorso_dati, percorso_meta = self._percorsi(self._chiave(filepath))
+        # Scrive prima su un file temporaneo e poi lo rinomina, così una voce non è mai scritta a metà.
+        temporaneo = percorso_dati + ".tmp"
+        self._scrivi_dati(df, temporaneo)
+        os.replace(temporaneo, percorso_dati)
+        metadati = {'impronta': impronta_file(filepath), 'formato': self.estensione.lstrip('.'),
+                    'righe': len(df), 'byte': os.path.getsize(percorso_dati), 'ultimo_accesso': time.time(),
+                    'extra': extra or {}}
+        with open(percorso_meta, 'w', encoding='utf-8') as f:
+            json.dump(metadati, f)
+        # Dopo ogni scrittura riporta la cache entro il limite di spazio.
+        self.applica_limite()
+
+    # --- POLITICA DI ELIMINAZIONE (LRU SULLO SPAZIO OCCUPATO) ---
+    def applica_limite(self):
+        voci = self.elenca_voci()
+        totale = sum(voce['byte'] for voce in voci)
+        # Elimina le voci usate meno di recente finché lo spazio occupato non rientra nel limite.
+        for voce in sorted(voci, key=lambda v: v['ultimo_accesso']):
+            if totale <= self.dimensione_massima: break
+            self._elimina_voce(voce['percorso_dati'], voce['percorso_meta'])
+            totale -= voce['byte']
+
+    def elenca_voci(self):
+        voci = []
+        if not os.path.isdir(self.cartella):
+            return voci
+        for nome in os.listdir(self.cartella):
+            if not nome.endswith(".json"): continue
+            percorso_meta = os.path.join(self.cartella, nome)
+            percorso_dati = percorso_meta[:-len(".json")] + self.estensione
+            try:
+                with open(percorso_meta, 'r', encoding='utf-8') as f:
+                    metadati = json.load(f)
+                byte = os.path.getsize(percorso_dati)
+            except (OSError, ValueError):
+                continue
+            voci.append({'percorso_dati': percorso_dati, 'percorso_meta': percorso_meta,
+                         'byte': byte, 'ultimo_accesso': metadati.get('ultimo_accesso', 0)})
+        return voci
+
+    def dimensione_occupata(self):
+        return sum(voce['byte'] for voce in self.elenca_voci())
+
+    # --- SVUOTAMENTO COMPLETO ---
+    def svuota(self):
+        # Elimina tutti i file della cache e restituisce il numero di byte liberati.
+        liberati = 0
+        if not os.path.isdir(self.cartella):
+            return liberati
+        for nome in os.listdir(self.cartella):
+            if nome.endswith((".feather", ".pkl", ".json", ".tmp")):
+                percorso = os.path.join(self.cartella, nome)
+                liberati += os.path.getsize(percorso)
+                os.remove(percorso)
+        return liberati
+
+    # --- FUNZIONI INTERNE DI LETTURA/SCRITTURA ---
+    def _scrivi_dati(self, df, percorso):
+        # Feather richiede un indice semplice: il DataFrame viene salvato con indice continuo.
+        df = df.reset_index(drop=True)
+        if feather is not None:
+            feather.write_feather(df, percorso)
+        else:
+            with open(percorso, 'wb') as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _leggi_dati(self, percorso):
+        if feather is not None:
+            return feather.read_feather(percorso)
+        return pd.read_pickle(percorso)
+
+    def _elimina_voce(self, *percorsi):
+        for percorso in percorsi:
+            if os.path.exists(percorso):
+                os.remove(percorso)
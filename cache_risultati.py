@@ -0,0 +1,97 @@
+# ==================================================================================
+# CACHE IN MEMORIA DEI RISULTATI DELLE ANALISI (LRU LIMITATA IN BYTE)
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import sys  # Modulo per stimare la dimensione degli oggetti Python semplici.
+from collections import OrderedDict  # Dizionario ordinato, usato per tenere le voci dalla meno alla più recente.
+import numpy as np  # Libreria per misurare la memoria degli array.
+import pandas as pd  # Libreria per misurare la memoria di Series e DataFrame e calcolare l'impronta dei dati.
+
+# Memoria massima occupata dai risultati conservati (oltre, si eliminano quelli usati meno di recente).
+DIMENSIONE_MASSIMA_RISULTATI = 256 * 1024 ** 2
+# Righe lette all'inizio e alla fine del DataFrame per calcolarne l'impronta.
+RIGHE_IMPRONTA = 1000
+
+
+# --- FUNZIONE CHE STIMA LA MEMORIA OCCUPATA DA UN RISULTATO ---
+def dimensione_oggetto(oggetto):
+    if isinstance(oggetto, (pd.DataFrame, pd.Series, pd.Index)):
+        memoria = oggetto.memory_usage(deep=False)
+        return int(memoria.sum()) if isinstance(memoria, pd.Series) else int(memoria)
+    if isinstance(oggetto, np.ndarray):
+        return oggetto.nbytes
+    if isinstance(oggetto, pd.Categorical):
+        return oggetto.nbytes
+    if isinstance(oggetto, dict):
+        return sys.getsizeof(oggetto) + sum(dimensione_oggetto(valore) for valore in oggetto.values())
+    if isinstance(oggetto, (list, tuple)):
+        return sys.getsizeof(oggetto) + sum(dimensione_oggetto(valore) for valore in oggetto)
+    if hasattr(oggetto, '__dict__'):
+        # Oggetti del progetto (es. StatisticheOrdine): somma dei loro attributi.
+        return sys.getsizeof(oggetto) + dimensione_oggetto(vars(oggetto))
+    return sys.getsizeof(oggetto)
+
+
+# --- FUNZIONE CHE CALCOLA L'IMPRONTA DI UN DataFrame ---
+def impronta_dataframe(df):
+    # Numero di righe, colonne, tipi e un hash delle prime e ultime righe: rapida anche su milioni di righe.
+    estremi = pd.concat([df.head(RIGHE_IMPRONTA), df.tail(RIGHE_IMPRONTA)])
+    hash_righe = int(pd.util.hash_pandas_object(estremi, index=False).sum())
+    return (len(df), tuple(df.columns), tuple(str(tipo) for tipo in df.dtypes), hash_righe)
+
+
+# --- CLASSE CHE CONSERVA I RISULTATI GIÀ CALCOLATI ---
+class CacheRisultati:
+    # Ogni risultato è identificato da una chiave (versione e impronta del dataset, nome del calcolo, colonne
+    # e opzioni). Se la memoria occupata supera il limite, vengono eliminati i risultati usati meno di recente.
+    def __init__(self, dimensione_massima=DIMENSIONE_MASSIMA_RISULTATI):
+        self.dimensione_massima = dimensione_massima
+        self._voci = OrderedDict()  # chiave -> (risultato, byte stimati), dalla meno alla più recente.
+        self.byte_occupati = 0
+        self.successi = 0  # Richieste servite dalla cache.
+        self.mancati = 0  # Richieste che hanno richiesto il calcolo.
+
+    def __len__(self):
+        return len(self._voci)
+
+    # --- LETTURA CON CALCOLO AL PRIMO ACCESSO ---
+    def ottieni(self, chiave, calcola):
+        if chiave in self._voci:
+            self._voci.move_to_end(chiave)
+            self.successi += 1
+            return self._voci[chiave][0]
+        self.mancati += 1
+        risultato = calcola()
+        self.inserisci(chiave, risultato)
+        return risultato
+
+    def inserisci(self, chiave, risultato):
+        # Conserva un risultato già calcolato altrove (es. dal caricatore), senza toccare i contatori.
+        if chiave in self._voci:
+            self.byte_occupati -= self._voci.pop(chiave)[1]
+        byte = dimensione_oggetto(risultato)
+        # Un risultato più grande dell'intera cache non viene conservato.
+        if byte <= self.dimensione_massima:
+            self._voci[chiave] = (risultato, byte)
+            self.byte_occupati += byte
+            self._applica_limite()
+
+    def cerca(self, chiave, predefinito=None):
+        # Lettura senza effetti su contatori e ordine di utilizzo.
+        voce = self._voci.get(chiave)
+        return voce[0] if voce is not None else predefinito
+
+    def _applica_limite(self):
+        while self.byte_occupati > self.dimensione_massima and self._voci:
+            _, (_, byte) = self._voci.popitem(last=False)
+            self.byte_occupati -= byte
+
+    # --- SVUOTAMENTO E STATISTICHE ---
+    def svuota(self):
+        self._voci.clear()
+        self.byte_occupati = 0
+
+    def descrizione(self):
+        return (f"Cache risultati: {self.successi} riusati, {self.mancati} calcolati | "
+                f"{len(self._voci)} voci, {self.byte_occupati / 1e6:.1f} MB")
@@ -0,0 +1,150 @@
+# ==================================================================================
+# DISEGNI DI CAMPIONAMENTO (CASUALE SEMPLICE, STRATIFICATO, A GRAPPOLI) E STIME CON ERRORI STANDARD
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import numpy as np  # Libreria per estrarre le posizioni e calcolare le stime per strato con bincount.
+import pandas as pd  # Libreria per fattorizzare le chiavi dei gruppi e restituire le tabelle per strato.
+
+# Disegni disponibili, con il nome mostrato nell'interfaccia.
+DISEGNI_CAMPIONAMENTO = {'semplice': "Casuale semplice", 'proporzionale': "Stratificato proporzionale",
+                         'fisso': "Stratificato a numerosità fissa", 'grappoli': "A grappoli (giorni)"}
+# Etichetta del gruppo formato dalle righe con chiave mancante.
+ETICHETTA_MANCANTE = "(non indicato)"
+
+
+# --- CLASSE CHE RAGGRUPPA LE POSIZIONI DELLE RIGHE PER GRUPPO ---
+class IndiceGruppi:
+    # Una sola fattorizzazione e un solo ordinamento stabile delle chiavi: le posizioni di ogni gruppo sono
+    # poi una fetta contigua di 'ordine', senza creare copie del DataFrame per gruppo.
+    # Le righe con chiave mancante formano un gruppo a sé, così i gruppi coprono tutta la popolazione.
+    def __init__(self, chiavi):
+        codici, etichette = pd.factorize(chiavi, sort=True, use_na_sentinel=False)
+        self.etichette = [ETICHETTA_MANCANTE if pd.isna(etichetta) else str(etichetta) for etichetta in etichette]
+        self.dimensioni = np.bincount(codici, minlength=len(self.etichette))  # Righe di ciascun gruppo.
+        self.inizi = np.concatenate(([0], np.cumsum(self.dimensioni)[:-1]))  # Inizio di ogni gruppo in 'ordine'.
+        # Con meno di 32768 gruppi i codici stanno in int16 e l'ordinamento stabile di NumPy usa il radix sort.
+        codici = codici.astype(np.int16) if len(self.etichette) <= np.iinfo(np.int16).max else codici
+        self.ordine = np.argsort(codici, kind='stable')  # Posizioni delle righe, gruppo per gruppo.
+
+    def __len__(self):
+        return len(self.etichette)
+
+    @property
+    def totale(self):
+        return int(self.dimensioni.sum())
+
+    def posizioni(self, gruppo):
+        return self.ordine[self.inizi[gruppo]:self.inizi[gruppo] + self.dimensioni[gruppo]]
+
+
+# --- ALLOCAZIONE DEL CAMPIONE TRA GLI STRATI ---
+def allocazione(dimensioni, n, metodo='proporzionale'):
+    # 'proporzionale': n_h proporzionale alla dimensione N_h dello strato; 'fisso': stessa numerosità per ogni strato.
+    # Le parti decimali vengono assegnate agli strati con i resti maggiori (la somma resta n), poi ogni n_h è
+    # limitato a N_h: con l'allocazione fissa uno strato piccolo può quindi dare meno unità del previsto.
+    dimensioni = np.asarray(dimensioni, dtype=np.int64)
+    if metodo == 'proporzionale':
+        quote = n * dimensioni / dimensioni.sum()
+    else:
+        quote = np.full(dimensioni.size, n / dimensioni.size)
+    n_h = np.floor(quote).astype(np.int64)
+    resti = np.argsort(-(quote - n_h), kind='stable')[:n - int(n_h.sum())]
+    n_h[resti] += 1
+    return np.minimum(n_h, dimensioni)
+
+
+# --- ESTRAZIONE DI UN CAMPIONE STRATIFICATO (SENZA REINSERIMENTO IN OGNI STRATO) ---
+def campione_stratificato(indice, n_h, rng):
+    # Restituisce le posizioni delle righe estratte e lo strato di ciascuna. Per ogni strato si estraggono
+    # n_h posizioni relative alla sua fetta di 'ordine'.
+    strati = np.flatnonzero(n_h)
+    posizioni = [indice.posizioni(h)[rng.choice(indice.dimensioni[h], size=n_h[h], replace=False)] for h in strati]
+    if not posizioni:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(posizioni), np.repeat(strati, n_h[strati])
+
+
+# --- ESTRAZIONE DI UN CAMPIONE A GRAPPOLI (TUTTE LE RIGHE DI m GRUPPI CASUALI) ---
+def campione_a_grappoli(indice, m, rng):
+    # Restituisce le posizioni delle righe dei grappoli estratti, il grappolo (0..m-1) di ciascuna e i grappoli estratti.
+    grappoli = np.sort(rng.choice(len(indice), size=m, replace=False))
+    posizioni = np.concatenate([indice.posizioni(g) for g in grappoli])
+    return posizioni, np.repeat(np.arange(m), indice.dimensioni[grappoli]), grappoli
+
+
+# --- VARIANZA DELLO STIMATORE DEL TOTALE IN UN CAMPIONE STRATIFICATO ---
+def _varianza_totale(z, strati, n_h, N_h):
+    # Somma sugli strati di N_h² (1 - n_h/N_h) s²_h / n_h, con s²_h varianza campionaria di z nello strato.
+    # Gli strati con meno di due unità estratte non contribuiscono (la loro varianza non è stimabile).
+    somme = np.bincount(strati, weights=z, minlength=len(N_h))
+    medie = np.divide(somme, n_h, out=np.zeros(len(N_h)), where=n_h > 0)
+    scarti = np.bincount(strati, weights=(z - medie[strati]) ** 2, minlength=len(N_h))
+    stimabili = n_h > 1
+    s2 = np.divide(scarti, n_h - 1, out=np.zeros(len(N_h)), where=stimabili)
+    contributi = np.divide(N_h ** 2 * (1 - n_h / N_h) * s2, n_h, out=np.zeros(len(N_h)), where=stimabili)
+    return float(contributi.sum())
+
+
+# --- STIME DI MEDIA E TOTALE (STIMATORE RAPPORTO, CON LINEARIZZAZIONE PER L'ERRORE STANDARD) ---
+def _stime(y, strati, n_h, N_h):
+    # 'y' sono i valori delle unità (righe o totali di grappolo) e 'strati' lo strato di ciascuna; per i grappoli
+    # 'y' è la coppia (totali dei valori validi, numero di valori validi) di ogni grappolo.
+    # I valori mancanti sono trattati come un dominio: la media è il rapporto tra il totale stimato dei valori
+    # e il numero stimato di valori validi, e il suo errore standard viene dai residui linearizzati.
+    somme, validi = y
+    totale = float(np.sum((N_h / np.maximum(n_h, 1))[strati] * somme))
+    conteggio = float(np.sum((N_h / np.maximum(n_h, 1))[strati] * validi))
+    media = totale / conteggio if conteggio else np.nan
+    residui = somme - media * validi
+    return {'media': media, 'se_media': np.sqrt(_varianza_totale(residui, strati, n_h, N_h)) / conteggio if conteggio else np.nan,
+            'totale': totale, 'se_totale': np.sqrt(_varianza_totale(somme, strati, n_h, N_h))}
+
+
+# --- FUNZIONE PRINCIPALE: ESTRAZIONE CON IL DISEGNO SCELTO E STIME ---
+def stima_con_disegno(valori, disegno, n, indice=None, seed=None):
+    # 'valori' è l'array (float, con eventuali NaN) della variabile su tutta la popolazione; 'indice' è un
+    # IndiceGruppi per gli strati o per i grappoli (non serve per il campionamento casuale semplice).
+    # Per i disegni stratificati e casuale semplice 'n' è il numero di righe, per i grappoli il numero di grappoli.
+    # Restituisce media e totale stimati con errori standard, numerosità e una tabella per strato/grappolo.
+    rng = np.random.default_rng(seed)
+    if disegno == 'semplice':
+        posizioni = rng.choice(valori.size, size=n, replace=False)
+        strati, n_h, N_h = np.zeros(n, dtype=np.int64), np.array([n]), np.array([valori.size])
+    elif disegno in ('proporzionale', 'fisso'):
+        n_h = allocazione(indice.dimensioni, n, disegno)
+        posizioni, strati = campione_stratificato(indice, n_h, rng)
+        N_h = indice.dimensioni
+    elif disegno == 'grappoli':
+        posizioni, grappolo, grappoli = campione_a_grappoli(indice, n, rng)
+    else:
+        raise ValueError(f"disegno di campionamento sconosciuto: {disegno}")
+
+    campione = valori[posizioni]
+    validi = ~np.isnan(campione)
+    if disegno == 'grappoli':
+        # Campione casuale semplice di grappoli: le unità sono i grappoli, con il totale e il numero dei valori validi.
+        somme = np.bincount(grappolo, weights=np.where(validi, campione, 0), minlength=n)
+        conteggi = np.bincount(grappolo, weights=validi, minlength=n)
+        stime = _stime((somme, conteggi), np.zeros(n, dtype=np.int64), np.array([n]), np.array([len(indice)]))
+        tabella = pd.DataFrame({'Grappolo': [indice.etichette[g] for g in grappoli], 'Righe': indice.dimensioni[grappoli],
+                                'Valori validi': conteggi.astype(np.int64),
+                                'Media': np.divide(somme, conteggi, out=np.full(n, np.nan), where=conteggi > 0)})
+    else:
+        stime = _stime((np.where(validi, campione, 0), validi.astype(np.float64)), strati, n_h, N_h)
+        if disegno == 'semplice':
+            tabella = None
+        else:
+            # Media e deviazione standard dei valori validi di ogni strato, con due bincount.
+            conteggi = np.bincount(strati[validi], minlength=len(N_h))
+            medie = np.divide(np.bincount(strati[validi], weights=campione[validi], minlength=len(N_h)), conteggi,
+                              out=np.full(len(N_h), np.nan), where=conteggi > 0)
+            scarti = np.bincount(strati[validi], weights=(campione[validi] - medie[strati[validi]]) ** 2, minlength=len(N_h))
+            dev_std = np.sqrt(np.divide(scarti, conteggi - 1, out=np.full(len(N_h), np.nan), where=conteggi > 1))
+            tabella = pd.DataFrame({'Strato': indice.etichette, 'N_h': N_h, 'n_h': n_h, 'Peso N_h/N': N_h / N_h.sum(),
+                                    'Media': medie, 'Dev. Std': dev_std})
+    stime.update({'n': int(posizioni.size), 'n_validi': int(validi.sum()), 'tabella': tabella,
+                  'strati_vuoti': int(np.count_nonzero(n_h == 0)) if disegno in ('proporzionale', 'fisso') else 0,
+                  # Strati con una sola unità: la loro varianza non è stimabile e l'errore standard risulta sottostimato.
+                  'strati_singoli': int(np.count_nonzero(n_h == 1)) if disegno in ('proporzionale', 'fisso') else 0})
+    return stime
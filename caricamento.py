@@ -0,0 +1,429 @@
+# ==================================================================================
+# CARICAMENTO DEI FILE CSV DEGLI INCIDENTI (lettura a blocchi in background)
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import csv  # Modulo standard usato per riconoscere automaticamente il separatore del file.
+import io  # Modulo per passare a pandas un intervallo di byte già letto in memoria.
+import os  # Modulo per ottenere la dimensione del file da leggere.
+import threading  # Modulo per eseguire la lettura su un thread separato da quello dell'interfaccia.
+import time  # Modulo per misurare il tempo di lettura di ciascun file.
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Pool di processi per leggere più file in parallelo.
+import pandas as pd  # Libreria per la lettura del CSV e la costruzione del DataFrame finale.
+from schema_incidenti import prepara_incidenti, memoria_dataframe, rileva_formato_data_ora, FORMATO_AUTOMATICO, DIMENSIONE_CAMPIONE_FORMATO  # Pulizia e tipizzazione delle colonne (modulo del progetto).
+from fuori_memoria import AggregatiIncidenti  # Aggregati per la modalità fuori memoria (modulo del progetto).
+from serbatoio_campione import SerbatoioCampione  # Campione a serbatoio letto in streaming (modulo del progetto).
+from statistiche import AccumulatoreMomenti  # Momenti combinabili tra blocchi, file e processi (modulo del progetto).
+
+# Numero di byte letti dall'inizio del file per riconoscere il separatore.
+BYTE_CAMPIONE_SEPARATORE = 64 * 1024
+# Numero di righe lette in ciascun blocco dal thread di caricamento.
+RIGHE_PER_BLOCCO = 200_000
+# Un file più grande di questa frazione della RAM viene aperto automaticamente in modalità fuori memoria.
+FRAZIONE_RAM_FUORI_MEMORIA = 0.5
+# Separatori ammessi, in ordine di preferenza in caso di parità.
+SEPARATORI_AMMESSI = ";,\t|"
+# Un file più grande di questa soglia viene diviso in intervalli di byte letti da più processi.
+SOGLIA_LETTURA_PARALLELA = 256 * 1024 ** 2
+# Dimensione indicativa di ciascun intervallo di byte nella lettura parallela.
+BYTE_PER_INTERVALLO = 64 * 1024 ** 2
+
+
+# --- FUNZIONE PER RICONOSCERE IL SEPARATORE DEL FILE ---
+def rileva_separatore(filepath, num_byte=BYTE_CAMPIONE_SEPARATORE):
+    # Legge solo i primi KB del file: bastano per vedere l'intestazione e qualche riga di dati.
+    with open(filepath, 'rb') as f:
+        campione = f.read(num_byte).decode('utf-8', errors='replace')
+    # Scarta l'ultima riga, che potrebbe essere stata troncata a metà dalla lettura parziale.
+    righe = campione.splitlines()
+    if len(righe) > 1 and not campione.endswith(('\n', '\r')):
+        righe = righe[:-1]
+    campione = "\n".join(righe)
+    if not campione:
+        return ','
+    try:
+        # Il Sniffer di 'csv' cerca il carattere che compare con la stessa frequenza in tutte le righe.
+        return csv.Sniffer().sniff(campione, delimiters=SEPARATORI_AMMESSI).delimiter
+    except csv.Error:
+        # Se il Sniffer non è sicuro, sceglie il separatore più frequente nell'intestazione.
+        intestazione = righe[0]
+        return max(SEPARATORI_AMMESSI, key=lambda sep: (intestazione.count(sep), sep == ';'))
+
+
+# --- CLASSE CHE LEGGE UN CSV A BLOCCHI SU UN THREAD SEPARATO ---
+class CaricatoreCSV:
+    # Il thread di lettura non tocca mai i widget: scrive solo lo stato qui sotto,
+    # che l'interfaccia legge periodicamente tramite after() dal thread principale.
+    # Se viene passata una cache colonnare, il file viene prima cercato lì; in caso contrario
+    # il DataFrame pulito e tipizzato viene salvato nella cache al termine della lettura.
+    # I file oltre SOGLIA_LETTURA_PARALLELA vengono letti da 'processi' processi, un intervallo di byte ciascuno.
+    def __init__(self, filepath, righe_per_blocco=RIGHE_PER_BLOCCO, cache=None, processi=None):
+        self.filepath = filepath
+        self.righe_per_blocco = righe_per_blocco
+        self.cache = cache
+        self.processi = processi or os.cpu_count() or 1
+        self.byte_totali = self._dimensione_totale()  # Dimensione da leggere, per la percentuale di avanzamento.
+        self.byte_letti = 0  # Byte già consumati dal parser.
+        self.righe_lette = 0  # Righe già convertite in DataFrame.
+        self.separatore = None  # Separatore riconosciuto (impostato all'avvio del thread).
+        self.fase = "Avvio..."  # Descrizione della fase corrente, mostrata nell'interfaccia.
+        self.risultato = None  # DataFrame finale già pulito e tipizzato, disponibile a lettura completata.
+        self.resoconto = None  # Resoconto della pulizia (memoria, righe rimosse, formato delle date).
+        self.momenti = None  # AccumulatoreMomenti di ogni colonna numerica del risultato, calcolati nel thread di lettura.
+        self.da_cache = False  # True se il DataFrame è stato letto dalla cache invece che dal CSV.
+        self.errore = None  # Eventuale eccezione sollevata durante la lettura.
+        self._evento_annulla = threading.Event()  # Segnale di annullamento richiesto dall'utente.
+        self._thread = threading.Thread(target=self._leggi, daemon=True)
+
+    def _dimensione_totale(self):
+        return os.path.getsize(self.filepath)
+
+    # --- AVVIO E ANNULLAMENTO ---
+    def avvia(self):
+        self._thread.start()
+
+    def annulla(self):
+        # La richiesta viene controllata tra un blocco e l'altro.
+        self._evento_annulla.set()
+
+    # --- STATO DEL CARICAMENTO (letto dal thread dell'interfaccia) ---
+    @property
+    def in_corso(self):
+        return self._thread.is_alive()
+
+    @property
+    def annullato(self):
+        return self._evento_annulla.is_set()
+
+    @property
+    def frazione_letta(self):
+        return min(self.byte_letti / self.byte_totali, 1.0) if self.byte_totali else 1.0
+
+    # --- CORPO DEL THREAD DI LETTURA ---
+    def _leggi(self):
+        try:
+            # Se il file è già nella cache, legge direttamente le colonne pulite salvate in precedenza.
+            if self.cache is not None:
+                self.fase = "Ricerca nella cache..."
+                trovato = self.cache.carica(self.filepath)
+                if trovato is not None:
+                    self.risultato, metadati = trovato
+                    self.resoconto = metadati.get('extra', {})
+                    self.righe_lette, self.byte_letti, self.da_cache = len(self.risultato), self.byte_totali, True
+                    self.momenti = momenti_colonne(self.risultato)
+                    return
+            if self.processi > 1 and self.byte_totali >= SOGLIA_LETTURA_PARALLELA:
+                # File molto grande: ogni processo legge, pulisce e tipizza un proprio intervallo di byte.
+                letto = self._leggi_parallelo()
+                if letto is None:
+                    return
+                self.risultato, self.resoconto, self.momenti = letto
+            else:
+                df = self._leggi_csv()
+                if df is None:
+                    return
+                # La pulizia e la tipizzazione avvengono qui, fuori dal thread dell'interfaccia.
+                self.fase = "Preparazione dei dati..."
+                self.risultato, self.resoconto = prepara_incidenti(df)
+                self.momenti = momenti_colonne(self.risultato)
+            if self.cache is not None and not self._evento_annulla.is_set() and not self.risultato.empty:
+                self.fase = "Salvataggio nella cache..."
+                try:
+                    self.cache.salva(self.filepath, self.risultato, extra=self.resoconto)
+                except Exception as e:
+                    # Un errore di scrittura della cache non deve impedire l'analisi dei dati:
+                    # viene riportato nel resoconto e mostrato all'utente insieme all'esito del caricamento.
+                    self.resoconto['cache_errore'] = str(e)
+        except Exception as e:
+            self.errore = e
+
+    def _blocchi(self):
+        # Generatore dei blocchi del file: aggiorna righe e byte letti e si interrompe se l'utente annulla.
+        # Il separatore viene riconosciuto una sola volta: il file non viene mai riletto da capo.
+        self.fase = "Riconoscimento separatore..."
+        self.separatore = rileva_separatore(self.filepath)
+        self.fase = "Lettura del file..."
+        with open(self.filepath, 'rb') as f:
+            lettore = pd.read_csv(f, sep=self.separatore, chunksize=self.righe_per_blocco, encoding='utf-8')
+            for blocco in lettore:
+                if self._evento_annulla.is_set():
+                    return
+                self.righe_lette += len(blocco)
+                self.byte_letti = f.tell()  # Posizione del parser nel file (il C engine legge in anticipo).
+                yield blocco
+        self.byte_letti = self.byte_totali
+
+    def _leggi_csv(self):
+        blocchi = list(self._blocchi())
+        if self._evento_annulla.is_set():
+            return None
+        # Unisce i blocchi in un unico DataFrame con indice continuo.
+        return pd.concat(blocchi, ignore_index=True) if blocchi else pd.DataFrame()
+
+    def _leggi_parallelo(self):
+        # Restituisce (DataFrame, resoconto, momenti) con le righe nello stesso ordine del file, oppure None se annullato.
+        self.fase = "Riconoscimento separatore..."
+        self.separatore = rileva_separatore(self.filepath)
+        colonne = leggi_intestazione(self.filepath, self.separatore)
+        parti = max(self.processi, -(-self.byte_totali // BYTE_PER_INTERVALLO))
+        intervalli = intervalli_byte(self.filepath, parti)
+        # Il formato delle date viene riconosciuto una sola volta, su righe prese da tutti gli intervalli:
+        # ogni processo interpreta le date allo stesso modo e il resoconto riporta un unico formato.
+        formato = rileva_formato_intervalli(self.filepath, self.separatore, colonne, intervalli)
+        self.fase = f"Lettura parallela ({self.processi} processi)..."
+        esiti = [None] * len(intervalli)
+        with ProcessPoolExecutor(max_workers=self.processi) as pool:
+            futuri = {pool.submit(leggi_intervallo_incidenti, self.filepath, self.separatore, colonne, inizio, fine, formato): i
+                      for i, (inizio, fine) in enumerate(intervalli)}
+            for futuro in as_completed(futuri):
+                if self._evento_annulla.is_set():
+                    for altro in futuri: altro.cancel()
+                    return None
+                # Ogni esito viene messo al posto del suo intervallo, così l'ordine delle righe non dipende
+                # dall'ordine in cui i processi terminano.
+                esito = futuro.result()
+                esiti[futuri[futuro]] = esito
+                self.righe_lette += esito['righe_lette']
+                self.byte_letti += esito['byte']
+        self.byte_letti = self.byte_totali
+        self.fase = "Unione degli intervalli..."
+        frames = unisci_categorie([esito['df'] for esito in esiti])
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        # I momenti di ciascun intervallo, calcolati dal proprio processo, si uniscono senza rileggere i dati.
+        return df, unisci_resoconti([esito['resoconto'] for esito in esiti], df), unisci_momenti([esito['momenti'] for esito in esiti])
+
+
+# --- CLASSE CHE LEGGE UN CSV A BLOCCHI COSTRUENDO SOLO GLI AGGREGATI (MODALITÀ FUORI MEMORIA) ---
+class CaricatoreAggregati(CaricatoreCSV):
+    # Ogni blocco viene pulito, aggregato e subito scartato: al termine 'risultato' contiene
+    # un oggetto AggregatiIncidenti invece di un DataFrame.
+    def _leggi(self):
+        try:
+            aggregati = AggregatiIncidenti()
+            for blocco in self._blocchi():
+                righe = len(blocco)
+                blocco, _ = prepara_incidenti(blocco, misura_memoria=False)
+                aggregati.righe_rimosse += righe - len(blocco)
+                aggregati.aggiorna(blocco)
+            if not self._evento_annulla.is_set():
+                self.risultato, self.resoconto = aggregati, {'righe_rimosse': aggregati.righe_rimosse}
+        except Exception as e:
+            self.errore = e
+
+
+# --- CLASSE CHE ESTRAE UN CAMPIONE DI n RIGHE LEGGENDO IL FILE UNA SOLA VOLTA ---
+class CaricatoreCampione(CaricatoreCSV):
+    # Ogni blocco passa per il serbatoio e viene subito scartato: la memoria non dipende dalla dimensione
+    # del file. Al termine 'risultato' è il campione già pulito e tipizzato, come per CaricatoreCSV.
+    def __init__(self, filepath, n, modo='uniforme', colonna_pesi=None, seed=None):
+        super().__init__(filepath)
+        self.serbatoio = SerbatoioCampione(n, modo, colonna_pesi, seed)
+
+    def _leggi(self):
+        try:
+            for blocco in self._blocchi():
+                self.serbatoio.aggiorna(blocco)
+            if not self._evento_annulla.is_set():
+                self.fase = "Preparazione del campione..."
+                self.risultato, self.resoconto = self.serbatoio.risultato()
+                self.momenti = momenti_colonne(self.risultato)
+        except Exception as e:
+            self.errore = e
+
+
+# --- FUNZIONI PER IL CARICAMENTO DI UNA CARTELLA DI FILE CSV ---
+def elenca_csv(cartella):
+    # Restituisce i percorsi dei file .csv della cartella, in ordine alfabetico.
+    return sorted(os.path.join(cartella, nome) for nome in os.listdir(cartella) if nome.lower().endswith('.csv'))
+
+
+def leggi_intestazione(filepath, separatore=None):
+    # Legge solo la prima riga del file per conoscerne le colonne.
+    separatore = separatore or rileva_separatore(filepath)
+    return pd.read_csv(filepath, sep=separatore, nrows=0, encoding='utf-8').columns.tolist()
+
+
+def leggi_file_incidenti(filepath):
+    # Eseguita in un processo separato: legge, pulisce e tipizza un intero file.
+    # Restituisce anche le righe lette e il tempo impiegato, per il resoconto finale.
+    inizio = time.perf_counter()
+    df = pd.read_csv(filepath, sep=rileva_separatore(filepath), encoding='utf-8')
+    righe_lette = len(df)
+    df, resoconto = prepara_incidenti(df, misura_memoria=False)
+    return {'percorso': filepath, 'df': df, 'righe_lette': righe_lette, 'momenti': momenti_colonne(df),
+            'righe_rimosse': resoconto['righe_rimosse'], 'secondi': time.perf_counter() - inizio}
+
+
+def unisci_categorie(frames):
+    # Porta ogni colonna 'category' degli stessi dizionari in tutti i DataFrame, così pd.concat
+    # mantiene il tipo 'category' invece di ricadere su stringhe Python.
+    frames = [df for df in frames if not df.empty]
+    if not frames: return frames
+    for col in frames[0].columns:
+        if not all(isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames): continue
+        categorie = sorted(set().union(*(df[col].cat.categories for df in frames)))
+        for df in frames:
+            df[col] = df[col].cat.set_categories(categorie)
+    return frames
+
+
+def rimuovi_duplicati(df):
+    # Primo passaggio: un hash a 64 bit per riga individua le righe candidate a essere duplicate.
+    hash_righe = pd.util.hash_pandas_object(df, index=False)
+    candidati = hash_righe.duplicated(keep=False).to_numpy()
+    if not candidati.any():
+        return df, 0
+    # Secondo passaggio: solo le candidate vengono confrontate valore per valore, così una collisione
+    # dell'hash non può eliminare una riga diversa.
+    duplicati = pd.Series(False, index=df.index)
+    duplicati[candidati] = df[candidati].duplicated(keep='first').to_numpy()
+    return df[~duplicati.to_numpy()].reset_index(drop=True), int(duplicati.sum())
+
+
+# --- FUNZIONI PER I MOMENTI DELLE COLONNE NUMERICHE (combinabili tra blocchi, file e processi) ---
+def momenti_colonne(df):
+    # Un AccumulatoreMomenti per ogni colonna numerica del DataFrame già pulito e tipizzato.
+    return {col: AccumulatoreMomenti.da_array(df[col].to_numpy(dtype='float64', na_value=float('nan')))
+            for col in df.columns if pd.api.types.is_numeric_dtype(df[col].dtype)}
+
+
+def unisci_momenti(parti):
+    # Unisce (formule di Chan) i momenti calcolati su parti diverse dei dati, nell'ordine delle parti.
+    momenti = {}
+    for parte in parti:
+        for col, accumulatore in parte.items():
+            momenti.setdefault(col, AccumulatoreMomenti()).unisci(accumulatore)
+    return momenti
+
+
+# --- FUNZIONI PER LA LETTURA PARALLELA DI UN SINGOLO FILE PER INTERVALLI DI BYTE ---
+def intervalli_byte(filepath, parti):
+    # Divide il file (intestazione esclusa) in 'parti' intervalli [inizio, fine) che iniziano e finiscono
+    # sempre all'inizio di una riga: ogni punto di taglio viene spostato dopo il primo '\n' successivo.
+    # Si assume che i campi non contengano a capo tra virgolette, come nei file degli incidenti.
+    dimensione = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        f.readline()
+        inizio_dati = f.tell()
+        tagli = [inizio_dati]
+        for i in range(1, parti):
+            posizione = inizio_dati + (dimensione - inizio_dati) * i // parti
+            if posizione <= tagli[-1]: continue
+            f.seek(posizione - 1)
+            f.readline()  # Se il byte precedente è già un '\n', il taglio resta dov'è.
+            if tagli[-1] < f.tell() < dimensione: tagli.append(f.tell())
+    tagli.append(dimensione)
+    return [(a, b) for a, b in zip(tagli[:-1], tagli[1:]) if b > a]
+
+
+def rileva_formato_intervalli(filepath, separatore, colonne, intervalli, dimensione_campione=DIMENSIONE_CAMPIONE_FORMATO):
+    # Legge poche righe dall'inizio di ogni intervallo (in tutto circa 'dimensione_campione') e riconosce
+    # il formato dominante delle date come farebbe la lettura su un solo processo.
+    if 'Data_Ora_Incidente' not in colonne:
+        return FORMATO_AUTOMATICO
+    righe_per_intervallo = -(-dimensione_campione // len(intervalli))
+    righe = []
+    with open(filepath, 'rb') as f:
+        for inizio, fine in intervalli:
+            f.seek(inizio)
+            for _ in range(righe_per_intervallo):
+                if f.tell() >= fine: break
+                righe.append(f.readline())
+    campione = pd.read_csv(io.BytesIO(b''.join(righe)), sep=separatore, header=None, names=colonne,
+                           usecols=['Data_Ora_Incidente'], dtype=str, encoding='utf-8')
+    return rileva_formato_data_ora(campione['Data_Ora_Incidente'])
+
+
+def leggi_intervallo_incidenti(filepath, separatore, colonne, inizio, fine, formato=FORMATO_AUTOMATICO):
+    # Eseguita in un processo separato: legge l'intervallo di byte, poi lo pulisce e tipizza
+    # con lo stesso schema della lettura su un solo processo e con il formato delle date già riconosciuto.
+    with open(filepath, 'rb') as f:
+        f.seek(inizio)
+        dati = f.read(fine - inizio)
+    df = pd.read_csv(io.BytesIO(dati), sep=separatore, header=None, names=colonne, encoding='utf-8')
+    righe_lette = len(df)
+    df, resoconto = prepara_incidenti(df, formato_data=formato)
+    return {'df': df, 'resoconto': resoconto, 'righe_lette': righe_lette, 'byte': fine - inizio, 'momenti': momenti_colonne(df)}
+
+
+def unisci_resoconti(resoconti, df):
+    # Somma i resoconti dei singoli intervalli; la memoria finale viene misurata sul DataFrame unito.
+    # Il formato delle date è lo stesso per tutti gli intervalli (rileva_formato_intervalli).
+    resoconto = {'memoria_prima': sum(r.get('memoria_prima', 0) for r in resoconti),
+                 'righe_rimosse': sum(r.get('righe_rimosse', 0) for r in resoconti),
+                 'memoria_dopo': memoria_dataframe(df)}
+    date = [r['date'] for r in resoconti if r.get('date')]
+    if date:
+        resoconto['date'] = {'formato': date[0]['formato'],
+                             'righe_formato_fisso': sum(d['righe_formato_fisso'] for d in date),
+                             'righe_inferenza': sum(d['righe_inferenza'] for d in date)}
+    return resoconto
+
+
+# --- CLASSE CHE LEGGE TUTTI I CSV DI UNA CARTELLA IN UN POOL DI PROCESSI ---
+class CaricatoreCartella(CaricatoreCSV):
+    # Ogni file viene letto e pulito da un processo del pool; il thread di caricamento raccoglie i
+    # risultati, li unisce e prepara il resoconto con righe e tempi di ciascun file.
+    def __init__(self, cartella, processi=None):
+        self.percorsi = elenca_csv(cartella)
+        super().__init__(cartella, processi=processi)
+
+    def _dimensione_totale(self):
+        return sum(os.path.getsize(percorso) for percorso in self.percorsi)
+
+    def _leggi(self):
+        try:
+            if not self.percorsi:
+                raise ValueError("La cartella non contiene file CSV.")
+            # Controlla che tutti i file abbiano le stesse colonne del primo: gli altri vengono esclusi.
+            self.fase = "Controllo intestazioni..."
+            colonne_riferimento = set(leggi_intestazione(self.percorsi[0]))
+            compatibili, esclusi = [], []
+            for percorso in self.percorsi:
+                colonne = set(leggi_intestazione(percorso))
+                if colonne == colonne_riferimento:
+                    compatibili.append(percorso)
+                else:
+                    esclusi.append({'file': os.path.basename(percorso), 'motivo': f"colonne diverse: {sorted(colonne ^ colonne_riferimento)}"})
+
+            self.fase = f"Lettura di {len(compatibili)} file..."
+            risultati = {}
+            with ProcessPoolExecutor(max_workers=self.processi) as pool:
+                futuri = {pool.submit(leggi_file_incidenti, percorso): percorso for percorso in compatibili}
+                for futuro in as_completed(futuri):
+                    if self._evento_annulla.is_set():
+                        # Annulla i file non ancora iniziati e attende solo quelli già in lettura.
+                        for altro in futuri: altro.cancel()
+                        return
+                    esito = futuro.result()
+                    risultati[esito['percorso']] = esito
+                    self.righe_lette += esito['righe_lette']
+                    self.byte_letti += os.path.getsize(esito['percorso'])
+
+            # Unisce i file nell'ordine alfabetico, con dizionari delle categorie comuni.
+            self.fase = "Unione dei file..."
+            ordinati = [risultati[percorso] for percorso in compatibili]
+            frames = unisci_categorie([esito['df'] for esito in ordinati])
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            self.fase = "Rimozione duplicati..."
+            df, duplicati = rimuovi_duplicati(df) if not df.empty else (df, 0)
+
+            self.risultato = df
+            # I momenti dei singoli file valgono per l'unione solo se nessuna riga duplicata è stata tolta.
+            self.momenti = unisci_momenti([esito['momenti'] for esito in ordinati]) if duplicati == 0 else momenti_colonne(df)
+            self.resoconto = {'righe_rimosse': sum(esito['righe_rimosse'] for esito in ordinati),
+                              'duplicati_rimossi': duplicati, 'esclusi': esclusi,
+                              'file': [{'file': os.path.basename(esito['percorso']), 'righe': len(esito['df']),
+                                        'righe_rimosse': esito['righe_rimosse'], 'secondi': esito['secondi']} for esito in ordinati]}
+        except Exception as e:
+            self.errore = e
+
+
+# --- FUNZIONE CHE DECIDE SE UN FILE È TROPPO GRANDE PER ESSERE CARICATO IN MEMORIA ---
+def richiede_fuori_memoria(filepath, frazione_ram=FRAZIONE_RAM_FUORI_MEMORIA):
+    try:
+        ram_totale = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        # Su sistemi senza sysconf (es. Windows) la scelta resta all'utente.
+        return False
+    return os.path.getsize(filepath) > frazione_ram * ram_totale
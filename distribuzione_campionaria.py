@@ -0,0 +1,93 @@
+# ==================================================================================
+# SIMULAZIONE VETTORIALE DELLA DISTRIBUZIONE CAMPIONARIA DI MEDIA, MEDIANA E VARIANZA
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import numpy as np  # Libreria per estrarre tutti i campioni come un'unica matrice e ridurla per righe.
+from bootstrap import indici_da_conteggi, indici_da_campioni, LIMITE_VALORI_DISTINTI, ELEMENTI_PER_BLOCCO  # Kernel degli indici per righe (modulo del progetto).
+
+# Statistiche calcolate su ogni campione, nell'ordine in cui vengono restituite.
+STATISTICHE_CAMPIONARIE = ('media', 'mediana', 'varianza')
+# Numero predefinito di campioni simulati.
+CAMPIONI_PREDEFINITI = 1_000
+# Frazione di probabilità attorno alla mediana usata per stimarne la densità (metodo di Siddiqui).
+DELTA_DENSITA_MEDIANA = 0.05
+
+
+# --- POSIZIONI DI UN BLOCCO DI CAMPIONI SENZA REINSERIMENTO ---
+def _posizioni_senza_reinserimento(rng, totale, n, righe):
+    # Se le coppie possibili di posizioni (n² / 2) sono poche rispetto alla popolazione, quasi tutte le righe
+    # estratte con reinserimento non hanno ripetizioni: si estrae tutta la matrice e si ripetono solo le righe
+    # con una posizione doppia. Altrimenti ogni riga è una permutazione parziale estratta a sé.
+    if n * (n - 1) / 2 > totale:
+        return np.stack([rng.choice(totale, size=n, replace=False) for _ in range(righe)])
+    posizioni = rng.integers(0, totale, size=(righe, n))
+    da_controllare = np.arange(righe)
+    while da_controllare.size:
+        ordinate = np.sort(posizioni[da_controllare], axis=1)
+        da_controllare = da_controllare[(ordinate[:, 1:] == ordinate[:, :-1]).any(axis=1)]
+        posizioni[da_controllare] = rng.integers(0, totale, size=(da_controllare.size, n))
+    return posizioni
+
+
+# --- FUNZIONE PRINCIPALE: STATISTICHE DI R CAMPIONI DI DIMENSIONE n ---
+def simula_distribuzione_campionaria(valori, n, campioni=CAMPIONI_PREDEFINITI, reinserimento=False, seed=None):
+    # Restituisce {statistica: array di 'campioni' valori} per ciascuna delle STATISTICHE_CAMPIONARIE.
+    # - pochi valori distinti: ogni campione si estrae come vettore di conteggi dei valori distinti
+    #   (multinomiale con reinserimento, ipergeometrica multivariata senza), con costo indipendente da n;
+    # - altrimenti: le R×n posizioni si estraggono a blocchi come matrice e le statistiche sono riduzioni per riga.
+    valori = np.asarray(valori, dtype=np.float64)
+    valori = valori[~np.isnan(valori)]
+    if n < 2 or (not reinserimento and n > valori.size):
+        raise ValueError(f"la dimensione del campione deve essere compresa tra 2 e {valori.size}.")
+    rng = np.random.default_rng(seed)
+    distinti, frequenze = np.unique(valori, return_counts=True)
+    parti = []
+    if distinti.size <= LIMITE_VALORI_DISTINTI:
+        per_blocco = max(1, ELEMENTI_PER_BLOCCO // distinti.size)
+        for inizio in range(0, campioni, per_blocco):
+            righe = min(per_blocco, campioni - inizio)
+            if reinserimento:
+                conteggi = rng.multinomial(n, frequenze / valori.size, size=righe)
+            else:
+                conteggi = rng.multivariate_hypergeometric(frequenze, n, size=righe, method='marginals')
+            parti.append(indici_da_conteggi(distinti, conteggi, n))
+    else:
+        per_blocco = max(1, ELEMENTI_PER_BLOCCO // n)
+        for inizio in range(0, campioni, per_blocco):
+            righe = min(per_blocco, campioni - inizio)
+            if reinserimento:
+                posizioni = rng.integers(0, valori.size, size=(righe, n))
+            else:
+                posizioni = _posizioni_senza_reinserimento(rng, valori.size, n, righe)
+            parti.append(indici_da_campioni(valori[posizioni]))
+    return {'media': np.concatenate([parte['media'] for parte in parti]),
+            'mediana': np.concatenate([parte['mediana'] for parte in parti]),
+            'varianza': np.concatenate([parte['dev_std'] for parte in parti]) ** 2}
+
+
+# --- DENSITÀ DELLA POPOLAZIONE NELLA MEDIANA ---
+def densita_mediana(quantile, quota_intervallo, delta=DELTA_DENSITA_MEDIANA):
+    # Rapporto tra la probabilità 2·delta e la distanza tra i quantili 0,5 ± delta. Restituisce None se più di
+    # una frazione 'delta' dei dati coincide con la mediana (es. numero di feriti): la mediana campionaria
+    # salta allora tra pochi valori e non ha una distribuzione approssimativamente normale.
+    mediana = quantile(0.5)
+    distanza = quantile(0.5 + delta) - quantile(0.5 - delta)
+    if distanza <= 0 or quota_intervallo(mediana, mediana) > delta: return None
+    return 2 * delta / distanza
+
+
+# --- DISTRIBUZIONI NORMALI LIMITE (TEOREMA DEL LIMITE CENTRALE) ---
+def distribuzioni_limite(indici, mediana, densita, n, reinserimento=False):
+    # 'indici' sono quelli della popolazione (AccumulatoreMomenti.indici()): numerosità N, media, M2 e M4.
+    # Restituisce {statistica: (media, errore standard)} della normale approssimante; (nan, nan) se non definita.
+    # Senza reinserimento gli errori standard sono corretti per la popolazione finita con (N - n) / (N - 1).
+    totale = indici['n']
+    sigma2, mu4 = indici['M2'] / totale, indici['M4'] / totale  # Varianza e momento centrale quarto della popolazione.
+    correzione = 1.0 if reinserimento or totale < 2 else (totale - n) / (totale - 1)
+    # La varianza campionaria (ddof=1) è corretta per sigma² con reinserimento e per N/(N-1)·sigma² senza.
+    centro_varianza = sigma2 if reinserimento or totale < 2 else sigma2 * totale / (totale - 1)
+    limite = {'media': (indici['media'], np.sqrt(sigma2 / n * correzione)),
+              'mediana': (mediana, np.sqrt(correzione / (4 * n * densita ** 2)) if densita else np.nan),
+              'varianza': (centro_varianza, np.sqrt(max(mu4 - sigma2 ** 2 * (n - 3) / (n - 1), 0) / n * correzione))}
+    return {nome: (float(centro), float(errore)) for nome, (centro, errore) in limite.items()}
@@ -0,0 +1,207 @@
+# ==================================================================================
+# MODALITÀ FUORI MEMORIA: AGGREGATI COSTRUITI A BLOCCHI PER FILE PIÙ GRANDI DELLA RAM
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import numpy as np  # Libreria per il calcolo numerico vettoriale.
+import pandas as pd  # Libreria per la manipolazione dei blocchi di dati.
+from statistiche import AccumulatoreMomenti, quantile_da_frequenze, riduci_anomali  # Indici combinabili (modulo del progetto).
+from sketch_quantili import SketchQuantili, K_SKETCH_PREDEFINITO  # Quantili approssimati combinabili (modulo del progetto).
+from tabelle_frequenze import conteggi_valori  # Conteggi con bincount per codici interi (modulo del progetto).
+
+# Oltre questo numero di valori distinti una colonna è considerata continua e non se ne tiene la tabella di frequenza.
+LIMITE_VALORI_DISTINTI = 100_000
+# Numero di righe conservate per l'anteprima nella scheda "Dati Forniti".
+RIGHE_ANTEPRIMA = 500
+# Fascia oraria considerata diurna nel Test T (estremi inclusi), come in App.esegui_ttest.
+FASCIA_DIURNA = (7, 19)
+
+
+# --- FUNZIONE PER CONTARE I VALORI DI UNA COLONNA DI UN BLOCCO ---
+def _conteggi_valori(serie):
+    # Stesso motore delle schede (bincount per categorie e interi, hash negli altri casi),
+    # senza i valori assenti e con un indice semplice, da sommare a quello dei blocchi precedenti.
+    risultato = conteggi_valori(serie)
+    risultato = risultato[risultato.to_numpy() > 0]
+    categorico = isinstance(serie.dtype, pd.CategoricalDtype)
+    risultato.index = pd.Index(risultato.index.to_numpy(), dtype=object if categorico else None)
+    risultato.name = None
+    return risultato
+
+
+# --- FUNZIONE PER CONTARE LE COPPIE DI VALORI DI DUE COLONNE ---
+def _conteggi_coppie(a, b):
+    # Restituisce una serie con indice (a, b) e il numero di righe per ciascuna coppia.
+    return pd.DataFrame({'a': a.to_numpy(), 'b': b.to_numpy()}).value_counts(sort=False)
+
+
+# --- FUNZIONE PER SOMMARE DUE SERIE DI CONTEGGI CON INDICI DIVERSI ---
+def _somma_conteggi(a, b):
+    if a is None: return b
+    return a.add(b, fill_value=0).astype(np.int64)
+
+
+# --- CLASSE CHE RIASSUME UNA COLONNA NUMERICA SENZA CONSERVARNE LE RIGHE ---
+class RiepilogoColonna:
+    def __init__(self, nome, momenti, frequenze, sketch=None):
+        self.nome = nome
+        self.momenti = momenti  # AccumulatoreMomenti con n, media, M2-M4, minimo e massimo.
+        # Tabella di frequenza ordinata per valore (None se la colonna ha troppi valori distinti).
+        self.frequenze = frequenze.sort_index() if frequenze is not None else None
+        # SketchQuantili della colonna: usato per i quantili quando manca la tabella di frequenza.
+        self.sketch = sketch
+
+    def __len__(self):
+        return self.momenti.n
+
+    @property
+    def quantili_disponibili(self):
+        return self.frequenze is not None and not self.frequenze.empty
+
+    @property
+    def quantili_approssimati(self):
+        # True se mediana e quartili vengono dallo sketch (colonna continua senza tabella di frequenza).
+        return not self.quantili_disponibili and self.sketch is not None and self.sketch.n > 0
+
+    def quantile(self, p):
+        # Esatto se c'è la tabella di frequenza completa, altrimenti approssimato dallo sketch.
+        if self.quantili_approssimati: return self.sketch.quantile(p)
+        if not self.quantili_disponibili: return np.nan
+        return quantile_da_frequenze(self.frequenze.index.to_numpy(), self.frequenze.to_numpy(), p)
+
+    def moda(self):
+        return self.frequenze.idxmax() if self.quantili_disponibili else 'N/A'
+
+    def riepilogo_box(self, etichetta='', massimo_anomali=None):
+        # Quartili e baffi dalle frequenze (regola di Tukey), come StatisticheOrdine.riepilogo_box.
+        # Ogni valore anomalo distinto viene disegnato una volta; 'n_anomali' conta anche le ripetizioni.
+        valori, conteggi = self.frequenze.index.to_numpy(dtype=np.float64), self.frequenze.to_numpy()
+        q1, mediana, q3 = self.quantile(0.25), self.quantile(0.5), self.quantile(0.75)
+        basso, alto = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        interni = valori[(valori >= basso) & (valori <= alto)]
+        fuori = (valori < basso) | (valori > alto)
+        return {'med': mediana, 'q1': q1, 'q3': q3, 'whislo': interni.min(), 'whishi': interni.max(),
+                'fliers': riduci_anomali(valori[fuori], massimo_anomali), 'label': etichetta, 'n_anomali': int(conteggi[fuori].sum())}
+
+    def scarto_medio_assoluto(self):
+        # Media degli scarti assoluti dalla media, calcolata sui valori distinti pesati per la loro frequenza.
+        if not self.quantili_disponibili: return np.nan
+        valori = self.frequenze.index.to_numpy(dtype=np.float64)
+        return float(np.sum(self.frequenze.to_numpy() * np.abs(valori - self.momenti.media)) / self.momenti.n)
+
+
+# --- CLASSE CHE ACCUMULA GLI AGGREGATI NECESSARI ALLE SCHEDE ---
+class AggregatiIncidenti:
+    # Ogni blocco del file (già pulito e tipizzato) aggiorna solo tabelle di dimensione limitata:
+    # conteggi giornalieri, tabelle di frequenza, conteggi provincia×ora e provincia×giorno e momenti.
+    # La memoria occupata dipende quindi dal numero di giorni e categorie, non dal numero di righe.
+    def __init__(self, k_sketch=K_SKETCH_PREDEFINITO):
+        self.righe = 0  # Numero di righe valide aggregate.
+        self.righe_rimosse = 0  # Righe scartate perché prive di data o provincia.
+        self.anteprima = None  # Prime righe del file, per la tabella "Dati Forniti".
+        self.conteggi_giornalieri = None  # Incidenti per giorno (indice: data normalizzata).
+        self.frequenze = {}  # Tabelle di frequenza per colonna (None se la colonna è continua).
+        self.momenti = {}  # AccumulatoreMomenti per ogni colonna numerica.
+        self.k_sketch = k_sketch  # Precisione degli sketch dei quantili (errore di rango circa 2,3/k).
+        self.sketch = {}  # SketchQuantili per ogni colonna numerica (circa 3·k valori ciascuno).
+        self.provincia_ora = None  # Incidenti per (Provincia, Ora).
+        self.provincia_giorno = None  # Incidenti per (Provincia, giorno).
+        self.feriti_fascia = {'diurno': AccumulatoreMomenti(), 'notturno': AccumulatoreMomenti()}  # Per il Test T.
+
+    # --- AGGIORNAMENTO CON UN NUOVO BLOCCO ---
+    def aggiorna(self, blocco):
+        if blocco.empty: return self
+        self.righe += len(blocco)
+        if self.anteprima is None or len(self.anteprima) < RIGHE_ANTEPRIMA:
+            self.anteprima = pd.concat([self.anteprima, blocco.head(RIGHE_ANTEPRIMA)]).head(RIGHE_ANTEPRIMA) if self.anteprima is not None else blocco.head(RIGHE_ANTEPRIMA).copy()
+
+        giorni = blocco['Data_Ora_Incidente'].dt.normalize()
+        self.conteggi_giornalieri = _somma_conteggi(self.conteggi_giornalieri, giorni.value_counts())
+
+        # Tabelle di frequenza e momenti per tutte le colonne diverse dalla data.
+        for col in blocco.columns:
+            if col == 'Data_Ora_Incidente': continue
+            serie = blocco[col]
+            if pd.api.types.is_numeric_dtype(serie.dtype):
+                valori = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+                self.momenti.setdefault(col, AccumulatoreMomenti()).unisci(AccumulatoreMomenti.da_array(valori))
+                self.sketch.setdefault(col, SketchQuantili(self.k_sketch)).aggiorna(valori)
+            if col in self.frequenze and self.frequenze[col] is None: continue
+            conteggi = _somma_conteggi(self.frequenze.get(col), _conteggi_valori(serie))
+            # Una colonna con troppi valori distinti farebbe crescere la memoria senza limite: la sua tabella viene abbandonata.
+            self.frequenze[col] = conteggi if len(conteggi) <= LIMITE_VALORI_DISTINTI else None
+
+        # Conteggi per provincia e ora (modello di Poisson) e per provincia e giorno (Poisson e intervallo di confidenza).
+        province = blocco['Provincia'].astype(object)
+        self.provincia_giorno = _somma_conteggi(self.provincia_giorno, _conteggi_coppie(province, giorni))
+        if 'Ora' in blocco.columns:
+            self.provincia_ora = _somma_conteggi(self.provincia_ora, _conteggi_coppie(province, blocco['Ora']))
+        # Momenti del numero di feriti per fascia diurna e notturna (Test T di Welch).
+        if 'Numero_Feriti' in blocco.columns and 'Ora' in blocco.columns:
+            diurno = blocco['Ora'].between(*FASCIA_DIURNA).to_numpy()
+            feriti = blocco['Numero_Feriti'].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.feriti_fascia['diurno'].unisci(AccumulatoreMomenti.da_array(feriti[diurno]))
+            self.feriti_fascia['notturno'].unisci(AccumulatoreMomenti.da_array(feriti[~diurno]))
+        return self
+
+    # --- UNIONE CON GLI AGGREGATI DI UN'ALTRA PARTE DEI DATI ---
+    def unisci(self, altro):
+        self.righe += altro.righe
+        self.righe_rimosse += altro.righe_rimosse
+        if self.anteprima is None or len(self.anteprima) < RIGHE_ANTEPRIMA:
+            self.anteprima = pd.concat([self.anteprima, altro.anteprima]).head(RIGHE_ANTEPRIMA) if self.anteprima is not None else altro.anteprima
+        self.conteggi_giornalieri = _somma_conteggi(self.conteggi_giornalieri, altro.conteggi_giornalieri)
+        for col, conteggi in altro.frequenze.items():
+            if conteggi is None or (col in self.frequenze and self.frequenze[col] is None):
+                self.frequenze[col] = None
+                continue
+            unione = _somma_conteggi(self.frequenze.get(col), conteggi)
+            self.frequenze[col] = unione if len(unione) <= LIMITE_VALORI_DISTINTI else None
+        for col, momenti in altro.momenti.items():
+            self.momenti.setdefault(col, AccumulatoreMomenti()).unisci(momenti)
+        for col, sketch in altro.sketch.items():
+            self.sketch.setdefault(col, SketchQuantili(self.k_sketch)).unisci(sketch)
+        self.provincia_giorno = _somma_conteggi(self.provincia_giorno, altro.provincia_giorno)
+        self.provincia_ora = _somma_conteggi(self.provincia_ora, altro.provincia_ora)
+        for fascia, momenti in altro.feriti_fascia.items():
+            self.feriti_fascia[fascia].unisci(momenti)
+        return self
+
+    # --- INTERROGAZIONI USATE DALLE SCHEDE ---
+    @property
+    def province(self):
+        frequenze = self.frequenze.get('Provincia')
+        return sorted(frequenze.index.tolist()) if frequenze is not None else []
+
+    def conteggi_temporali(self, tipo_aggregazione):
+        # Ricava i conteggi annuali e mensili da quelli giornalieri, come in App.analisi_speciale_data_ora.
+        giornalieri = self.conteggi_giornalieri.sort_index()
+        if tipo_aggregazione == 'Annuale':
+            return giornalieri.groupby(giornalieri.index.year).sum()
+        if tipo_aggregazione == 'Mensile':
+            mensili = giornalieri.groupby(giornalieri.index.to_period('M')).sum()
+            mensili.index = mensili.index.strftime('%Y-%m')
+            return mensili
+        giornalieri.index = giornalieri.index.date
+        return giornalieri
+
+    def frequenze_colonna(self, col):
+        return self.frequenze.get(col)
+
+    def riepilogo(self, col):
+        return RiepilogoColonna(col, self.momenti[col], self.frequenze.get(col), self.sketch.get(col))
+
+    def incidenti_giornalieri_provincia(self, provincia):
+        # Numero di incidenti per ciascun giorno con almeno un incidente nella provincia.
+        if self.provincia_giorno is None or provincia not in self.provincia_giorno.index.get_level_values(0):
+            return pd.Series(dtype=np.int64)
+        return self.provincia_giorno.xs(provincia, level=0)
+
+    def conteggi_poisson(self, provincia, ora_inizio, ora_fine):
+        # Restituisce (incidenti nella fascia oraria, giorni osservati) per la provincia.
+        giorni_osservati = len(self.incidenti_giornalieri_provincia(provincia))
+        if self.provincia_ora is None or provincia not in self.provincia_ora.index.get_level_values(0):
+            return 0, giorni_osservati
+        per_ora = self.provincia_ora.xs(provincia, level=0)
+        ore = per_ora.index.to_numpy()
+        return int(per_ora[(ore >= ora_inizio) & (ore <= ora_fine)].sum()), giorni_osservati
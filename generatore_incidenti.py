@@ -0,0 +1,73 @@
+# ==================================================================================
+# GENERATORE VETTORIALE DI INCIDENTI SIMULATI (NumPy, riproducibile tramite seed)
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+from datetime import datetime  # Modulo per stabilire l'intervallo temporale simulato.
+import numpy as np  # Libreria per generare intere colonne di valori casuali in un colpo solo.
+import pandas as pd  # Libreria per restituire le colonne generate come DataFrame.
+
+# Valori possibili delle variabili categoriche.
+PROVINCE = ['Milano', 'Roma', 'Napoli', 'Torino', 'Firenze', 'Catania', 'Salerno', 'Bologna', 'Venezia', 'Bari']
+TIPI_STRADA = ['Urbana', 'Statale', 'Autostrada']
+GIORNI_SETTIMANA = ['Lunedì', 'Martedì', 'Mercoledì', 'Giovedì', 'Venerdì', 'Sabato', 'Domenica']
+# Intervallo di velocità (estremi inclusi) per ciascun tipo di strada, nello stesso ordine di TIPI_STRADA.
+VELOCITA_MINIME = np.array([30, 60, 100])
+VELOCITA_MASSIME = np.array([65, 95, 140])
+# Valori e pesi del numero di morti e di feriti (molto più probabile che i morti siano 0).
+MORTI, PESI_MORTI = np.array([0, 1, 2, 3]), np.array([94, 4, 1.5, 0.5])
+FERITI, PESI_FERITI = np.array([0, 1, 2, 3, 4, 5]), np.array([10, 40, 25, 15, 5, 5])
+# Velocità minima quando la velocità è uniforme fino a un massimo indicato (generatore interattivo).
+VELOCITA_MINIMA_UNIFORME = 30
+# Probabilità che il tipo di strada (e quindi la velocità) sia mancante.
+QUOTA_STRADA_MANCANTE = 0.05
+# Ampiezza predefinita dell'intervallo temporale simulato, in giorni.
+GIORNI_PREDEFINITI = 730
+
+
+# --- FUNZIONE CHE GENERA UN DATAFRAME DI INCIDENTI SIMULATI ---
+def genera_incidenti(num_righe, seed=None, fine=None, giorni=GIORNI_PREDEFINITI, province=PROVINCE, tipi_strada=TIPI_STRADA,
+                     quota_strada_mancante=QUOTA_STRADA_MANCANTE, massimo_feriti=None, massimo_morti=None, velocita_massima=None):
+    # Ogni colonna viene generata come array intero, senza cicli Python sulle righe.
+    # Con lo stesso 'seed' (e la stessa 'fine') si ottengono sempre gli stessi dati.
+    # 'seed' può essere anche un np.random.Generator già creato, per generare più blocchi di fila.
+    # 'tipi_strada' sono le etichette dei tre tipi di strada, nello stesso ordine di TIPI_STRADA (e delle velocità).
+    # Se sono indicati 'massimo_feriti', 'massimo_morti' o 'velocita_massima', le rispettive colonne non seguono più
+    # le distribuzioni ponderate ma sono uniformi fino al massimo, come nel generatore interattivo originale.
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    fine = np.datetime64(fine or datetime.now(), 's')
+    inizio = fine - np.timedelta64(giorni * 86400, 's')
+
+    # Data e ora: secondi casuali nell'intervallo, sommati alla data di inizio.
+    secondi = rng.integers(0, giorni * 86400, size=num_righe, endpoint=True)
+    date = inizio + secondi.astype('timedelta64[s]')
+    # Giorno della settimana ricavato dalla data: il 1° gennaio 1970 era un giovedì (indice 3 se Lunedì = 0).
+    giorno = (date.astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+    # Tipo di strada con una quota di valori mancanti (codice -1) e velocità dipendente dal tipo.
+    codici_strada = rng.integers(0, len(TIPI_STRADA), size=num_righe)
+    codici_strada[rng.random(num_righe) < quota_strada_mancante] = -1
+    velocita = rng.integers(VELOCITA_MINIME[codici_strada], VELOCITA_MASSIME[codici_strada], endpoint=True).astype(np.float64)
+    if velocita_massima is not None:
+        # Con una velocità massima indicata, velocità uniforme tra VELOCITA_MINIMA_UNIFORME e il massimo (estremi inclusi).
+        velocita = rng.integers(VELOCITA_MINIMA_UNIFORME, velocita_massima, size=num_righe, endpoint=True).astype(np.float64)
+    velocita[codici_strada < 0] = np.nan
+
+    if massimo_feriti is None and massimo_morti is None:
+        # Morti e feriti estratti con probabilità ponderate; se ci sono morti, ci sono almeno altrettanti feriti.
+        morti = rng.choice(MORTI, size=num_righe, p=PESI_MORTI / PESI_MORTI.sum())
+        feriti = rng.choice(FERITI, size=num_righe, p=PESI_FERITI / PESI_FERITI.sum()) + morti
+    else:
+        # Con i massimi indicati, morti e feriti uniformi tra 0 e il massimo (estremi inclusi), indipendenti tra loro.
+        morti = rng.integers(0, massimo_morti if massimo_morti is not None else MORTI.max(), size=num_righe, endpoint=True)
+        feriti = rng.integers(0, massimo_feriti if massimo_feriti is not None else FERITI.max(), size=num_righe, endpoint=True)
+
+    return pd.DataFrame({
+        'Data_Ora_Incidente': date,
+        'Provincia': pd.Categorical.from_codes(rng.integers(0, len(province), size=num_righe), categories=province),
+        'Giorno_Settimana': pd.Categorical.from_codes(giorno, categories=GIORNI_SETTIMANA),
+        'Tipo_Strada': pd.Categorical.from_codes(codici_strada, categories=tipi_strada),
+        'Numero_Feriti': feriti,
+        'Numero_Morti': morti,
+        'Velocita_Media_Stimata': velocita,
+    })
@@ -11,10 +11,22 @@ import numpy as np  # Libreria per il calcolo numerico, utilizzata per operazion
 from scipy import stats  # Sottomodulo della libreria SciPy che fornisce un'ampia gamma di funzioni statistiche.
 import matplotlib.pyplot as plt  # Libreria per la creazione di grafici e visualizzazioni statiche.
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # Modulo per integrare i grafici Matplotlib in applicazioni Tkinter.
-import random  # Modulo per la generazione di numeri casuali, usato per creare dati di esempio.
-from datetime import datetime, timedelta, date  # Moduli per la gestione di date e orari.
-import collections  # Fornisce strutture dati specializzate, non usato esplicitamente ma utile per conteggi.
 import locale  # Modulo per la gestione delle impostazioni internazionali (es. lingua per nomi di giorni/mesi).
+import os  # Modulo per la gestione dei percorsi dei file.
+import time  # Modulo per misurare la durata dei calcoli più lunghi (es. intervalli bootstrap).
+import threading  # Modulo per calcolare gli intervalli bootstrap su un thread separato da quello dell'interfaccia.
+from caricamento import CaricatoreCSV, CaricatoreAggregati, CaricatoreCartella, CaricatoreCampione, richiede_fuori_memoria  # Lettori CSV a blocchi su thread separato (modulo del progetto).
+from fuori_memoria import RiepilogoColonna  # Riepilogo di una colonna in modalità fuori memoria (modulo del progetto).
+from statistiche import AccumulatoreMomenti, scarto_medio_assoluto, StatisticheOrdine, quota_intervallo_da_frequenze  # Kernel dei momenti e statistiche d'ordine (modulo del progetto).
+from cache_colonnare import CacheColonnare  # Cache su disco in formato colonnare (modulo del progetto).
+from cache_risultati import CacheRisultati, impronta_dataframe  # Cache LRU dei risultati delle analisi (modulo del progetto).
+from bootstrap import intervalli_bootstrap, REPLICHE_PREDEFINITE, REPLICHE_MINIME, LIVELLO_PREDEFINITO  # Intervalli di confidenza bootstrap (modulo del progetto).
+from distribuzione_campionaria import simula_distribuzione_campionaria, densita_mediana, distribuzioni_limite, STATISTICHE_CAMPIONARIE, CAMPIONI_PREDEFINITI  # Simulazione della distribuzione campionaria (modulo del progetto).
+from campionamento import IndiceGruppi, stima_con_disegno, DISEGNI_CAMPIONAMENTO  # Disegni stratificati e a grappoli (modulo del progetto).
+from tabelle_frequenze import conteggi_valori, tabella_frequenze  # Tabelle di frequenza con bincount (modulo del progetto).
+from schema_incidenti import prepara_incidenti, a_tipo_numpy  # Pulizia e tipizzazione compatta delle colonne (modulo del progetto).
+from generatore_incidenti import genera_incidenti  # Generatore vettoriale di dati simulati (modulo del progetto).
+from tabella_virtuale import TabellaVirtuale, formatta_righe  # Tabella che mostra solo le righe visibili (modulo del progetto).
 
 # --- IMPOSTAZIONE DELLA LINGUA ITALIANA ---
 # Tenta di impostare la localizzazione in italiano per visualizzare correttamente nomi di mesi e giorni.
@@ -30,6 +42,21 @@ except locale.Error:
 # =============================================================================
 # Imposta il tema dell'applicazione (System, Light, Dark). "System" si adatta a quello del sistema operativo.
 customtkinter.set_appearance_mode("System")
+# Numero di righe inserite in una tabella a ogni passo del ciclo dell'interfaccia.
+RIGHE_PER_LOTTO = 500
+# Valore massimo di k e numero di punti della curva di Chebyshev (teorica ed effettiva).
+K_MASSIMO_CURVA_CHEBYSHEV = 5.0
+PUNTI_CURVA_CHEBYSHEV = 200
+# Oltre questo numero di classi l'istogramma viene disegnato come contorno a gradini invece che a barre.
+BARRE_MASSIME_ISTOGRAMMA = 50
+# Numero massimo di valori anomali disegnati in ciascun box plot (gli estremi restano, gli altri sono campionati).
+ANOMALI_MASSIMI_BOX_PLOT = 500
+# Tipi di campione estraibili direttamente da un file: nome mostrato -> (modo del serbatoio, colonna dei pesi).
+TIPI_CAMPIONE_FILE = {"Uniforme": ('uniforme', None),
+                      "Stratificato per Provincia (proporzionale)": ('stratificato', None),
+                      "Pesato per Numero_Feriti": ('pesato', 'Numero_Feriti'),
+                      "Pesato per Numero_Morti": ('pesato', 'Numero_Morti')}
+
 # Imposta il tema di colori predefinito per i widget (es. bottoni, slider).
 customtkinter.set_default_color_theme("blue")
 
@@ -52,10 +79,28 @@ class App(customtkinter.CTk):
         self.grid_rowconfigure(1, weight=1)
         # Inizializza l'attributo 'df' a None. Conterrà il DataFrame di pandas con i dati caricati.
         self.df = None
+        # Aggregati del file in modalità fuori memoria (None quando i dati sono caricati interamente in 'df').
+        self.aggregati = None
         # Inizializza il valore 'k' per la disuguaglianza di Chebyshev. Sarà modificabile dall'utente.
         self.k_val_sheby = 2.0
+        # Numero di repliche e seme degli intervalli di confidenza bootstrap, modificabili dall'utente.
+        self.repliche_bootstrap = REPLICHE_PREDEFINITE
+        self.seme_bootstrap = 42
         # Inizializza una lista vuota per tenere traccia dei widget dei grafici, per poterli poi eliminare correttamente.
         self.matplotlib_widgets = []
+        # Caricatore CSV in background attualmente attivo (None se nessun caricamento è in corso).
+        self.caricatore = None
+        # Cache su disco dei DataFrame già puliti, indicizzata per percorso, dimensione, data e contenuto del CSV.
+        self.cache_colonnare = CacheColonnare()
+        # Cache in memoria dei risultati delle analisi, con le chiavi legate alla versione e all'impronta del dataset.
+        self.cache_risultati = CacheRisultati()
+        self.versione_dati = 0  # Aumenta a ogni nuovo caricamento.
+        self.impronta_dati = None  # Impronta del dataset corrente (righe, colonne, tipi e hash delle righe estreme).
+
+        # Applica una sola volta lo stile di tutte le tabelle (Treeview) dell'applicazione.
+        style = ttk.Style()
+        style.configure("Treeview", rowheight=25, font=('Calibri', 11))
+        style.configure("Treeview.Heading", font=('Calibri', 12, 'bold'))
 
         # Chiama i metodi per configurare i vari pezzi dell'interfaccia.
         self.setup_loading_frame()
@@ -70,7 +115,7 @@ class App(customtkinter.CTk):
         # Posiziona il frame nella griglia della finestra principale.
         self.frame_caricamento.grid(row=0, column=0, padx=20, pady=20, sticky="ew")
         # Configura le colonne del frame di caricamento affinché si espandano in modo uniforme.
-        self.frame_caricamento.grid_columnconfigure((0, 1, 2), weight=1)
+        self.frame_caricamento.grid_columnconfigure((0, 1, 2, 3, 4, 5), weight=1)
         # Crea un'etichetta per mostrare lo stato del file caricato.
         self.label_file = customtkinter.CTkLabel(self.frame_caricamento, text="Nessun dato caricato.", text_color="gray")
         # Posiziona l'etichetta nella griglia del suo frame.
@@ -79,10 +124,50 @@ class App(customtkinter.CTk):
         self.bottone_carica_csv = customtkinter.CTkButton(self.frame_caricamento, text="Carica File CSV", command=self.carica_csv)
         # Posiziona il bottone nella griglia.
         self.bottone_carica_csv.grid(row=0, column=1, padx=20, pady=20)
+        # Crea il bottone per caricare insieme tutti i file CSV di una cartella.
+        self.bottone_carica_cartella = customtkinter.CTkButton(self.frame_caricamento, text="Carica Cartella", command=self.carica_cartella)
+        self.bottone_carica_cartella.grid(row=0, column=2, padx=20, pady=20)
         # Crea il bottone per usare dati di esempio generati casualmente.
         self.bottone_dati_esempio = customtkinter.CTkButton(self.frame_caricamento, text="Usa Dati Simulati", command=self.carica_dati_esempio)
         # Posiziona il bottone nella griglia.
-        self.bottone_dati_esempio.grid(row=0, column=2, padx=20, pady=20)
+        self.bottone_dati_esempio.grid(row=0, column=3, padx=20, pady=20)
+
+        # Crea il bottone per svuotare la cache su disco dei file già caricati.
+        self.bottone_svuota_cache = customtkinter.CTkButton(self.frame_caricamento, text="Svuota Cache", command=self.svuota_cache, fg_color="gray")
+        self.bottone_svuota_cache.grid(row=0, column=4, padx=20, pady=20)
+
+        # Crea la casella per forzare la modalità fuori memoria (solo aggregati, per file più grandi della RAM).
+        self.var_fuori_memoria = tkinter.BooleanVar(value=False)
+        self.checkbox_fuori_memoria = customtkinter.CTkCheckBox(self.frame_caricamento, text="Modalità fuori memoria", variable=self.var_fuori_memoria)
+        self.checkbox_fuori_memoria.grid(row=0, column=5, padx=20, pady=20)
+
+        # Etichetta con i contatori della cache dei risultati (riusati/calcolati, voci e memoria occupata).
+        self.label_cache_risultati = customtkinter.CTkLabel(self.frame_caricamento, text="", text_color="gray", font=customtkinter.CTkFont(size=11))
+        self.label_cache_risultati.grid(row=2, column=0, columnspan=6, padx=20, pady=(0, 5), sticky="w")
+
+        # Riga per estrarre un campione di n righe da un file troppo grande da caricare, leggendolo una sola volta.
+        frame_campione_file = customtkinter.CTkFrame(self.frame_caricamento, fg_color="transparent")
+        frame_campione_file.grid(row=3, column=0, columnspan=6, padx=20, pady=(0, 10), sticky="w")
+        customtkinter.CTkLabel(frame_campione_file, text="Campione da file - righe (n):").pack(side="left")
+        self.entry_righe_campione_file = customtkinter.CTkEntry(frame_campione_file, width=100)
+        self.entry_righe_campione_file.insert(0, "100000")
+        self.entry_righe_campione_file.pack(side="left", padx=(5, 10))
+        customtkinter.CTkLabel(frame_campione_file, text="Tipo:").pack(side="left")
+        self.selettore_tipo_campione_file = customtkinter.CTkComboBox(frame_campione_file, values=list(TIPI_CAMPIONE_FILE), state="readonly", width=260)
+        self.selettore_tipo_campione_file.set(next(iter(TIPI_CAMPIONE_FILE)))
+        self.selettore_tipo_campione_file.pack(side="left", padx=(5, 10))
+        self.bottone_campione_file = customtkinter.CTkButton(frame_campione_file, text="Estrai Campione da File", command=self.carica_campione_file)
+        self.bottone_campione_file.pack(side="left")
+
+        # Crea il frame (inizialmente nascosto) con barra di avanzamento e bottone per annullare il caricamento.
+        self.frame_avanzamento = customtkinter.CTkFrame(self.frame_caricamento, fg_color="transparent")
+        self.frame_avanzamento.grid_columnconfigure(0, weight=1)
+        self.barra_caricamento = customtkinter.CTkProgressBar(self.frame_avanzamento)
+        self.barra_caricamento.grid(row=0, column=0, padx=(0, 10), sticky="ew")
+        self.label_avanzamento = customtkinter.CTkLabel(self.frame_avanzamento, text="", text_color="gray")
+        self.label_avanzamento.grid(row=0, column=1, padx=10)
+        self.bottone_annulla_caricamento = customtkinter.CTkButton(self.frame_avanzamento, text="Annulla", command=self.annulla_caricamento, width=90)
+        self.bottone_annulla_caricamento.grid(row=0, column=2, padx=(10, 0))
 
     # --- CONFIGURAZIONE DELLA VISTA A SCHEDE (TAB) ---
     def setup_tab_view(self):
@@ -104,29 +189,113 @@ class App(customtkinter.CTk):
 
     # --- FUNZIONE PER CARICARE DATI DA FILE CSV ---
     def carica_csv(self):
+        # Se è già in corso un caricamento, non ne avvia un secondo.
+        if self.caricatore is not None and self.caricatore.in_corso: return
         # Apre una finestra di dialogo per permettere all'utente di selezionare un file CSV.
         filepath = filedialog.askopenfilename(title="Seleziona un file CSV", filetypes=(("File CSV", "*.csv"), ("Tutti i file", "*.*")))
         # Se l'utente non seleziona un file e chiude la finestra, la funzione termina.
         if not filepath: return
-        # Inizia un blocco try-except per gestire eventuali errori durante la lettura del file.
+        # Inizia un blocco try-except per gestire eventuali errori nell'apertura del file.
         try:
-            # Prova a leggere il file CSV assumendo che il separatore sia il punto e virgola ';'.
-            try:
-                df = pd.read_csv(filepath, sep=';')
-                # Se dopo la lettura con ';' il DataFrame ha una sola colonna, è probabile che il separatore fosse la virgola ','.
-                if df.shape[1] == 1:
-                    # Rilegge lo stesso file usando la virgola come separatore.
-                    df = pd.read_csv(filepath, sep=',')
-            # Se il primo tentativo di lettura fallisce (es. per un errore di parsing), prova direttamente con la virgola.
-            except:
-                 df = pd.read_csv(filepath, sep=',')
+            # Crea il caricatore: il separatore viene riconosciuto dai primi KB e il file letto a blocchi in background.
+            # I file più grandi della RAM (o se richiesto dall'utente) vengono ridotti ai soli aggregati.
+            if self.var_fuori_memoria.get() or richiede_fuori_memoria(filepath):
+                self.caricatore = CaricatoreAggregati(filepath)
+            else:
+                self.caricatore = CaricatoreCSV(filepath, cache=self.cache_colonnare)
+            self.caricatore.avvia()
+        except Exception as e:
+            self.label_file.configure(text=f"Errore nel caricamento: {e}", text_color="red")
+            return
+        # Mostra barra di avanzamento e bottone "Annulla", disabilitando i bottoni di caricamento.
+        self._mostra_avanzamento_caricamento(True)
+        # Avvia il controllo periodico dello stato del thread di lettura.
+        self.after(100, self._controlla_caricamento)
+
+    # --- FUNZIONE PER CARICARE TUTTI I FILE CSV DI UNA CARTELLA ---
+    def carica_cartella(self):
+        if self.caricatore is not None and self.caricatore.in_corso: return
+        # Apre una finestra di dialogo per selezionare la cartella.
+        cartella = filedialog.askdirectory(title="Seleziona una cartella di file CSV")
+        if not cartella: return
+        try:
+            # I file vengono letti e puliti in parallelo da un pool di processi, poi uniti in un solo DataFrame.
+            self.caricatore = CaricatoreCartella(cartella)
+            self.caricatore.avvia()
+        except Exception as e:
+            self.label_file.configure(text=f"Errore nel caricamento: {e}", text_color="red")
+            return
+        self._mostra_avanzamento_caricamento(True)
+        self.after(100, self._controlla_caricamento)
 
+    # --- FUNZIONE PER ESTRARRE UN CAMPIONE DA UN FILE CSV SENZA CARICARLO ---
+    def carica_campione_file(self):
+        if self.caricatore is not None and self.caricatore.in_corso: return
+        try:
+            n = int(self.entry_righe_campione_file.get())
+            if n <= 0: raise ValueError
+        except ValueError:
+            self.label_file.configure(text="Errore: inserire un numero intero positivo di righe per il campione.", text_color="orange")
+            return
+        filepath = filedialog.askopenfilename(title="Seleziona il file CSV da cui estrarre il campione", filetypes=(("File CSV", "*.csv"), ("Tutti i file", "*.*")))
+        if not filepath: return
+        modo, colonna_pesi = TIPI_CAMPIONE_FILE[self.selettore_tipo_campione_file.get()]
+        try:
+            # Il file viene letto una sola volta a blocchi: in memoria restano solo il blocco corrente e il serbatoio.
+            self.caricatore = CaricatoreCampione(filepath, n, modo, colonna_pesi)
+            self.caricatore.avvia()
+        except Exception as e:
+            self.label_file.configure(text=f"Errore nel caricamento: {e}", text_color="red")
+            return
+        self._mostra_avanzamento_caricamento(True)
+        self.after(100, self._controlla_caricamento)
+
+    # --- FUNZIONE CHE AGGIORNA L'AVANZAMENTO DEL CARICAMENTO IN BACKGROUND ---
+    def _controlla_caricamento(self):
+        caricatore = self.caricatore
+        if caricatore is None: return
+        # Aggiorna barra e testo con le righe e i MB letti finora.
+        mb_letti, mb_totali = caricatore.byte_letti / 1e6, caricatore.byte_totali / 1e6
+        self.barra_caricamento.set(caricatore.frazione_letta)
+        self.label_avanzamento.configure(text=f"{caricatore.fase} {caricatore.righe_lette:,} righe | {mb_letti:.1f} / {mb_totali:.1f} MB")
+        # Se il thread sta ancora leggendo, ricontrolla tra 100 ms.
+        if caricatore.in_corso:
+            self.after(100, self._controlla_caricamento)
+            return
+        # Lettura terminata: nasconde i controlli di avanzamento.
+        self.caricatore = None
+        self._mostra_avanzamento_caricamento(False)
+        if caricatore.annullato:
+            self.label_file.configure(text="Caricamento annullato.", text_color="orange")
+        elif caricatore.errore is not None:
+            self.label_file.configure(text=f"Errore nel caricamento: {caricatore.errore}", text_color="red")
+        elif isinstance(caricatore, CaricatoreCartella):
+            # Cartella: consegna il DataFrame unito e il resoconto per file.
+            self.after(0, self._completa_caricamento_cartella, caricatore.filepath, caricatore.risultato, caricatore.resoconto, caricatore.momenti)
+        elif isinstance(caricatore, CaricatoreCampione):
+            # Campione estratto dal file: viene analizzato in tutte le schede come un dataset caricato.
+            self.after(0, self._completa_caricamento_campione, caricatore.filepath, caricatore.risultato, caricatore.resoconto, caricatore.momenti)
+        elif isinstance(caricatore, CaricatoreAggregati):
+            # In modalità fuori memoria consegna gli aggregati invece del DataFrame.
+            self.after(0, self._completa_caricamento_aggregati, caricatore.filepath, caricatore.risultato)
+        else:
+            # Consegna il DataFrame al thread dell'interfaccia, che lo elabora con inizializza_dati.
+            self.after(0, self._completa_caricamento_csv, caricatore.filepath, caricatore.risultato, caricatore.resoconto, caricatore.da_cache, caricatore.momenti)
+
+    # --- FUNZIONE CHE PASSA IL DATAFRAME LETTO ALL'INIZIALIZZAZIONE ---
+    def _completa_caricamento_csv(self, filepath, df, resoconto, da_cache, momenti=None):
+        try:
             # Estrae solo il nome del file dal percorso completo.
-            filename = filepath.split('/')[-1]
+            filename = os.path.basename(filepath)
             # Aggiorna l'etichetta mostrando il nome del file e il numero di record caricati.
-            self.label_file.configure(text=f"Caricato: {filename} ({len(df)} record)", text_color='white')
-            # Chiama la funzione per inizializzare e pre-elaborare i dati del DataFrame.
-            self.inizializza_dati(df)
+            origine = " dalla cache" if da_cache else ""
+            testo, colore = f"Caricato{origine}: {filename} ({len(df)} record)", 'white'
+            # Un errore di scrittura della cache non blocca l'analisi, ma viene segnalato accanto all'esito.
+            if resoconto.get('cache_errore'):
+                testo, colore = f"{testo} - cache non salvata: {resoconto['cache_errore']}", 'orange'
+            self.label_file.configure(text=testo, text_color=colore)
+            # Chiama la funzione per inizializzare i dati (già puliti e tipizzati dal caricatore).
+            self.inizializza_dati(df, resoconto=resoconto, momenti=momenti)
             # Imposta la vista sulla scheda "Dati Forniti" per mostrare subito i dati caricati.
             self.tab_view.set("Dati Forniti")
         # Se si verifica un qualsiasi errore durante il processo, lo cattura.
@@ -134,51 +303,89 @@ class App(customtkinter.CTk):
             # Aggiorna l'etichetta per mostrare un messaggio di errore.
             self.label_file.configure(text=f"Errore nel caricamento: {e}", text_color="red")
 
+    # --- FUNZIONE CHE PASSA I DATI DI UNA CARTELLA ALL'INIZIALIZZAZIONE ---
+    def _completa_caricamento_cartella(self, cartella, df, resoconto, momenti=None):
+        try:
+            nome = os.path.basename(os.path.normpath(cartella))
+            self.label_file.configure(text=f"Caricata cartella: {nome} ({len(resoconto['file'])} file, {len(df)} record)", text_color='white')
+            self.inizializza_dati(df, resoconto=resoconto, momenti=momenti)
+            self.tab_view.set("Dati Forniti")
+            # Resoconto con righe e tempo di lettura di ogni file, file esclusi e duplicati rimossi.
+            righe_file = [f"- {voce['file']}: {voce['righe']:,} righe ({voce['righe_rimosse']} scartate) in {voce['secondi']:.2f} s" for voce in resoconto['file']]
+            righe_esclusi = [f"- {voce['file']}: {voce['motivo']}" for voce in resoconto['esclusi']] or ["- nessuno"]
+            messaggio = ("File caricati:\n" + "\n".join(righe_file) +
+                         "\n\nFile esclusi (intestazione incompatibile):\n" + "\n".join(righe_esclusi) +
+                         f"\n\nRighe duplicate rimosse: {resoconto['duplicati_rimossi']:,}"
+                         f"\nRighe scartate (data o provincia mancanti): {resoconto['righe_rimosse']:,}"
+                         f"\nTotale righe: {len(df):,}")
+            self.show_info("Resoconto Caricamento Cartella", messaggio)
+        except Exception as e:
+            self.label_file.configure(text=f"Errore nel caricamento: {e}", text_color="red")
+
+    # --- FUNZIONE CHE PASSA IL CAMPIONE ESTRATTO DA UN FILE ALL'INIZIALIZZAZIONE ---
+    def _completa_caricamento_campione(self, filepath, df, resoconto, momenti=None):
+        try:
+            filename = os.path.basename(filepath)
+            tipo = {'uniforme': "uniforme", 'stratificato': "stratificato per provincia",
+                    'pesato': f"pesato per {resoconto.get('colonna_pesi')}"}.get(resoconto.get('modo'), "")
+            self.label_file.configure(text=f"Campione {tipo}: {filename} ({len(df):,} di {resoconto['popolazione']:,} record)", text_color='white')
+            self.inizializza_dati(df, resoconto=resoconto, momenti=momenti)
+            self.tab_view.set("Dati Forniti")
+            if resoconto.get('modo') == 'pesato':
+                # Le righe con peso maggiore sono sovrarappresentate: le analisi descrivono il campione, non il file.
+                self.show_info("Campione Pesato", f"Ogni riga è stata estratta con probabilità proporzionale a '{resoconto['colonna_pesi']}' "
+                               "(le righe con valore nullo o mancante sono escluse). Medie e frequenze calcolate su questo campione "
+                               "descrivono quindi gli incidenti più gravi e non sono stime dirette dei valori dell'intero file.")
+        except Exception as e:
+            self.label_file.configure(text=f"Errore nel caricamento: {e}", text_color="red")
+
+    # --- FUNZIONE CHE PASSA GLI AGGREGATI DELLA MODALITÀ FUORI MEMORIA ALL'INTERFACCIA ---
+    def _completa_caricamento_aggregati(self, filepath, aggregati):
+        try:
+            filename = os.path.basename(filepath)
+            self.label_file.configure(text=f"Aggregato (fuori memoria): {filename} ({aggregati.righe} record)", text_color='white')
+            self.inizializza_aggregati(aggregati)
+            self.tab_view.set("Dati Forniti")
+        except Exception as e:
+            self.label_file.configure(text=f"Errore nel caricamento: {e}", text_color="red")
+
+    # --- FUNZIONE PER ANNULLARE IL CARICAMENTO IN CORSO ---
+    def annulla_caricamento(self):
+        if self.caricatore is not None:
+            self.caricatore.annulla()
+            self.label_avanzamento.configure(text="Annullamento in corso...")
+
+    # --- FUNZIONE PER SVUOTARE LA CACHE SU DISCO ---
+    def svuota_cache(self):
+        try:
+            liberati = self.cache_colonnare.svuota()
+            self.label_file.configure(text=f"Cache svuotata: liberati {liberati / 1e6:.1f} MB.", text_color="gray")
+        except OSError as e:
+            self.label_file.configure(text=f"Errore nello svuotamento della cache: {e}", text_color="red")
+
+    # --- FUNZIONE PER MOSTRARE/NASCONDERE I CONTROLLI DI AVANZAMENTO ---
+    def _mostra_avanzamento_caricamento(self, visibile):
+        stato_bottoni = "disabled" if visibile else "normal"
+        self.bottone_carica_csv.configure(state=stato_bottoni)
+        self.bottone_carica_cartella.configure(state=stato_bottoni)
+        self.bottone_dati_esempio.configure(state=stato_bottoni)
+        self.bottone_svuota_cache.configure(state=stato_bottoni)
+        self.checkbox_fuori_memoria.configure(state=stato_bottoni)
+        self.bottone_campione_file.configure(state=stato_bottoni)
+        if visibile:
+            self.barra_caricamento.set(0)
+            self.label_avanzamento.configure(text="Riconoscimento separatore...")
+            self.frame_avanzamento.grid(row=1, column=0, columnspan=6, padx=20, pady=(0, 15), sticky="ew")
+        else:
+            self.frame_avanzamento.grid_forget()
+
     # --- FUNZIONE PER CARICARE DATI DI ESEMPIO SIMULATI ---
     def carica_dati_esempio(self):
         # Inizia un blocco try-except per gestire errori durante la generazione dei dati.
         try:
-            records = []  # Lista vuota per contenere i record (righe) dei dati simulati.
-            # Liste di valori possibili per le variabili categoriche.
-            province = ['Milano', 'Roma', 'Napoli', 'Torino', 'Firenze', 'Catania', 'Salerno', 'Bologna', 'Venezia', 'Bari']
-            tipi_strada = ['Urbana', 'Statale', 'Autostrada']
-            # Mappa per convertire il numero del giorno della settimana (0=Lunedì) nel nome corrispondente.
-            giorni_map = {0: 'Lunedì', 1: 'Martedì', 2: 'Mercoledì', 3: 'Giovedì', 4: 'Venerdì', 5: 'Sabato', 6: 'Domenica'}
-
-            end_date = datetime.now()  # La data finale per la generazione è oggi.
-            start_date = end_date - timedelta(days=730)  # La data iniziale è due anni fa.
-            # Cicla 500 volte per creare 500 record di incidenti.
-            for _ in range(500):
-                # Genera un numero casuale di secondi nell'intervallo di due anni.
-                random_seconds = random.randint(0, int((end_date - start_date).total_seconds()))
-                # Crea una data e ora casuale aggiungendo i secondi casuali alla data di inizio.
-                random_date = start_date + timedelta(seconds=random_seconds)
-
-                # Simula la presenza di valori mancanti per 'Tipo_Strada' con una probabilità del 5%.
-                if random.random() < 0.05:
-                    strada = None
-                else:
-                    # Altrimenti, sceglie un tipo di strada a caso dalla lista.
-                    strada = random.choice(tipi_strada)
-
-                velocita = None  # Inizializza la velocità a None.
-                # Assegna una velocità casuale in base al tipo di strada, simulando limiti diversi.
-                if strada == 'Urbana': velocita = random.randint(30, 65)
-                elif strada == 'Statale': velocita = random.randint(60, 95)
-                elif strada == 'Autostrada': velocita = random.randint(100, 140)
-
-                # Genera il numero di morti con probabilità ponderate (molto più probabile che sia 0).
-                numero_morti = random.choices([0, 1, 2, 3], weights=[94, 4, 1.5, 0.5], k=1)[0]
-                # Genera il numero di feriti con probabilità ponderate.
-                numero_feriti = random.choices([0, 1, 2, 3, 4, 5], weights=[10, 40, 25, 15, 5, 5], k=1)[0]
-                # Logica semplice: se ci sono morti, ci sono almeno altrettanti feriti.
-                if numero_morti > 0: numero_feriti += numero_morti
-
-                # Aggiunge un dizionario (che rappresenta una riga) alla lista dei record.
-                records.append({'Data_Ora_Incidente': random_date, 'Provincia': random.choice(province), 'Giorno_Settimana': giorni_map[random_date.weekday()], 'Tipo_Strada': strada, 'Numero_Feriti': numero_feriti, 'Numero_Morti': numero_morti, 'Velocita_Media_Stimata': velocita})
-
-            # Crea un DataFrame di pandas a partire dalla lista di dizionari.
-            df = pd.DataFrame(records)
+            # Genera 500 incidenti degli ultimi due anni con il generatore vettoriale (colonne intere in NumPy):
+            # velocità dipendente dal tipo di strada, 5% di tipi di strada mancanti, morti e feriti ponderati.
+            df = genera_incidenti(500)
             # Aggiorna l'etichetta per confermare il caricamento dei dati simulati.
             self.label_file.configure(text=f"Caricati {len(df)} record simulati.", text_color="white")
             # Chiama la funzione per inizializzare e pre-elaborare i dati.
@@ -189,24 +396,21 @@ class App(customtkinter.CTk):
             self.label_file.configure(text=f"Errore Dati Esempio: {e}", text_color="red")
 
     # --- FUNZIONE DI PRE-ELABORAZIONE E INIZIALIZZAZIONE DEI DATI ---
-    def inizializza_dati(self, df, variabile_da_mantenere=None):
-        # Crea una copia del DataFrame ricevuto per evitare di modificare l'originale.
-        self.df = df.copy()
-        # Se esiste la colonna 'Data_Ora_Incidente', la converte in formato datetime di pandas.
-        # 'errors=coerce' trasformerà in 'NaT' (Not a Time) le date non valide, senza bloccare il programma.
-        if 'Data_Ora_Incidente' in self.df.columns:
-            self.df['Data_Ora_Incidente'] = pd.to_datetime(self.df['Data_Ora_Incidente'], errors='coerce')
-        # Itera su una lista di colonne che dovrebbero essere numeriche.
-        for col in ['Numero_Feriti', 'Numero_Morti', 'Velocita_Media_Stimata']:
-            # Se la colonna esiste nel DataFrame.
-            if col in self.df.columns:
-                # La converte in tipo numerico. 'errors=coerce' trasformerà in 'NaN' i valori non numerici.
-                self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
-
-        original_rows = len(self.df)  # Salva il numero di righe originali.
-        # Rimuove le righe che hanno valori mancanti ('NaT' o 'NaN') nelle colonne essenziali.
-        self.df.dropna(subset=['Data_Ora_Incidente', 'Provincia'], inplace=True)
-        dropped_rows = original_rows - len(self.df)  # Calcola quante righe sono state eliminate.
+    def inizializza_dati(self, df, variabile_da_mantenere=None, resoconto=None, momenti=None):
+        # Caricando un DataFrame completo si esce dall'eventuale modalità fuori memoria.
+        self.aggregati = None
+        # Se viene passato il resoconto, il DataFrame è già stato pulito e tipizzato (es. dal caricatore in background).
+        if resoconto is not None:
+            self.df = df
+        else:
+            # Crea una copia del DataFrame ricevuto per evitare di modificare l'originale,
+            # poi la pulisce e converte ogni colonna nel tipo compatto dichiarato dallo schema.
+            self.df, resoconto = prepara_incidenti(df.copy())
+        dropped_rows = resoconto.get('righe_rimosse', 0)  # Numero di righe eliminate perché incomplete.
+        # Stampa nella console quante date sono state lette con il formato fisso e quante con l'interpretazione lenta.
+        if resoconto.get('date', {}).get('formato'):
+            esito_date = resoconto['date']
+            print(f"Date lette con formato '{esito_date['formato']}': {esito_date['righe_formato_fisso']} righe; reinterpretate: {esito_date['righe_inferenza']} righe.")
         # Se sono state eliminate delle righe, stampa un messaggio informativo nella console.
         if dropped_rows > 0:
             print(f"Rimosse {dropped_rows} righe con valori mancanti in 'Data_Ora_Incidente' o 'Provincia'.")
@@ -216,26 +420,95 @@ class App(customtkinter.CTk):
             self.label_file.configure(text="Errore: Nessun dato valido trovato.", text_color="orange")
             self.df = None  # Resetta il DataFrame a None.
             return
-        # Estrae l'ora da 'Data_Ora_Incidente' e la salva in una nuova colonna per facilitare le analisi.
-        self.df['Ora'] = self.df['Data_Ora_Incidente'].dt.hour
+        # I risultati calcolati sul dataset precedente non sono più validi.
+        self._svuota_cache_analisi(impronta_dataframe(self.df))
+        # I momenti calcolati dal caricatore (per blocchi, file o processi) evitano un nuovo passaggio sui dati.
+        for col, accumulatore in (momenti or {}).items():
+            self.cache_risultati.inserisci((self.versione_dati, self.impronta_dati, 'momenti', col), accumulatore)
+        # Aggiunge all'etichetta di stato il resoconto della memoria prima e dopo la tipizzazione.
+        if 'memoria_prima' in resoconto:
+            mb_prima, mb_dopo = resoconto['memoria_prima'] / 1e6, resoconto['memoria_dopo'] / 1e6
+            self.label_file.configure(text=f"{self.label_file.cget('text')} | Memoria: {mb_prima:.1f} MB → {mb_dopo:.1f} MB")
         # Popola la tabella nella prima scheda con i dati puliti.
         self.popola_tabella_dati()
         # Aggiorna i menu a tendina in tutta l'applicazione con le colonne del nuovo dataset.
         self.aggiorna_selettori(variabile_da_mantenere)
 
+    # --- FUNZIONE DI INIZIALIZZAZIONE IN MODALITÀ FUORI MEMORIA ---
+    def inizializza_aggregati(self, aggregati):
+        # Nessuna riga viene tenuta in memoria: le schede lavorano sugli aggregati costruiti durante la lettura.
+        if aggregati.righe == 0:
+            self.label_file.configure(text="Errore: Nessun dato valido trovato.", text_color="orange")
+            return
+        if aggregati.righe_rimosse > 0:
+            print(f"Rimosse {aggregati.righe_rimosse} righe con valori mancanti in 'Data_Ora_Incidente' o 'Provincia'.")
+        self.df, self.aggregati = None, aggregati
+        self._svuota_cache_analisi(('aggregati', aggregati.righe, aggregati.righe_rimosse, tuple(aggregati.momenti)))
+        self.popola_tabella_dati()
+        self.aggiorna_selettori()
+
+    # --- FUNZIONI DI CACHE DEI CALCOLI SUL DATASET CORRENTE ---
+    def _svuota_cache_analisi(self, impronta):
+        # Nuovo dataset: nuova versione e nuova impronta nelle chiavi, e i vecchi risultati vengono liberati.
+        self.versione_dati += 1
+        self.impronta_dati = impronta
+        self.cache_risultati.svuota()
+        self._aggiorna_label_cache()
+
+    def _memo(self, chiave, calcola):
+        # Restituisce il risultato già calcolato per (versione, impronta, chiave) oppure lo calcola e lo conserva.
+        # 'chiave' è una tupla con il nome del calcolo, le colonne e le opzioni scelte.
+        risultato = self.cache_risultati.ottieni((self.versione_dati, self.impronta_dati) + chiave, calcola)
+        self._aggiorna_label_cache()
+        return risultato
+
+    def _aggiorna_label_cache(self):
+        self.label_cache_risultati.configure(text=self.cache_risultati.descrizione())
+
+    def _dati_colonna(self, variable):
+        # Valori validi (senza mancanti) della colonna, sempre lo stesso oggetto finché resta nella cache.
+        return self._memo(('colonna', variable), lambda: a_tipo_numpy(self.df[variable].dropna()))
+
+    def _e_colonna_completa(self, dati):
+        # True se 'dati' è la colonna completa del dataset (e non, ad esempio, un campione).
+        return self.cache_risultati.cerca((self.versione_dati, self.impronta_dati, 'colonna', dati.name)) is dati
+
+    def _memo_colonna(self, nome_calcolo, dati, calcola):
+        # Conserva il risultato solo se calcolato sulla colonna completa; per un campione lo ricalcola ogni volta.
+        if isinstance(dati, pd.Series) and self._e_colonna_completa(dati):
+            return self._memo((nome_calcolo, dati.name), calcola)
+        return calcola()
+
+    def _statistiche_ordine(self, dati):
+        # Un solo ordinamento dei valori fornisce mediana, quartili, moda e box plot.
+        return self._memo_colonna('ordine', dati, lambda: StatisticheOrdine(dati.to_numpy()))
+
+    # --- FUNZIONE CHE INDICA SE NON CI SONO DATI DA ANALIZZARE ---
+    def _nessun_dato(self):
+        return self.df is None and self.aggregati is None
+
+    # --- FUNZIONE PER MOSTRARE CHE UN'ANALISI RICHIEDE LE RIGHE COMPLETE ---
+    def _mostra_non_disponibile(self, frame, nome_analisi):
+        customtkinter.CTkLabel(frame, text=f"{nome_analisi} non è disponibile in modalità fuori memoria: richiede le singole righe del file.\nCarica il file senza la modalità fuori memoria (o un suo sottoinsieme) per usarla.", text_color="orange").pack(pady=20)
+
     # --- FUNZIONE PER AGGIORNARE I MENU A TENDINA ---
     def aggiorna_selettori(self, variabile_da_mantenere=None):
         # Se non ci sono dati, esce.
-        if self.df is None: return
+        if self._nessun_dato(): return
+        # In modalità fuori memoria i tipi delle colonne si ricavano dall'anteprima delle prime righe.
+        df_tipi = self.df if self.df is not None else self.aggregati.anteprima
         # Estrae i nomi delle colonne numeriche, di testo/categoriche e di data/ora.
-        numeric_columns = self.df.select_dtypes(include=np.number).columns.tolist()
-        object_columns = self.df.select_dtypes(include=['object', 'category']).columns.tolist()
-        datetime_cols = self.df.select_dtypes(include=['datetime64[ns]']).columns.tolist()
+        numeric_columns = df_tipi.select_dtypes(include=np.number).columns.tolist()
+        object_columns = df_tipi.select_dtypes(include=['object', 'category']).columns.tolist()
+        datetime_cols = df_tipi.select_dtypes(include=['datetime']).columns.tolist()
         # Costruisce una lista di tutte le colonne utili per l'analisi, escludendo 'Giorno'.
         all_columns = [col for col in datetime_cols + object_columns + numeric_columns if col != 'Giorno']
 
         # Estrae le province uniche e le ordina alfabeticamente.
-        province_uniche = sorted(self.df['Provincia'].unique().tolist()) if 'Provincia' in self.df.columns else []
+        if self.aggregati is not None:
+            province_uniche = self.aggregati.province
+        else:
+            province_uniche = sorted(self.df['Provincia'].unique().tolist()) if 'Provincia' in self.df.columns else []
         
         # Selettori per Analisi Descrittiva (tutte le colonne).
         self.selettore_var_descrittiva.configure(values=all_columns)
@@ -317,11 +590,6 @@ class App(customtkinter.CTk):
         table_frame.pack(fill="x", expand=True, padx=5, pady=(0,5))
         table_frame.grid_columnconfigure(0, weight=1) # La colonna della tabella si espande.
 
-        # Applica uno stile al Treeview per migliorare l'aspetto.
-        style = ttk.Style()
-        style.configure("Treeview", rowheight=25, font=('Calibri', 11))
-        style.configure("Treeview.Heading", font=('Calibri', 12, 'bold'))
-        
         # Prende i nomi delle colonne dal DataFrame.
         columns = df.columns.tolist()
         # Crea il widget Treeview, che è la vera e propria tabella.
@@ -332,17 +600,11 @@ class App(customtkinter.CTk):
             table.heading(col, text=col) # Imposta il testo dell'intestazione.
             table.column(col, anchor='center', width=120, minwidth=100) # Imposta allineamento e larghezza.
 
-        # Itera sulle righe del DataFrame per popolarle nella tabella.
-        for _, row in df.iterrows():
-            formatted_row = []
-            # Formatta i valori float con 4 cifre decimali per una migliore leggibilità.
-            for val in row:
-                if isinstance(val, float):
-                    formatted_row.append(f"{val:.4f}")
-                else:
-                    formatted_row.append(val)
-            # Inserisce la riga formattata nella tabella.
-            table.insert("", "end", values=formatted_row)
+        # Formatta tutte le colonne in blocco (i valori float con 4 cifre decimali per una migliore leggibilità).
+        righe = formatta_righe(df)
+        # Inserisce le righe a lotti: il primo subito, gli altri nei passi successivi del ciclo dell'interfaccia,
+        # così anche tabelle con migliaia di righe non bloccano la finestra.
+        self._inserisci_righe_a_lotti(table, righe, 0)
 
         # Crea e configura la barra di scorrimento verticale.
         vsb = ttk.Scrollbar(table_frame, orient="vertical", command=table.yview)
@@ -355,6 +617,14 @@ class App(customtkinter.CTk):
         # Restituisce il frame principale, utile se si vuole modificare ulteriormente.
         return frame
 
+    def _inserisci_righe_a_lotti(self, table, righe, inizio):
+        # Se la tabella è stata distrutta nel frattempo (es. nuova analisi), interrompe l'inserimento.
+        if not table.winfo_exists(): return
+        for riga in righe[inizio:inizio + RIGHE_PER_LOTTO]:
+            table.insert("", "end", values=riga)
+        if inizio + RIGHE_PER_LOTTO < len(righe):
+            self.after(1, self._inserisci_righe_a_lotti, table, righe, inizio + RIGHE_PER_LOTTO)
+
 
     # --- FUNZIONE PER MOSTRARE FINESTRE DI INFORMAZIONE ---
     def show_info(self, title, message):
@@ -374,26 +644,163 @@ class App(customtkinter.CTk):
         close_button = customtkinter.CTkButton(info_window, text="Chiudi", command=info_window.destroy)
         close_button.pack(padx=20, pady=10, side="bottom")
 
-    # --- FUNZIONE PER AGGIORNARE IL VALORE K DI CHEBYSHEV E RICALCOLARE ---
-    def _update_chebyshev_k_and_recalculate(self, entry_widget, container, data_series, variable_name, title, info_text, guide_text):
-        """Aggiorna il valore di k per Chebyshev e riesegue l'analisi numerica."""
+    # --- FUNZIONE PER AGGIORNARE IL VALORE K DI CHEBYSHEV ---
+    def _update_chebyshev_k(self, entry_widget, vista_cheb):
+        """Aggiorna il valore di k per Chebyshev e ridisegna solo intervallo, quote e curva."""
         try:
             # Prova a convertire il testo dell'entry in un numero float.
             new_k = float(entry_widget.get())
             # La disuguaglianza di Chebyshev è significativa solo per k > 1.
             if new_k <= 1:
                 raise ValueError("Il valore di k deve essere maggiore di 1.")
-            # Aggiorna il valore di 'k' a livello di istanza della classe.
-            self.k_val_sheby = new_k
-            # Pulisce completamente il frame dei risultati per poterli ridisegnare.
-            self.pulisci_frame(container)
-            # Richiama la funzione di analisi numerica con il nuovo valore di k.
-            self._esegui_analisi_numerica_dettagliata(container, data_series, variable_name, title, info_text, guide_text)
         except ValueError as e:
-            # Se l'input non è valido (es. testo), mostra un messaggio di errore.
-            error_label = customtkinter.CTkLabel(container, text=f"Errore: {e}", text_color="red")
-            error_label.pack(pady=5)
-            # Non ricalcola, lasciando l'errore visibile e mantenendo il vecchio valore di k.
+            # Se l'input non è valido (es. testo), mostra un messaggio di errore e mantiene il vecchio valore di k.
+            vista_cheb['label_errore'].configure(text=f"Errore: {e}")
+            return
+        # Aggiorna il valore di 'k' a livello di istanza della classe.
+        self.k_val_sheby = new_k
+        vista_cheb['label_errore'].configure(text="")
+        # Media e deviazione standard sono già nella vista: gli altri indici, la tabella e i grafici restano invariati.
+        self._mostra_chebyshev(vista_cheb)
+
+    # --- FUNZIONI PER GLI INTERVALLI DI CONFIDENZA BOOTSTRAP DEGLI INDICI ---
+    def _crea_controlli_bootstrap(self, frame_indici_main, data_series, etichette_ic):
+        frame_boot = customtkinter.CTkFrame(frame_indici_main, fg_color="transparent")
+        frame_boot.grid(row=1, column=0, columnspan=3, padx=10, pady=(0,5), sticky="w")
+        # In modalità fuori memoria servono le frequenze di tutti i valori per ricampionare.
+        if isinstance(data_series, RiepilogoColonna) and not data_series.quantili_disponibili:
+            customtkinter.CTkLabel(frame_boot, text="Intervalli bootstrap non disponibili: la variabile ha troppi valori distinti per la modalità fuori memoria.", text_color="gray").pack(side="left")
+            return
+        vista_ic = {'dati': data_series, 'etichette': {nome: (etichetta, etichetta.cget("text")) for nome, etichetta in etichette_ic.items()}}
+        customtkinter.CTkLabel(frame_boot, text=f"Intervalli di confidenza bootstrap ({LIVELLO_PREDEFINITO:.0%}) - Repliche:").pack(side="left")
+        vista_ic['entry_repliche'] = customtkinter.CTkEntry(frame_boot, width=80)
+        vista_ic['entry_repliche'].insert(0, str(self.repliche_bootstrap))
+        vista_ic['entry_repliche'].pack(side="left", padx=(5,10))
+        customtkinter.CTkLabel(frame_boot, text="Seme:").pack(side="left")
+        vista_ic['entry_seme'] = customtkinter.CTkEntry(frame_boot, width=60)
+        vista_ic['entry_seme'].insert(0, str(self.seme_bootstrap))
+        vista_ic['entry_seme'].pack(side="left", padx=(5,10))
+        vista_ic['pulsante'] = customtkinter.CTkButton(frame_boot, text="Calcola IC", width=100, command=lambda: self._aggiorna_intervalli_bootstrap(vista_ic))
+        vista_ic['pulsante'].pack(side="left")
+        vista_ic['label_stato'] = customtkinter.CTkLabel(frame_boot, text="", text_color="gray")
+        vista_ic['label_stato'].pack(side="left", padx=10)
+        # Se gli intervalli con le impostazioni correnti sono già stati calcolati per questa colonna, li mostra subito.
+        gia_calcolati = self._cerca_intervalli_bootstrap(data_series, self.repliche_bootstrap, self.seme_bootstrap)
+        if gia_calcolati is not None:
+            self._mostra_intervalli_bootstrap(vista_ic, gia_calcolati, self.repliche_bootstrap)
+
+    def _chiave_bootstrap(self, dati, repliche, seme):
+        nome = dati.nome if isinstance(dati, RiepilogoColonna) else dati.name
+        return ('bootstrap', nome, repliche, seme)
+
+    def _cerca_intervalli_bootstrap(self, dati, repliche, seme):
+        # Solo la colonna completa (o il riepilogo fuori memoria) ha intervalli conservati nella cache.
+        if not isinstance(dati, RiepilogoColonna) and not self._e_colonna_completa(dati): return None
+        return self.cache_risultati.cerca((self.versione_dati, self.impronta_dati) + self._chiave_bootstrap(dati, repliche, seme))
+
+    def _aggiorna_intervalli_bootstrap(self, vista_ic):
+        try:
+            repliche, seme = int(vista_ic['entry_repliche'].get()), int(vista_ic['entry_seme'].get())
+            if repliche < REPLICHE_MINIME: raise ValueError(f"servono almeno {REPLICHE_MINIME} repliche.")
+        except ValueError as e:
+            vista_ic['label_stato'].configure(text=f"Errore: {e}", text_color="red")
+            return
+        self.repliche_bootstrap, self.seme_bootstrap = repliche, seme
+        dati = vista_ic['dati']
+        gia_calcolati = self._cerca_intervalli_bootstrap(dati, repliche, seme)
+        if gia_calcolati is not None:
+            self._mostra_intervalli_bootstrap(vista_ic, gia_calcolati, repliche)
+            return
+        if isinstance(dati, RiepilogoColonna):
+            # In modalità fuori memoria si ricampiona dalla tabella di frequenza dei valori distinti.
+            valori, conteggi = dati.frequenze.index.to_numpy(), dati.frequenze.to_numpy()
+        else:
+            valori, conteggi = dati.to_numpy(dtype=np.float64), None
+        # Come _memo_colonna: si conservano solo gli intervalli della colonna completa (o del riepilogo fuori memoria).
+        conserva = isinstance(dati, RiepilogoColonna) or self._e_colonna_completa(dati)
+        chiave = (self.versione_dati, self.impronta_dati) + self._chiave_bootstrap(dati, repliche, seme)
+        # Il calcolo avviene su un thread separato: l'interfaccia resta attiva e il pulsante diventa "Annulla".
+        annulla, esito = threading.Event(), {}
+        def calcola():
+            try:
+                esito['risultato'] = intervalli_bootstrap(valori, conteggi, repliche=repliche, seed=seme, annulla=annulla)
+            except Exception as e:
+                esito['errore'] = e
+        thread = threading.Thread(target=calcola, daemon=True)
+        vista_ic['calcolo'] = {'thread': thread, 'annulla': annulla, 'esito': esito, 'repliche': repliche,
+                               'chiave': chiave if conserva else None, 'inizio': time.perf_counter()}
+        vista_ic['label_stato'].configure(text="Calcolo in corso...", text_color="gray")
+        vista_ic['pulsante'].configure(text="Annulla", command=annulla.set)
+        thread.start()
+        self.after(100, self._controlla_intervalli_bootstrap, vista_ic)
+
+    def _controlla_intervalli_bootstrap(self, vista_ic):
+        calcolo = vista_ic['calcolo']
+        # Se la vista è stata chiusa (altra variabile o altro file), il calcolo viene interrotto.
+        if not vista_ic['label_stato'].winfo_exists():
+            calcolo['annulla'].set()
+            return
+        if calcolo['thread'].is_alive():
+            self.after(100, self._controlla_intervalli_bootstrap, vista_ic)
+            return
+        vista_ic['pulsante'].configure(text="Calcola IC", command=lambda: self._aggiorna_intervalli_bootstrap(vista_ic))
+        esito = calcolo['esito']
+        if 'errore' in esito:
+            vista_ic['label_stato'].configure(text=f"Errore: {esito['errore']}", text_color="red")
+        elif esito.get('risultato') is None:
+            vista_ic['label_stato'].configure(text="Calcolo annullato.", text_color="orange")
+        else:
+            if calcolo['chiave'] is not None:
+                self.cache_risultati.inserisci(calcolo['chiave'], esito['risultato'])
+                self._aggiorna_label_cache()
+            self._mostra_intervalli_bootstrap(vista_ic, esito['risultato'], calcolo['repliche'], time.perf_counter() - calcolo['inizio'])
+
+    def _mostra_intervalli_bootstrap(self, vista_ic, risultato, repliche_richieste, secondi=None):
+        # Aggiunge l'intervallo accanto a ciascun indice, lasciando invariato il resto dell'analisi.
+        intervalli, repliche = risultato
+        for nome, (etichetta, testo) in vista_ic['etichette'].items():
+            basso, alto = intervalli[nome]
+            etichetta.configure(text=f"{testo}  (IC {LIVELLO_PREDEFINITO:.0%}: [{basso:.4f}, {alto:.4f}])")
+        testo = f"{repliche:,} repliche" + (f" in {secondi:.2f} s" if secondi is not None else "")
+        if repliche < repliche_richieste:
+            # Variabile con molti valori distinti: ogni replica estrae tutte le righe, quindi le repliche sono limitate.
+            vista_ic['label_stato'].configure(text=f"{testo} (ridotte da {repliche_richieste:,}: troppi valori distinti per tante repliche su tutte le righe)", text_color="orange")
+        else:
+            vista_ic['label_stato'].configure(text=testo, text_color="gray")
+
+    # --- FUNZIONE CHE PREPARA IL CALCOLO DELLA QUOTA EFFETTIVA DI DATI IN UN INTERVALLO ---
+    def _funzione_quota(self, data_series):
+        # Restituisce una funzione (basso, alto) -> frazione dei dati nell'intervallo, anche per array di estremi.
+        # I dati vengono ordinati una volta sola: ogni valutazione è una coppia di ricerche binarie.
+        if isinstance(data_series, RiepilogoColonna):
+            if not data_series.quantili_disponibili: return None
+            valori, conteggi = data_series.frequenze.index.to_numpy(), data_series.frequenze.to_numpy()
+            return lambda basso, alto: quota_intervallo_da_frequenze(valori, conteggi, basso, alto)
+        return self._statistiche_ordine(data_series).quota_intervallo
+
+    # --- FUNZIONE CHE MOSTRA INTERVALLO DI CHEBYSHEV, LIMITE TEORICO E QUOTA EFFETTIVA ---
+    def _mostra_chebyshev(self, vista_cheb):
+        k, mean, std_dev = self.k_val_sheby, vista_cheb['media'], vista_cheb['dev_std']
+        # Calcola gli estremi dell'intervallo di Chebyshev usando il valore 'k' (modificabile) della classe.
+        cheb_low, cheb_high = mean - k * std_dev, mean + k * std_dev
+        vista_cheb['label_intervallo'].configure(text=f"Interv. Chebyshev (k={k:.1f}): [{cheb_low:.3f}, {cheb_high:.3f}]")
+        testo = f"Limite teorico (1 - 1/k²): {1 - 1 / k ** 2:.2%}"
+        if vista_cheb['quota'] is not None:
+            testo += f" | Quota effettiva: {vista_cheb['quota'](cheb_low, cheb_high):.2%}"
+        vista_cheb['label_quota'].configure(text=testo)
+        if vista_cheb['curva'] is not None: self._aggiorna_curva_chebyshev(vista_cheb)
+
+    # --- FUNZIONE CHE AGGIORNA LA CURVA DI CHEBYSHEV (TEORICA ED EFFETTIVA) AL VARIARE DI k ---
+    def _aggiorna_curva_chebyshev(self, vista_cheb):
+        ax, linea_teorica, linea_effettiva, linea_k, canvas = vista_cheb['curva']
+        k, mean, std_dev = self.k_val_sheby, vista_cheb['media'], vista_cheb['dev_std']
+        # L'asse si allarga se k supera il massimo predefinito, così la linea del k scelto resta visibile.
+        valori_k = np.linspace(1, max(K_MASSIMO_CURVA_CHEBYSHEV, k * 1.2), PUNTI_CURVA_CHEBYSHEV)
+        linea_teorica.set_data(valori_k, 1 - 1 / valori_k ** 2)
+        linea_effettiva.set_data(valori_k, vista_cheb['quota'](mean - valori_k * std_dev, mean + valori_k * std_dev))
+        linea_k.set_xdata([k, k])
+        ax.set_xlim(1, valori_k[-1])
+        canvas.draw_idle()
 
     # --- FUNZIONE PER PULIRE I FRAME DAI GRAFICI MATPLOTLIB ---
     def pulisci_frame(self, frame):
@@ -416,14 +823,9 @@ class App(customtkinter.CTk):
         tab.grid_columnconfigure(0, weight=1); tab.grid_rowconfigure(0, weight=1)
         data_frame = customtkinter.CTkFrame(tab); data_frame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
         data_frame.grid_columnconfigure(0, weight=1); data_frame.grid_rowconfigure(0, weight=1)
-        style = ttk.Style(); style.configure("Treeview", rowheight=25, font=('Calibri', 11)); style.configure("Treeview.Heading", font=('Calibri', 12,'bold'))
         columns = ('Data_Ora_Incidente', 'Provincia', 'Giorno_Settimana', 'Tipo_Strada', 'Numero_Feriti', 'Numero_Morti', 'Velocita_Media_Stimata')
-        self.data_table = ttk.Treeview(data_frame, columns=columns, show='headings')
-        for col in columns:
-            width = {'Data_Ora_Incidente': 160}.get(col, 120); anchor = 'center'
-            self.data_table.column(col, width=width, anchor=anchor); self.data_table.heading(col, text=col)
-        vsb = ttk.Scrollbar(data_frame, orient="vertical", command=self.data_table.yview); hsb = ttk.Scrollbar(data_frame, orient="horizontal", command=self.data_table.xview)
-        self.data_table.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set); self.data_table.grid(row=0, column=0, sticky='nsew'); vsb.grid(row=0, column=1, sticky='ns'); hsb.grid(row=1, column=0, sticky='ew')
+        # Tabella virtuale: il Treeview contiene solo le righe visibili, così si può scorrere l'intero dataset.
+        self.data_table = TabellaVirtuale(data_frame, columns, larghezze={'Data_Ora_Incidente': 160})
 
     # --- CONFIGURAZIONE DELLA SCHEDA "CALCOLO DATI" ---
     def setup_tab_calcolo_dati(self):
@@ -465,6 +867,28 @@ class App(customtkinter.CTk):
         self.bottone_esegui_campionatura = customtkinter.CTkButton(frame_controlli, text="Estrai Campione e Calcola", command=self.esegui_campionatura)
         self.bottone_esegui_campionatura.grid(row=0, column=4, padx=(10, 10))
 
+        # Seconda riga: simulazione di molti campioni della stessa dimensione (distribuzione campionaria).
+        customtkinter.CTkLabel(frame_controlli, text="N. Campioni (R):").grid(row=1, column=0, padx=(10,5), pady=(5,0))
+        self.entry_campioni_simulazione = customtkinter.CTkEntry(frame_controlli, width=120)
+        self.entry_campioni_simulazione.insert(0, str(CAMPIONI_PREDEFINITI))
+        self.entry_campioni_simulazione.grid(row=1, column=1, padx=5, pady=(5,0), sticky="w")
+        self.var_reinserimento = tkinter.BooleanVar(value=False)
+        customtkinter.CTkCheckBox(frame_controlli, text="Con reinserimento", variable=self.var_reinserimento).grid(row=1, column=2, columnspan=2, padx=(10,5), pady=(5,0), sticky="w")
+        self.bottone_simulazione_campionaria = customtkinter.CTkButton(frame_controlli, text="Simula Distribuzione Campionaria", command=self.esegui_simulazione_campionaria)
+        self.bottone_simulazione_campionaria.grid(row=1, column=4, padx=(10, 10), pady=(5,0))
+
+        # Terza riga: estrazione con un disegno stratificato o a grappoli e stime con errori standard.
+        customtkinter.CTkLabel(frame_controlli, text="Disegno:").grid(row=2, column=0, padx=(10,5), pady=(5,10))
+        self.selettore_disegno = customtkinter.CTkComboBox(frame_controlli, values=list(DISEGNI_CAMPIONAMENTO.values()), state="readonly")
+        self.selettore_disegno.set(DISEGNI_CAMPIONAMENTO['proporzionale'])
+        self.selettore_disegno.grid(row=2, column=1, padx=5, pady=(5,10), sticky="ew")
+        customtkinter.CTkLabel(frame_controlli, text="Strati per:").grid(row=2, column=2, padx=(10,5), pady=(5,10))
+        self.selettore_strati = customtkinter.CTkComboBox(frame_controlli, values=["Provincia", "Tipo_Strada"], state="readonly", width=120)
+        self.selettore_strati.set("Provincia")
+        self.selettore_strati.grid(row=2, column=3, padx=5, pady=(5,10))
+        self.bottone_campionamento_disegno = customtkinter.CTkButton(frame_controlli, text="Estrai con Disegno e Stima", command=self.esegui_campionamento_disegno)
+        self.bottone_campionamento_disegno.grid(row=2, column=4, padx=(10, 10), pady=(5,10))
+
         self.frame_risultati_campionatura = customtkinter.CTkScrollableFrame(tab, label_text="Risultati Calcoli Statistici sul Campione")
         self.frame_risultati_campionatura.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
         self.frame_risultati_campionatura.grid_columnconfigure(0, weight=1)
@@ -598,36 +1022,33 @@ class App(customtkinter.CTk):
 
     # --- FUNZIONE PER POPOLARE LA TABELLA INIZIALE CON I DATI ---
     def popola_tabella_dati(self):
-        # Pulisce la tabella da eventuali dati precedenti.
-        for item in self.data_table.get_children(): self.data_table.delete(item)
-        # Se non ci sono dati, termina la funzione.
-        if self.df is None or self.df.empty: return
-        # Definisce le colonne da mostrare e si assicura che esistano nel DataFrame.
-        cols_da_mostrare = [col for col in ['Data_Ora_Incidente', 'Provincia', 'Giorno_Settimana', 'Tipo_Strada', 'Numero_Feriti', 'Numero_Morti', 'Velocita_Media_Stimata'] if col in self.df.columns]
-        # Crea un DataFrame di visualizzazione con solo le colonne necessarie.
-        display_df = self.df[cols_da_mostrare].copy()
-        # Ordina i dati per data decrescente (i più recenti in alto).
-        display_df = display_df.sort_values(by='Data_Ora_Incidente', ascending=False)
-        # Formatta la colonna della data in una stringa più leggibile.
-        display_df['Data_Ora_Incidente'] = display_df['Data_Ora_Incidente'].dt.strftime('%Y-%m-%d %H:%M:%S')
-        # Itera sulle prime 500 righe (per non appesantire l'interfaccia) e le inserisce nella tabella.
-        for _, row in display_df.head(500).iterrows(): self.data_table.insert("", "end", values=list(row))
+        # In modalità fuori memoria mostra l'anteprima delle prime righe del file.
+        df = self.df if self.df is not None else (self.aggregati.anteprima if self.aggregati is not None else None)
+        # Se non ci sono dati, svuota la tabella e termina la funzione.
+        if df is None or df.empty:
+            self.data_table.imposta_dati(None)
+            return
+        # Ordina per data decrescente (i più recenti in alto) calcolando solo la permutazione delle righe:
+        # il DataFrame non viene copiato e la tabella formatta soltanto le righe visibili.
+        # Cliccando sulle intestazioni si ordina per altre colonne (Maiusc+clic per più colonne).
+        self.data_table.imposta_dati(df, [('Data_Ora_Incidente', False)])
 
     # --- FUNZIONE PER ESEGUIRE I CALCOLI STATISTICI SULLA POPOLAZIONE ---
     def esegui_calcolo_dati(self, *args):
         # Pulisce il frame dei risultati da analisi precedenti.
         self.pulisci_frame(self.frame_risultati_calcolo)
         # Se non ci sono dati, esce.
-        if self.df is None: return
+        if self._nessun_dato(): return
         # Ottiene la variabile selezionata dall'utente.
         variable = self.selettore_var_calcolo.get()
         # Se nessuna variabile è selezionata, esce.
         if not variable: return
 
         # Seleziona i dati della variabile, rimuovendo i valori mancanti.
-        data = self.df[variable].dropna()
+        # In modalità fuori memoria usa il riepilogo (momenti e frequenze) costruito durante la lettura.
+        data = self.aggregati.riepilogo(variable) if self.aggregati is not None else self._dati_colonna(variable)
         # Se non ci sono dati validi per quella variabile, mostra un messaggio.
-        if data.empty:
+        if len(data) == 0:
             customtkinter.CTkLabel(self.frame_risultati_calcolo, text="Nessun dato disponibile per la variabile selezionata.", text_color="orange").pack(pady=20)
             return
         
@@ -637,7 +1058,8 @@ class App(customtkinter.CTk):
         guida = ("Questa analisi fornisce una fotografia precisa delle caratteristiche del tuo dataset.\n\n"
                  "Interpretazione degli Indici:\n"
                  "- Indici di Posizione, Variabilità e Forma: Descrivono il 'centro', la dispersione e la simmetria della distribuzione dei tuoi dati.\n"
-                 "- Disuguaglianza di Chebyshev: Fornisce un limite inferiore sulla percentuale di dati che si trovano entro 'k' deviazioni standard dalla media. La formula è $(1 - 1/k^2)$. È un risultato potente perché vale per QUALSIASI distribuzione. Puoi inserire un valore di $k>1$ e premere 'Aggiorna' per vedere l'intervallo corrispondente. Ad esempio, per $k=2$, almeno il 75% dei dati si troverà in quell'intervallo.")
+                 "- Disuguaglianza di Chebyshev: Fornisce un limite inferiore sulla percentuale di dati che si trovano entro 'k' deviazioni standard dalla media. La formula è $(1 - 1/k^2)$. È un risultato potente perché vale per QUALSIASI distribuzione. Puoi inserire un valore di $k>1$ e premere 'Aggiorna' per vedere l'intervallo corrispondente. Ad esempio, per $k=2$, almeno il 75% dei dati si troverà in quell'intervallo.\n"
+                 "- Quota effettiva: Accanto al limite teorico è mostrata la percentuale di dati che cade davvero nell'intervallo; il grafico sotto gli istogrammi confronta le due curve al variare di k.")
         
         # Chiama la funzione interna che esegue l'analisi numerica dettagliata.
         self._esegui_analisi_numerica_dettagliata(self.frame_risultati_calcolo, data, variable, title, info, guida)
@@ -646,6 +1068,8 @@ class App(customtkinter.CTk):
     def esegui_campionatura(self):
         # Pulisce il frame dei risultati.
         self.pulisci_frame(self.frame_risultati_campionatura)
+        if self.aggregati is not None:
+            self._mostra_non_disponibile(self.frame_risultati_campionatura, "La campionatura"); return
         if self.df is None: return
         # Ottiene la variabile e la dimensione del campione inserite dall'utente.
         variable = self.selettore_var_campionatura.get()
@@ -665,7 +1089,7 @@ class App(customtkinter.CTk):
             return
 
         # Seleziona i dati validi per la variabile.
-        data = self.df[variable].dropna()
+        data = a_tipo_numpy(self.df[variable].dropna())
         # Controlla che la dimensione del campione non sia maggiore dei dati disponibili.
         if n > len(data):
             customtkinter.CTkLabel(self.frame_risultati_campionatura, text=f"Errore: La dimensione del campione ({n}) non può superare il numero di dati disponibili ({len(data)}).", text_color="orange").pack(pady=20)
@@ -686,6 +1110,276 @@ class App(customtkinter.CTk):
         # Chiama la funzione che esegue l'analisi numerica dettagliata, ma questa volta sul campione.
         self._esegui_analisi_numerica_dettagliata(self.frame_risultati_campionatura, campione, variable, title, info, guida)
 
+    # --- FUNZIONE PER SIMULARE LA DISTRIBUZIONE CAMPIONARIA DI MEDIA, MEDIANA E VARIANZA ---
+    def esegui_simulazione_campionaria(self):
+        frame = self.frame_risultati_campionatura
+        self.pulisci_frame(frame)
+        if self.aggregati is not None:
+            self._mostra_non_disponibile(frame, "La simulazione della distribuzione campionaria"); return
+        if self.df is None: return
+        variable = self.selettore_var_campionatura.get()
+        reinserimento = self.var_reinserimento.get()
+        if not variable or not self.entry_dim_campione.get():
+            customtkinter.CTkLabel(frame, text="Selezionare una variabile e inserire la dimensione del campione.", text_color="orange").pack(pady=20)
+            return
+        # Dimensione dei campioni e numero di campioni: interi, con almeno 2 osservazioni per la varianza.
+        data = self._dati_colonna(variable)
+        try:
+            n, campioni = int(self.entry_dim_campione.get()), int(self.entry_campioni_simulazione.get())
+            if n < 2 or campioni < 2: raise ValueError("la dimensione e il numero dei campioni devono essere almeno 2.")
+            if not reinserimento and n > len(data):
+                raise ValueError(f"senza reinserimento la dimensione del campione non può superare i dati disponibili ({len(data)}).")
+        except ValueError as e:
+            customtkinter.CTkLabel(frame, text=f"Errore: Inserire numeri interi validi.\n({e})", text_color="orange").pack(pady=20)
+            return
+
+        # Parametri della popolazione: gli stessi indici (e la stessa cache) della scheda "Calcolo Dati".
+        indici = self._memo_colonna('indici', data, lambda: self._indici_numerici(data))
+        ordine = self._statistiche_ordine(data)
+        inizio = time.perf_counter()
+        simulate = simula_distribuzione_campionaria(data.to_numpy(dtype=np.float64), n, campioni, reinserimento)
+        secondi = time.perf_counter() - inizio
+        limiti = distribuzioni_limite(indici, indici['mediana'], densita_mediana(ordine.quantile, ordine.quota_intervallo), n, reinserimento)
+        popolazione = {'media': indici['media'], 'mediana': indici['mediana'], 'varianza': indici['varianza']}
+        nomi = {'media': "Media", 'mediana': "Mediana", 'varianza': "Varianza"}
+
+        # --- TESTI DI AIUTO AMPLIATI ---
+        modo = "con" if reinserimento else "senza"
+        title = f"Distribuzione Campionaria ({campioni:,} campioni di n={n}, {modo} reinserimento)"
+        info = ("La distribuzione campionaria di una statistica è la distribuzione dei valori che essa assume su tutti i possibili campioni della stessa dimensione estratti dalla popolazione. Qui viene approssimata estraendo R campioni casuali di dimensione n e calcolando su ciascuno media, mediana e varianza.\n\n"
+                "Il Teorema del Limite Centrale afferma che, per n abbastanza grande, la media campionaria si distribuisce approssimativamente come una normale con media μ ed errore standard σ/√n, qualunque sia la distribuzione della popolazione. Anche mediana e varianza campionarie hanno distribuzioni limite normali, con errori standard che dipendono dalla densità nella mediana e dal momento quarto.")
+        guida = ("Cosa osservare:\n"
+                 "- Centro: gli istogrammi sono centrati sui parametri della popolazione (linea rossa), calcolati nella scheda 'Calcolo Dati'.\n"
+                 "- Errore standard: la dispersione delle stime (errore standard simulato) è confrontata con quella prevista dalla teoria (curva normale). Raddoppiando n l'errore standard si riduce di circa √2.\n"
+                 "- Forma: con n piccolo e popolazione asimmetrica la distribuzione della varianza resta asimmetrica; aumentando n tutte le distribuzioni si avvicinano alla normale.\n"
+                 "- Reinserimento: senza reinserimento gli errori standard teorici includono il fattore di correzione per popolazione finita (N - n)/(N - 1).\n"
+                 "- Mediana: per variabili con pochi valori distinti (es. numero di feriti) la mediana campionaria assume pochi valori e la curva normale non viene disegnata.")
+        self._crea_titolo_sezione(frame, title, info, guida)
+
+        # --- Tabella di confronto tra popolazione, stime simulate e teoria ---
+        frame_tabella = customtkinter.CTkFrame(frame, border_width=1)
+        frame_tabella.pack(fill="x", expand=True, padx=10, pady=10)
+        frame_tabella.grid_columnconfigure((0, 1, 2, 3, 4), weight=1)
+        intestazioni = ("Statistica", "Popolazione", "Media delle stime", "Err. std simulato", "Err. std teorico (normale)")
+        for colonna, testo in enumerate(intestazioni):
+            customtkinter.CTkLabel(frame_tabella, text=testo, font=customtkinter.CTkFont(size=13, weight="bold")).grid(row=0, column=colonna, padx=10, pady=5)
+        for riga, nome in enumerate(STATISTICHE_CAMPIONARIE, start=1):
+            errore_teorico = limiti[nome][1]
+            valori_riga = (nomi[nome], f"{popolazione[nome]:.4f}", f"{simulate[nome].mean():.4f}", f"{simulate[nome].std(ddof=1):.4f}",
+                           f"{errore_teorico:.4f}" if np.isfinite(errore_teorico) else "non definito")
+            for colonna, testo in enumerate(valori_riga):
+                customtkinter.CTkLabel(frame_tabella, text=testo).grid(row=riga, column=colonna, padx=10, pady=2)
+        customtkinter.CTkLabel(frame_tabella, text=f"{campioni:,} campioni simulati in {secondi:.2f} s", text_color="gray").grid(row=len(STATISTICHE_CAMPIONARIE) + 1, column=0, columnspan=5, pady=(5,5))
+
+        # --- Istogrammi delle distribuzioni campionarie con la curva normale del Teorema del Limite Centrale ---
+        frame_grafici = customtkinter.CTkFrame(frame)
+        frame_grafici.pack(fill="x", expand=True, padx=10, pady=5)
+        fig, assi = plt.subplots(1, len(STATISTICHE_CAMPIONARIE), figsize=(15, 4))
+        for ax, nome in zip(assi, STATISTICHE_CAMPIONARIE):
+            stime = simulate[nome]
+            ax.hist(stime, bins=min(50, max(10, int(np.sqrt(campioni)))), density=True, color="skyblue", edgecolor="black", alpha=0.8)
+            centro, errore = limiti[nome]
+            if np.isfinite(errore) and errore > 0:
+                x = np.linspace(min(stime.min(), centro - 4 * errore), max(stime.max(), centro + 4 * errore), 200)
+                ax.plot(x, stats.norm.pdf(x, centro, errore), color="darkblue", label="Normale (TLC)")
+            ax.axvline(popolazione[nome], color="red", linestyle="--", label="Popolazione")
+            ax.set_title(f"{nomi[nome]} campionaria")
+            ax.set_ylabel("Densità")
+            ax.legend(fontsize=8)
+            ax.grid(True, linestyle='--', alpha=0.6)
+        fig.tight_layout()
+        canvas = FigureCanvasTkAgg(fig, master=frame_grafici)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+        self.matplotlib_widgets.append(canvas)
+        plt.close(fig)
+
+    # --- INDICE DELLE RIGHE PER STRATO O PER GRAPPOLO (calcolato una volta e conservato nella cache) ---
+    def _indice_gruppi(self, chiave):
+        # 'chiave' è una colonna categorica (strati) oppure 'Giorno' (grappoli: la data senza l'ora).
+        if chiave == 'Giorno':
+            return self._memo(('gruppi', chiave), lambda: IndiceGruppi(self.df['Data_Ora_Incidente'].to_numpy().astype('datetime64[D]')))
+        return self._memo(('gruppi', chiave), lambda: IndiceGruppi(self.df[chiave]))
+
+    # --- FUNZIONE PER ESTRARRE UN CAMPIONE CON UN DISEGNO STRATIFICATO O A GRAPPOLI ---
+    def esegui_campionamento_disegno(self):
+        frame = self.frame_risultati_campionatura
+        self.pulisci_frame(frame)
+        if self.aggregati is not None:
+            self._mostra_non_disponibile(frame, "Il campionamento stratificato e a grappoli"); return
+        if self.df is None: return
+        variable = self.selettore_var_campionatura.get()
+        if not variable or not self.entry_dim_campione.get():
+            customtkinter.CTkLabel(frame, text="Selezionare una variabile e inserire la dimensione del campione.", text_color="orange").pack(pady=20)
+            return
+        disegno = next(chiave for chiave, nome in DISEGNI_CAMPIONAMENTO.items() if nome == self.selettore_disegno.get())
+        # Strati dalla colonna scelta, grappoli dai giorni; il campionamento casuale semplice non usa gruppi.
+        chiave_gruppi = {'semplice': None, 'grappoli': 'Giorno'}.get(disegno, self.selettore_strati.get())
+        colonna_gruppi = 'Data_Ora_Incidente' if chiave_gruppi == 'Giorno' else chiave_gruppi
+        if colonna_gruppi is not None and colonna_gruppi not in self.df.columns:
+            customtkinter.CTkLabel(frame, text=f"Errore: il dataset non contiene la colonna '{colonna_gruppi}'.", text_color="orange").pack(pady=20)
+            return
+        indice = self._indice_gruppi(chiave_gruppi) if chiave_gruppi is not None else None
+        # Per i grappoli 'n' è il numero di giorni estratti, negli altri disegni il numero di righe.
+        massimo = len(indice) if disegno == 'grappoli' else len(self.df)
+        unita = "giorni" if disegno == 'grappoli' else "righe"
+        try:
+            n = int(self.entry_dim_campione.get())
+            if not 2 <= n <= massimo: raise ValueError(f"servono tra 2 e {massimo} {unita}.")
+        except ValueError as e:
+            customtkinter.CTkLabel(frame, text=f"Errore: Inserire un numero intero valido per la dimensione del campione.\n({e})", text_color="orange").pack(pady=20)
+            return
+
+        # Valori della variabile su tutte le righe (i mancanti restano NaN e sono trattati dallo stimatore).
+        valori = self.df[variable].to_numpy(dtype=np.float64, na_value=np.nan)
+        inizio = time.perf_counter()
+        stime = stima_con_disegno(valori, disegno, n, indice)
+        secondi = time.perf_counter() - inizio
+        # Parametri della popolazione (scheda "Calcolo Dati") ed effetto del disegno rispetto a un campione
+        # casuale semplice con lo stesso numero di valori validi.
+        data = self._dati_colonna(variable)
+        indici = self._memo_colonna('indici', data, lambda: self._indici_numerici(data))
+        n_validi = stime['n_validi']
+        varianza_semplice = (1 - n_validi / indici['n']) * indici['varianza'] / n_validi if n_validi else np.nan
+        deff = stime['se_media'] ** 2 / varianza_semplice if varianza_semplice else np.nan
+
+        # --- TESTI DI AIUTO AMPLIATI ---
+        descrizione = DISEGNI_CAMPIONAMENTO[disegno] + (f" per {chiave_gruppi}" if disegno in ('proporzionale', 'fisso') else "")
+        title = f"Stime con Disegno: {descrizione} (n={n} {unita})"
+        info = ("Un disegno di campionamento stabilisce come vengono estratte le unità dalla popolazione.\n\n"
+                "- Casuale semplice: ogni insieme di n righe ha la stessa probabilità di essere estratto.\n"
+                "- Stratificato: la popolazione è divisa in strati (es. province o tipi di strada) e in ciascuno si estrae un campione casuale semplice. Con l'allocazione proporzionale ogni strato riceve una quota di n pari al suo peso N_h/N; con la numerosità fissa tutti gli strati ricevono lo stesso numero di unità. La media stimata è la media delle medie di strato pesata con N_h/N.\n"
+                "- A grappoli: si estraggono a caso n giorni e si osservano tutti gli incidenti di quei giorni. È meno costoso da rilevare, ma le unità dello stesso giorno tendono ad assomigliarsi.\n\n"
+                "Gli errori standard seguono il disegno (con correzione per popolazione finita); i valori mancanti della variabile sono esclusi e la media è stimata come rapporto tra totale stimato e numero stimato di valori validi.")
+        guida = ("Cosa osservare:\n"
+                 "- Stima ed errore standard: l'intervallo stima ± 1,96·errore standard contiene il valore della popolazione in circa il 95% delle estrazioni.\n"
+                 "- Effetto del disegno (deff): rapporto tra la varianza dello stimatore con il disegno scelto e quella di un campione casuale semplice della stessa dimensione. Un deff minore di 1 indica un disegno più efficiente (tipico della stratificazione quando gli strati differiscono tra loro), maggiore di 1 meno efficiente (tipico dei grappoli).\n"
+                 "- Tabella: per gli strati mostra dimensione, unità estratte e media di ciascuno; per i grappoli i giorni estratti con il loro numero di incidenti.")
+        self._crea_titolo_sezione(frame, title, info, guida)
+
+        # --- Riquadro delle stime ---
+        frame_stime = customtkinter.CTkFrame(frame, border_width=1)
+        frame_stime.pack(fill="x", expand=True, padx=10, pady=10)
+        media, se_media = stime['media'], stime['se_media']
+        testi = [f"Media stimata: {media:.4f} (errore standard: {se_media:.4f})",
+                 f"Intervallo di confidenza al 95%: [{media - 1.96 * se_media:.4f}, {media + 1.96 * se_media:.4f}]",
+                 f"Media della popolazione: {indici['media']:.4f}",
+                 f"Totale stimato: {stime['totale']:,.1f} (errore standard: {stime['se_totale']:,.1f}) | Totale della popolazione: {indici['somma']:,.1f}",
+                 f"Righe estratte: {stime['n']:,} (valori validi: {n_validi:,})",
+                 f"Effetto del disegno (deff): {deff:.3f}"]
+        for testo in testi:
+            customtkinter.CTkLabel(frame_stime, text=testo).pack(anchor="w", padx=10)
+        if stime['strati_vuoti']:
+            customtkinter.CTkLabel(frame_stime, text=f"Attenzione: {stime['strati_vuoti']} strati senza unità estratte sono esclusi dalle stime (aumentare n).", text_color="orange").pack(anchor="w", padx=10)
+        if stime['strati_singoli']:
+            customtkinter.CTkLabel(frame_stime, text=f"Attenzione: {stime['strati_singoli']} strati con una sola unità estratta: l'errore standard è sottostimato (aumentare n).", text_color="orange").pack(anchor="w", padx=10)
+        customtkinter.CTkLabel(frame_stime, text=f"Estrazione e stime in {secondi:.3f} s", text_color="gray").pack(anchor="w", padx=10, pady=(0,5))
+
+        # --- Tabella per strato o per grappolo ---
+        if stime['tabella'] is not None:
+            titolo_tabella = "Giorni estratti" if disegno == 'grappoli' else f"Strati per {chiave_gruppi}"
+            self._crea_tabella_treeview(frame, stime['tabella'], title=titolo_tabella)
+
+    # --- FUNZIONE CHE CALCOLA GLI INDICI NUMERICI DI UNA VARIABILE ---
+    def _indici_numerici(self, dati):
+        # 'dati' è una Series di pandas oppure, in modalità fuori memoria, un RiepilogoColonna.
+        if isinstance(dati, RiepilogoColonna):
+            indici = dati.momenti.indici()
+            indici.update({'mediana': dati.quantile(0.5), 'moda': dati.moda(), 'mad': dati.scarto_medio_assoluto(),
+                    'q1': dati.quantile(0.25), 'q3': dati.quantile(0.75),
+                    # Senza tabella di frequenza, mediana e quartili vengono dallo sketch e sono approssimati.
+                    'quantili_approssimati': dati.quantili_approssimati})
+            return indici
+        # Gli indici basati sui momenti (media, varianza, CV, forma, estremi) escono da un AccumulatoreMomenti:
+        # per la colonna completa è quello unito dal caricatore, per un campione viene calcolato in un passaggio.
+        valori = dati.to_numpy(dtype=np.float64)
+        momenti = self._memo_colonna('momenti', dati, lambda: AccumulatoreMomenti.da_array(valori))
+        indici = momenti.indici()
+        indici['mad'] = scarto_medio_assoluto(valori, momenti.media)
+        # Mediana, quartili e moda si leggono dall'unico ordinamento dei valori.
+        ordine = self._statistiche_ordine(dati)
+        indici.update({'mediana': ordine.mediana, 'moda': ordine.moda(), 'q1': ordine.q1, 'q3': ordine.q3})
+        return indici
+
+    # --- FUNZIONE CHE COSTRUISCE LA TABELLA DELLE FREQUENZE ASSOLUTE ---
+    def _tabella_frequenze(self, dati):
+        if isinstance(dati, RiepilogoColonna):
+            if not dati.quantili_disponibili: return None
+            # In modalità fuori memoria parte dai valori distinti e dai loro conteggi.
+            valori, conteggi = dati.frequenze.index, dati.frequenze
+            is_float = pd.api.types.is_float_dtype(valori)
+        else:
+            valori, conteggi, is_float = None, None, pd.api.types.is_float_dtype(dati)
+        # Il numero di valori unici serve solo per le variabili decimali: per gli interi si passa subito al conteggio.
+        num_unique = (dati.nunique() if valori is None else len(valori)) if is_float else 0
+        # Se la variabile è continua (float) e ha molti valori unici, raggruppa i dati in classi (bin).
+        if num_unique > 25 and is_float:
+            bins = min(num_unique, 15)
+            if valori is None:
+                freq_table = pd.cut(dati, bins=bins).value_counts().sort_index().to_frame(name='Frequenza Assoluta')
+            else:
+                # Gli estremi delle classi dipendono solo da minimo e massimo, uguali a quelli dei dati completi.
+                classi = pd.cut(valori.to_numpy(), bins=bins)
+                freq_table = pd.Series(conteggi.to_numpy()).groupby(classi, observed=False).sum().to_frame(name='Frequenza Assoluta')
+            freq_table.index = freq_table.index.astype(str)
+        # Altrimenti (dati discreti o categorici), calcola le frequenze per ogni valore unico
+        # (con un solo bincount per interi e categorie, già in ordine di valore).
+        else:
+            freq_table = (conteggi_valori(dati) if valori is None else conteggi.sort_index()).to_frame(name='Frequenza Assoluta')
+        return freq_table
+
+    # --- FUNZIONE CHE AGGIUNGE FREQUENZE RELATIVE E CUMULATE ALLA TABELLA ---
+    def _tabella_frequenze_completa(self, dati):
+        assolute = self._tabella_frequenze(dati)
+        if assolute is None: return None
+        freq_table = tabella_frequenze(assolute['Frequenza Assoluta'], totale=len(dati))
+        freq_table.index.name = "Classe/Valore"
+        return freq_table
+
+    # --- FUNZIONE CHE DISEGNA UN ISTOGRAMMA ---
+    def _classi_istogramma(self, dati):
+        # Conteggi ed estremi delle classi, calcolati una volta per colonna e conservati nella cache dei risultati.
+        if isinstance(dati, RiepilogoColonna):
+            # Ogni valore distinto pesa quanto il suo conteggio ('auto' non è supportato con i pesi).
+            valori = dati.frequenze.index.to_numpy(dtype=np.float64)
+            return self._memo(('istogramma', dati.nome), lambda: np.histogram(valori, bins=min(len(valori), 30), weights=dati.frequenze.to_numpy()))
+        return self._memo_colonna('istogramma', dati, lambda: np.histogram(dati.to_numpy(), bins='auto'))
+
+    def _disegna_istogramma(self, ax, dati):
+        # Matplotlib riceve solo le classi già contate, non i valori: il disegno non dipende dal numero di righe.
+        conteggi, bordi = self._classi_istogramma(dati)
+        if len(conteggi) <= BARRE_MASSIME_ISTOGRAMMA:
+            ax.bar(bordi[:-1], conteggi, width=np.diff(bordi), align='edge', edgecolor='black')
+        else:
+            ax.stairs(conteggi, bordi, fill=True, edgecolor='black')
+
+    # --- FUNZIONE CHE DISEGNA UN BOX PLOT ORIZZONTALE ---
+    def _disegna_box_plot(self, ax, dati, **kwargs):
+        # Quartili, baffi e valori anomali (limitati) vengono dal riepilogo conservato nella cache: bxp non riordina i dati.
+        if isinstance(dati, RiepilogoColonna):
+            # In modalità fuori memoria il riepilogo viene dalla tabella di frequenza.
+            riepilogo = self._memo(('box', dati.nome), lambda: dati.riepilogo_box(massimo_anomali=ANOMALI_MASSIMI_BOX_PLOT))
+        else:
+            riepilogo = self._memo_colonna('box', dati, lambda: self._statistiche_ordine(dati).riepilogo_box(massimo_anomali=ANOMALI_MASSIMI_BOX_PLOT))
+        self._disegna_riepiloghi_box(ax, [riepilogo], vert=False, **kwargs)
+
+    # --- FUNZIONE CHE DISEGNA UNO O PIÙ BOX PLOT DAI RIEPILOGHI GIÀ CALCOLATI ---
+    def _disegna_riepiloghi_box(self, ax, riepiloghi, **kwargs):
+        artisti = ax.bxp(riepiloghi, showfliers=True, **kwargs)
+        # La legenda riporta il numero reale di valori anomali, anche quando ne viene disegnata solo una parte.
+        totale = sum(riepilogo['n_anomali'] for riepilogo in riepiloghi)
+        mostrati = sum(len(riepilogo['fliers']) for riepilogo in riepiloghi)
+        if totale > 0:
+            testo = f"Valori anomali: {totale:,}" + (f" (mostrati {mostrati:,})" if mostrati < totale else "")
+            ax.legend([artisti['fliers'][0]], [testo], loc='upper right', fontsize=9)
+
+    # --- FUNZIONE CHE CALCOLA I RIEPILOGHI DEI BOX PLOT PER CATEGORIA ---
+    def _riepiloghi_box_gruppi(self, df_subset, cat_var, num_var):
+        # Un solo raggruppamento (nell'ordine di comparsa delle categorie) invece di una copia filtrata per categoria.
+        gruppi = df_subset.groupby(cat_var, observed=True, sort=False)[num_var]
+        return [StatisticheOrdine(gruppo.to_numpy()).riepilogo_box(etichetta=str(nome), massimo_anomali=ANOMALI_MASSIMI_BOX_PLOT)
+                for nome, gruppo in gruppi]
+
     # --- FUNZIONE RIUTILIZZABILE PER L'ANALISI NUMERICA (SIA POPOLAZIONE CHE CAMPIONE) ---
     def _esegui_analisi_numerica_dettagliata(self, container, data_series, variable_name, title, info_text, guide_text):
         # Crea il titolo della sezione usando la funzione helper.
@@ -696,42 +1390,56 @@ class App(customtkinter.CTk):
         frame_indici_main.pack(fill="x", expand=True, padx=10, pady=10)
         frame_indici_main.grid_columnconfigure((0, 1, 2), weight=1) # Le tre colonne si espandono uniformemente.
         
+        # Calcola tutti gli indici in un'unica volta (dalla serie o, in modalità fuori memoria, dagli aggregati).
+        indici = self._memo_colonna('indici', data_series, lambda: self._indici_numerici(data_series))
+
         # --- Riquadro Indici di Posizione ---
         frame_pos = customtkinter.CTkFrame(frame_indici_main)
         frame_pos.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
         customtkinter.CTkLabel(frame_pos, text="Indici di Posizione", font=customtkinter.CTkFont(size=13, weight="bold")).pack(pady=5)
-        mean, median, mode_val = data_series.mean(), data_series.median(), data_series.mode().iloc[0] if not data_series.mode().empty else 'N/A'
-        customtkinter.CTkLabel(frame_pos, text=f"Media: {mean:.4f}").pack(anchor="w", padx=10)
-        customtkinter.CTkLabel(frame_pos, text=f"Mediana: {median:.4f}").pack(anchor="w", padx=10)
+        mean, median, mode_val = indici['media'], indici['mediana'], indici['moda']
+        # I valori approssimati (sketch dei quantili in modalità fuori memoria) sono preceduti da '≈'.
+        approssimati = indici.get('quantili_approssimati', False)
+        segno = "≈ " if approssimati else ""
+        # Le etichette degli indici con intervallo bootstrap vengono conservate per aggiungervi l'intervallo in seguito.
+        etichette_ic = {}
+        etichette_ic['media'] = customtkinter.CTkLabel(frame_pos, text=f"Media: {mean:.4f}")
+        etichette_ic['media'].pack(anchor="w", padx=10)
+        etichette_ic['mediana'] = customtkinter.CTkLabel(frame_pos, text=f"Mediana: {segno}{median:.4f}")
+        etichette_ic['mediana'].pack(anchor="w", padx=10)
         customtkinter.CTkLabel(frame_pos, text=f"Moda: {mode_val}").pack(anchor="w", padx=10, pady=(0,5))
 
         # --- Riquadro Indici di Variabilità ---
         frame_var = customtkinter.CTkFrame(frame_indici_main)
         frame_var.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
         customtkinter.CTkLabel(frame_var, text="Indici di Variabilità", font=customtkinter.CTkFont(size=13, weight="bold")).pack(pady=5)
-        variance, std_dev, range_val = data_series.var(ddof=1), data_series.std(ddof=1), data_series.max() - data_series.min()
-        mad = (data_series - mean).abs().mean()
-        cv = std_dev / mean if mean != 0 else 0
+        variance, std_dev, range_val = indici['varianza'], indici['dev_std'], indici['massimo'] - indici['minimo']
+        mad = indici['mad']
+        cv = indici['coeff_variazione']
         customtkinter.CTkLabel(frame_var, text=f"Varianza: {variance:.4f}").pack(anchor="w", padx=10)
-        customtkinter.CTkLabel(frame_var, text=f"Dev. Std: {std_dev:.4f}").pack(anchor="w", padx=10)
+        etichette_ic['dev_std'] = customtkinter.CTkLabel(frame_var, text=f"Dev. Std: {std_dev:.4f}")
+        etichette_ic['dev_std'].pack(anchor="w", padx=10)
         customtkinter.CTkLabel(frame_var, text=f"Scarto Medio Assoluto: {mad:.4f}").pack(anchor="w", padx=10)
         customtkinter.CTkLabel(frame_var, text=f"Ampiezza del campo di variazione(Range): {range_val:.4f}").pack(anchor="w", padx=10)
-        customtkinter.CTkLabel(frame_var, text=f"Coeff. Variazione: {cv:.4f}").pack(anchor="w", padx=10, pady=(0,5))
+        etichette_ic['coeff_variazione'] = customtkinter.CTkLabel(frame_var, text=f"Coeff. Variazione: {cv:.4f}")
+        etichette_ic['coeff_variazione'].pack(anchor="w", padx=10, pady=(0,5))
 
         # --- Riquadro Forma, Quartili e Chebyshev ---
         frame_form = customtkinter.CTkFrame(frame_indici_main)
         frame_form.grid(row=0, column=2, padx=5, pady=5, sticky="nsew")
         customtkinter.CTkLabel(frame_form, text="Forma e Quartili", font=customtkinter.CTkFont(size=13, weight="bold")).pack(pady=5)
-        skew, kurt = data_series.skew(), data_series.kurtosis()
-        q1, q3, iqr = data_series.quantile(0.25), data_series.quantile(0.75), data_series.quantile(0.75) - data_series.quantile(0.25)
+        skew, kurt = indici['asimmetria'], indici['curtosi']
+        q1, q3 = indici['q1'], indici['q3']
+        iqr = q3 - q1
         
-        # Calcola gli estremi dell'intervallo di Chebyshev usando il valore 'k' (modificabile) della classe.
-        cheb_low = mean - self.k_val_sheby * std_dev
-        cheb_high = mean + self.k_val_sheby * std_dev
 
         customtkinter.CTkLabel(frame_form, text=f"Asimmetria (Skew): {skew:.4f}").pack(anchor="w", padx=10)
         customtkinter.CTkLabel(frame_form, text=f"Curtosi: {kurt:.4f}").pack(anchor="w", padx=10)
-        customtkinter.CTkLabel(frame_form, text=f"Q1: {q1:.4f} | Q3: {q3:.4f} | IQR: {iqr:.4f}").pack(anchor="w", padx=10, pady=(10,0))
+        etichette_ic['iqr'] = customtkinter.CTkLabel(frame_form, text=f"Q1: {segno}{q1:.4f} | Q3: {segno}{q3:.4f} | IQR: {segno}{iqr:.4f}")
+        etichette_ic['iqr'].pack(anchor="w", padx=10, pady=(10,0))
+        if approssimati:
+            sketch = data_series.sketch
+            customtkinter.CTkLabel(frame_form, text=f"Mediana e quartili approssimati (sketch KLL, k={sketch.k}):\nerrore di rango tipico ±{sketch.errore_rango_stimato():.1%}", text_color="orange", justify="left").pack(anchor="w", padx=10)
         
         # --- Nuovo frame per i controlli dinamici di Chebyshev ---
         k_input_frame = customtkinter.CTkFrame(frame_form, fg_color="transparent")
@@ -742,28 +1450,32 @@ class App(customtkinter.CTk):
         entry_k_chebyshev = customtkinter.CTkEntry(k_input_frame, placeholder_text="es. 2.0", width=80)
         entry_k_chebyshev.insert(0, str(self.k_val_sheby)) # Mostra il valore 'k' corrente.
         entry_k_chebyshev.grid(row=0, column=1, padx=(5,0))
-        # Il bottone "Aggiorna" chiama la funzione di ricalcolo, passandogli tutti i parametri necessari.
-        customtkinter.CTkButton(k_input_frame, text="Aggiorna", command=lambda: self._update_chebyshev_k_and_recalculate(entry_k_chebyshev, container, data_series, variable_name, title, info_text, guide_text)).grid(row=0, column=2, padx=(5,0))
-        
-        # Etichetta che mostra l'intervallo calcolato con il valore 'k' corrente.
-        customtkinter.CTkLabel(frame_form, text=f"Interv. Chebyshev (k={self.k_val_sheby:.1f}): [{cheb_low:.3f}, {cheb_high:.3f}]", font=customtkinter.CTkFont(size=13)).pack(anchor="w", padx=10, pady=(5,5))
+        # Il bottone "Aggiorna" (o il tasto Invio) aggiorna solo le etichette e la curva di Chebyshev.
+        customtkinter.CTkButton(k_input_frame, text="Aggiorna", command=lambda: self._update_chebyshev_k(entry_k_chebyshev, vista_cheb)).grid(row=0, column=2, padx=(5,0))
+        entry_k_chebyshev.bind("<Return>", lambda event: self._update_chebyshev_k(entry_k_chebyshev, vista_cheb))
+
+        # Media, deviazione standard e dati ordinati restano nella vista: cambiando k non si ricalcola nient'altro.
+        vista_cheb = {'media': mean, 'dev_std': std_dev, 'quota': self._funzione_quota(data_series), 'curva': None}
+        # Etichette con l'intervallo, il limite teorico e la quota effettiva di dati per il valore 'k' corrente.
+        vista_cheb['label_intervallo'] = customtkinter.CTkLabel(frame_form, text="", font=customtkinter.CTkFont(size=13))
+        vista_cheb['label_intervallo'].pack(anchor="w", padx=10, pady=(5,0))
+        vista_cheb['label_quota'] = customtkinter.CTkLabel(frame_form, text="")
+        vista_cheb['label_quota'].pack(anchor="w", padx=10)
+        vista_cheb['label_errore'] = customtkinter.CTkLabel(frame_form, text="", text_color="red")
+        vista_cheb['label_errore'].pack(anchor="w", padx=10, pady=(0,5))
+        self._mostra_chebyshev(vista_cheb)
+
+        # --- Controlli degli intervalli di confidenza bootstrap ---
+        self._crea_controlli_bootstrap(frame_indici_main, data_series, etichette_ic)
         
         # --- Creazione Tabella delle Frequenze ---
-        num_unique = data_series.nunique()
-        # Se la variabile è continua (float) e ha molti valori unici, raggruppa i dati in classi (bin).
-        if num_unique > 25 and pd.api.types.is_float_dtype(data_series):
-            bins = min(num_unique, 15)
-            freq_table = pd.cut(data_series, bins=bins).value_counts().sort_index().to_frame(name='Frequenza Assoluta')
-            freq_table.index = freq_table.index.astype(str)
-        # Altrimenti (dati discreti o categorici), calcola le frequenze per ogni valore unico.
-        else:
-            freq_table = data_series.value_counts().sort_index().to_frame(name='Frequenza Assoluta')
-        
-        # Calcola le frequenze relative e cumulate.
-        freq_table['Frequenza Relativa'] = freq_table['Frequenza Assoluta'] / len(data_series)
-        freq_table['Freq. Ass. Cumulata'] = freq_table['Frequenza Assoluta'].cumsum()
-        freq_table['Freq. Rel. Cumulata'] = freq_table['Frequenza Relativa'].cumsum()
-        freq_table.index.name = "Classe/Valore"
+        # Le frequenze relative e cumulate vengono calcolate sull'array dei conteggi e conservate con la tabella.
+        freq_table = self._memo_colonna('frequenze', data_series, lambda: self._tabella_frequenze_completa(data_series))
+        # In modalità fuori memoria una colonna con troppi valori distinti non ha tabella di frequenza.
+        if freq_table is None:
+            customtkinter.CTkLabel(container, text="Tabella delle frequenze, quartili e grafici non disponibili: la variabile ha troppi valori distinti per la modalità fuori memoria.", text_color="orange").pack(pady=10)
+            return
+
         # Crea la tabella visuale usando la funzione helper.
         self._crea_tabella_treeview(container, freq_table.reset_index(), "Tabella delle Frequenze")
         
@@ -776,7 +1488,7 @@ class App(customtkinter.CTk):
         frame_hist = customtkinter.CTkFrame(frame_grafici)
         frame_hist.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
         fig_hist, ax_hist = plt.subplots(figsize=(6, 4))
-        ax_hist.hist(data_series, bins='auto', edgecolor='black')
+        self._disegna_istogramma(ax_hist, data_series)
         ax_hist.set_title(f"Istogramma di '{variable_name}'")
         ax_hist.set_ylabel("Frequenza")
         ax_hist.grid(True, linestyle='--', alpha=0.6)
@@ -791,7 +1503,7 @@ class App(customtkinter.CTk):
         frame_box = customtkinter.CTkFrame(frame_grafici)
         frame_box.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
         fig_box, ax_box = plt.subplots(figsize=(6, 4))
-        ax_box.boxplot(data_series, vert=False, showfliers=True, patch_artist=True, boxprops=dict(facecolor="lightblue"))
+        self._disegna_box_plot(ax_box, data_series, patch_artist=True, boxprops=dict(facecolor="lightblue"))
         ax_box.set_title(f"Box Plot di '{variable_name}'")
         ax_box.set_yticklabels([])
         ax_box.grid(True, linestyle='--', alpha=0.6)
@@ -801,10 +1513,32 @@ class App(customtkinter.CTk):
         canvas_box.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
         self.matplotlib_widgets.append(canvas_box)
         plt.close(fig_box)
-        
+
+        # Curva di Chebyshev: limite teorico e quota effettiva di dati entro k deviazioni standard, al variare di k.
+        if vista_cheb['quota'] is not None:
+            frame_cheb = customtkinter.CTkFrame(frame_grafici)
+            frame_cheb.grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky="nsew")
+            fig_cheb, ax_cheb = plt.subplots(figsize=(12, 3.5))
+            linea_teorica, = ax_cheb.plot([], [], color='gray', linestyle='--', label='Limite teorico 1 - 1/k²')
+            linea_effettiva, = ax_cheb.plot([], [], color='tab:blue', label='Quota effettiva dei dati')
+            linea_k = ax_cheb.axvline(self.k_val_sheby, color='red', linestyle=':', label='k scelto')
+            ax_cheb.set_ylim(0, 1.05)
+            ax_cheb.set_title(f"Disuguaglianza di Chebyshev per '{variable_name}'")
+            ax_cheb.set_xlabel("k (numero di deviazioni standard)")
+            ax_cheb.set_ylabel("Quota entro media ± k·σ")
+            ax_cheb.legend(loc='lower right')
+            ax_cheb.grid(True, linestyle='--', alpha=0.6)
+            fig_cheb.tight_layout()
+            canvas_cheb = FigureCanvasTkAgg(fig_cheb, master=frame_cheb)
+            canvas_cheb.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+            self.matplotlib_widgets.append(canvas_cheb)
+            vista_cheb['curva'] = (ax_cheb, linea_teorica, linea_effettiva, linea_k, canvas_cheb)
+            self._aggiorna_curva_chebyshev(vista_cheb)
+            plt.close(fig_cheb)
+
     # --- FUNZIONE PRINCIPALE PER L'ANALISI DESCRITTIVA UNIVARIATA ---
     def esegui_analisi_descrittiva(self, *args):
-        if self.df is None: return
+        if self._nessun_dato(): return
         variable = self.selettore_var_descrittiva.get()
         if not variable: return
 
@@ -861,6 +1595,15 @@ class App(customtkinter.CTk):
             self.analisi_generica(variable)
 
     # --- FUNZIONE SPECIFICA PER ANALIZZARE LA VARIABILE TEMPORALE ---
+    def _conteggi_temporali(self, tipo_aggregazione):
+        if tipo_aggregazione == 'Annuale':
+            return self.df.groupby(self.df['Data_Ora_Incidente'].dt.year).size()
+        if tipo_aggregazione == 'Mensile':
+            plot_data = self.df.groupby(self.df['Data_Ora_Incidente'].dt.to_period('M')).size()
+            plot_data.index = plot_data.index.strftime('%Y-%m') # Formatta l'indice per la leggibilità.
+            return plot_data
+        return self.df.groupby(self.df['Data_Ora_Incidente'].dt.date).size()
+
     def analisi_speciale_data_ora(self):
         self.pulisci_frame(self.frame_risultati_descrittiva)
         
@@ -892,16 +1635,18 @@ class App(customtkinter.CTk):
         ax_title, ax_xlabel = "", ""
         
         # --- Logica di aggregazione dei dati in base alla scelta ---
-        if tipo_aggregazione == 'Annuale':
-            plot_data = self.df.groupby(self.df['Data_Ora_Incidente'].dt.year).size()
-            ax_title, ax_xlabel = 'Andamento Annuale degli Incidenti', 'Anno'
-        elif tipo_aggregazione == 'Mensile':
-            plot_data = self.df.groupby(self.df['Data_Ora_Incidente'].dt.to_period('M')).size()
-            plot_data.index = plot_data.index.strftime('%Y-%m') # Formatta l'indice per la leggibilità.
-            ax_title, ax_xlabel = 'Andamento Mensile degli Incidenti', 'Mese'
-        elif tipo_aggregazione == 'Giornaliero':
-            plot_data = self.df.groupby(self.df['Data_Ora_Incidente'].dt.date).size()
-            ax_title, ax_xlabel = 'Andamento Giornaliero degli Incidenti', 'Data'
+        # In modalità fuori memoria i conteggi derivano da quelli giornalieri accumulati durante la lettura.
+        if self.aggregati is not None:
+            plot_data = self.aggregati.conteggi_temporali(tipo_aggregazione)
+            ax_title, ax_xlabel = {'Annuale': ('Andamento Annuale degli Incidenti', 'Anno'),
+                                   'Mensile': ('Andamento Mensile degli Incidenti', 'Mese'),
+                                   'Giornaliero': ('Andamento Giornaliero degli Incidenti', 'Data')}[tipo_aggregazione]
+        elif tipo_aggregazione in ('Annuale', 'Mensile', 'Giornaliero'):
+            # I conteggi per ciascuna aggregazione vengono calcolati una volta per dataset.
+            plot_data = self._memo(('andamento', tipo_aggregazione), lambda: self._conteggi_temporali(tipo_aggregazione))
+            ax_title, ax_xlabel = {'Annuale': ('Andamento Annuale degli Incidenti', 'Anno'),
+                                   'Mensile': ('Andamento Mensile degli Incidenti', 'Mese'),
+                                   'Giornaliero': ('Andamento Giornaliero degli Incidenti', 'Data')}[tipo_aggregazione]
         # Le opzioni "Distribuzione Oraria/Settimanale" sono state rimosse in questa versione del codice,
         # ma la logica per gestirle potrebbe essere reinserita qui se necessario.
 
@@ -939,8 +1684,16 @@ class App(customtkinter.CTk):
     def analisi_generica(self, variable):
         self.pulisci_frame(self.frame_risultati_descrittiva)
         tipo_grafico = self.selettore_grafico_descrittiva.get()
-        data = self.df[variable].dropna()
-        if data.empty:
+        if self.aggregati is not None:
+            # In modalità fuori memoria: riepilogo per le numeriche, tabella di frequenza per le altre.
+            if variable in self.aggregati.momenti:
+                data = self.aggregati.riepilogo(variable)
+            else:
+                frequenze = self.aggregati.frequenze_colonna(variable)
+                data = frequenze if frequenze is not None else pd.Series(dtype=np.int64)
+        else:
+            data = self._dati_colonna(variable)
+        if len(data) == 0 or (isinstance(data, RiepilogoColonna) and not data.quantili_disponibili):
             customtkinter.CTkLabel(self.frame_risultati_descrittiva, text="Nessun dato disponibile.").pack()
             return
         
@@ -950,29 +1703,41 @@ class App(customtkinter.CTk):
         velocity_variations = ["Velocita_Media_Stimata", "Velocità_media_Stimata", "Velocità_Media_Stimata", "velocita_media_stimata"]
         
         # --- Logica speciale per la variabile velocità ---
+        # In modalità fuori memoria la velocità è un riepilogo: le fasce si costruiscono sui valori distinti.
+        da_frequenze = isinstance(data, RiepilogoColonna)
         if variable in velocity_variations or "velocit" in variable.lower():
-            original_data = data.copy() # Mantiene i dati numerici originali per i calcoli.
+            original_data = data # Mantiene i dati numerici originali per i calcoli (pd.cut non li modifica).
+            massimo = data.momenti.massimo if da_frequenze else data.max()
+            valori_da_classificare = data.frequenze.index.to_numpy() if da_frequenze else data
             
             # Crea gli intervalli (bin) per raggruppare le velocità in fasce.
-            bins = list(range(0, int(data.max()) + 20, 10))
-            labels = [f"{i}-{i+9} km/h" for i in range(0, int(data.max()) + 10, 10)]
+            bins = list(range(0, int(massimo) + 20, 10))
+            labels = [f"{i}-{i+9} km/h" for i in range(0, int(massimo) + 10, 10)]
 
             # Si assicura che il numero di etichette corrisponda al numero di intervalli.
             required_labels = len(bins) - 1 if len(bins) > 1 else 0
             labels_to_use = labels[:required_labels] if required_labels > 0 and len(labels) >= required_labels else None
 
-            try:
-                # Applica la categorizzazione.
-                categorized_data = pd.cut(data, bins=bins, labels=labels_to_use, include_lowest=True) if labels_to_use else pd.cut(data, bins=bins, include_lowest=True)
-            except ValueError:
-                 categorized_data = pd.cut(data, bins=bins, include_lowest=True)
+            def classifica():
+                try:
+                    # Applica la categorizzazione.
+                    categorie = pd.cut(valori_da_classificare, bins=bins, labels=labels_to_use, include_lowest=True) if labels_to_use else pd.cut(valori_da_classificare, bins=bins, include_lowest=True)
+                except ValueError:
+                    categorie = pd.cut(valori_da_classificare, bins=bins, include_lowest=True)
+                if da_frequenze:
+                    # Somma i conteggi dei valori distinti che cadono in ciascuna fascia.
+                    categorie = pd.Series(data.frequenze.to_numpy()).groupby(categorie, observed=True).sum()
+                return categorie
+            # Le fasce di velocità della colonna completa vengono calcolate una volta per dataset.
+            categorized_data = self._memo(('fasce_velocita', variable), classifica) if not da_frequenze else classifica()
 
             is_numeric = True  # La velocità è intrinsecamente numerica.
             display_data = categorized_data  # Dati da usare per grafici categorici (barre/torta).
             numeric_data = original_data     # Dati da usare per grafici numerici (istogramma/boxplot) e indici.
         else:
             # Per tutte le altre variabili, la gestione è standard.
-            is_numeric = pd.api.types.is_numeric_dtype(data)
+            # (una tabella di frequenza della modalità fuori memoria è numerica, ma descrive una variabile categorica).
+            is_numeric = da_frequenze or (self.aggregati is None and pd.api.types.is_numeric_dtype(data))
             display_data = data
             numeric_data = data
         
@@ -1004,8 +1769,9 @@ class App(customtkinter.CTk):
             frame_indici.grid_columnconfigure((0,1,2,3), weight=1)
             
             # Calcola gli indici statistici principali.
-            indici = {'Media': stats_data.mean(), 'Mediana': stats_data.median(), 'Moda': stats_data.mode().iloc[0] if not stats_data.mode().empty else 'N/A', 
-                'Varianza': stats_data.var(ddof=1), 'Dev. Std': stats_data.std(ddof=1), 'Asimmetria': stats_data.skew(), 'Curtosi': stats_data.kurtosis()}
+            calcolati = self._memo_colonna('indici', stats_data, lambda: self._indici_numerici(stats_data))
+            indici = {'Media': calcolati['media'], 'Mediana': calcolati['mediana'], 'Moda': calcolati['moda'],
+                'Varianza': calcolati['varianza'], 'Dev. Std': calcolati['dev_std'], 'Asimmetria': calcolati['asimmetria'], 'Curtosi': calcolati['curtosi']}
             
             # Popola dinamicamente la griglia con gli indici.
             row, col = 0, 0
@@ -1026,7 +1792,7 @@ class App(customtkinter.CTk):
             if tipo_grafico == 'Istogramma':
                 if is_numeric: 
                     plot_data = numeric_data # Usa sempre i dati numerici originali per l'istogramma.
-                    ax.hist(plot_data, bins='auto', edgecolor='black')
+                    self._disegna_istogramma(ax, plot_data)
                     ax.set_xlabel(variable); ax.set_ylabel('Frequenza')
                 else: 
                     ax.text(0.5, 0.5, 'Istogramma non applicabile a dati non numerici', ha='center', va='center', transform=ax.transAxes)
@@ -1034,13 +1800,16 @@ class App(customtkinter.CTk):
             elif tipo_grafico == 'Box Plot':
                 if is_numeric: 
                     plot_data = numeric_data # Usa sempre i dati numerici originali per il box plot.
-                    ax.boxplot(plot_data, vert=False, showfliers=True)
+                    self._disegna_box_plot(ax, plot_data)
                     ax.set_yticklabels([variable]); ax.set_xlabel('Valore')
                 else: 
                     ax.text(0.5, 0.5, 'Box Plot non applicabile a dati non numerici', ha='center', va='center', transform=ax.transAxes)
             else:
                 # Per grafici a barre, torta, linee, aste, si usano i dati di visualizzazione (categorizzati per la velocità).
-                freq_data = display_data.value_counts()
+                # In modalità fuori memoria le frequenze sono già state contate durante la lettura.
+                if isinstance(display_data, RiepilogoColonna): freq_data = display_data.frequenze.copy()
+                elif self.aggregati is not None: freq_data = display_data.copy()
+                else: freq_data = self._memo(('conteggi', variable), lambda: conteggi_valori(display_data))
                 plot_data = freq_data
                 
                 # --- Ordinamento intelligente per migliorare la leggibilità dei grafici ---
@@ -1065,6 +1834,10 @@ class App(customtkinter.CTk):
                     except Exception:
                         plot_data = plot_data.sort_index() # Fallback a ordinamento standard.
 
+                else:
+                    # La torta mostra le fette dalla più grande alla più piccola.
+                    plot_data = plot_data.sort_values(ascending=False)
+
                 ax.set_xlabel('Categorie'); ax.set_ylabel('Frequenza')
                 
                 if tipo_grafico == 'Barre': plot_data.plot(kind='bar', ax=ax)
@@ -1082,23 +1855,52 @@ class App(customtkinter.CTk):
         finally:
             plt.close(fig) # Libera memoria in ogni caso.
 
+    # --- CALCOLI DELL'ANALISI BIVARIATA (conservati nella cache dei risultati) ---
+    def _statistiche_gruppi(self, df_subset, cat_var, num_var):
+        # Formatta in una stringa le statistiche per ogni gruppo.
+        gruppi = df_subset.groupby(cat_var, observed=True)[num_var]
+        stats_text = "Statistiche per gruppo:\n"
+        for nome, gruppo in gruppi:
+            stats_text += f"• {nome}: Media={gruppo.mean():.2f}, Std={gruppo.std():.2f}, Mediana={gruppo.median():.2f}, N={len(gruppo)}\n"
+        # Esegue il test ANOVA se ci sono almeno due gruppi.
+        try:
+            gruppi_valori = [gruppo.values for nome, gruppo in gruppi]
+            f_stat, p_value_anova = stats.f_oneway(*gruppi_valori)
+            stats_text += f"\nTest ANOVA: F-statistic = {f_stat:.3f}, p-value = {p_value_anova:.3g}"
+        except:
+            stats_text += "\nTest ANOVA non calcolabile."
+        return stats_text
+
+    def _tabella_contingenza(self, x_data, y_data):
+        crosstab = pd.crosstab(x_data, y_data)
+        # Esegue il test del Chi-quadrato.
+        try:
+            chi2, p_value_chi2, dof, expected = stats.chi2_contingency(crosstab)
+            stats_text = f"Test Chi-quadrato: χ² = {chi2:.3f}, p-value = {p_value_chi2:.3g}, df = {dof}"
+        except:
+            stats_text = "Test Chi-quadrato: Non calcolabile"
+        return crosstab, stats_text
+
     # --- FUNZIONE PER ESEGUIRE L'ANALISI BIVARIATA ---
     def esegui_analisi_bivariata(self, *args):
         self.pulisci_frame(self.frame_risultati_bivariata)
+        if self.aggregati is not None:
+            self._mostra_non_disponibile(self.frame_risultati_bivariata, "L'analisi bivariata"); return
         if self.df is None: return
 
         var_x, var_y = self.selettore_var_biv_x.get(), self.selettore_var_biv_y.get()
         if not var_x or not var_y: return
 
         try:
-            df_subset = self.df[[var_x, var_y]].dropna()
+            # Le righe valide della coppia di variabili vengono selezionate una volta per dataset.
+            df_subset = self._memo(('bivariata', var_x, var_y), lambda: self.df[[var_x, var_y]].dropna())
             if len(df_subset) < 2:
                 customtkinter.CTkLabel(self.frame_risultati_bivariata, text="Dati insufficienti per l'analisi.").pack(); return
 
             container = self.frame_risultati_bivariata
             container.grid_rowconfigure(1, weight=1); container.grid_columnconfigure(0, weight=1)
             
-            x_data, y_data = df_subset[var_x], df_subset[var_y]
+            x_data, y_data = a_tipo_numpy(df_subset[var_x]), a_tipo_numpy(df_subset[var_y])
             
             # Determina il tipo di ciascuna variabile per scegliere l'analisi corretta.
             x_is_numeric = pd.api.types.is_numeric_dtype(x_data)
@@ -1120,7 +1922,7 @@ class App(customtkinter.CTk):
                 if var_x == var_y:
                     correlation, p_value, slope, intercept = 1.0, 0.0, 1.0, 0.0
                 else:
-                    regression = stats.linregress(x=x_data, y=y_data)
+                    regression = self._memo(('regressione', var_x, var_y), lambda: stats.linregress(x=x_data, y=y_data))
                     slope, intercept, correlation, p_value = regression.slope, regression.intercept, regression.rvalue, regression.pvalue
 
                 # La variabile 'correlation2' non era definita. Corretto calcolando il quadrato di 'correlation'.
@@ -1161,19 +1963,8 @@ class App(customtkinter.CTk):
                 frame_info_biv = customtkinter.CTkFrame(container); frame_info_biv.pack(fill="x", padx=10, pady=10)
                 self._crea_titolo_sezione(frame_info_biv, "Analisi Categorica vs Numerica", info, guida)
                 
-                # Calcola le statistiche per ogni gruppo e le formatta in una stringa.
-                gruppi = df_subset.groupby(cat_var)[num_var]
-                stats_text = "Statistiche per gruppo:\n"
-                for nome, gruppo in gruppi:
-                    stats_text += f"• {nome}: Media={gruppo.mean():.2f}, Std={gruppo.std():.2f}, Mediana={gruppo.median():.2f}, N={len(gruppo)}\n"
-                
-                # Esegue il test ANOVA se ci sono almeno due gruppi.
-                try:
-                    gruppi_valori = [gruppo.values for nome, gruppo in gruppi]
-                    f_stat, p_value_anova = stats.f_oneway(*gruppi_valori)
-                    stats_text += f"\nTest ANOVA: F-statistic = {f_stat:.3f}, p-value = {p_value_anova:.3g}"
-                except:
-                    stats_text += "\nTest ANOVA non calcolabile."
+                # Calcola le statistiche per ogni gruppo e il test ANOVA (una volta per coppia di variabili).
+                stats_text = self._memo(('statistiche_gruppi', cat_var, num_var), lambda: self._statistiche_gruppi(df_subset, cat_var, num_var))
                 
                 customtkinter.CTkLabel(frame_info_biv, text=stats_text, justify="left").pack(pady=5, padx=10, anchor="w")
                 
@@ -1181,10 +1972,9 @@ class App(customtkinter.CTk):
                 frame_grafico = customtkinter.CTkFrame(container); frame_grafico.pack(fill="both", expand=True, padx=10, pady=10)
                 
                 fig, ax = plt.subplots()
-                categories = df_subset[cat_var].unique()
-                box_data = [df_subset[df_subset[cat_var] == cat][num_var].values for cat in categories]
-                
-                ax.boxplot(box_data, labels=categories)
+                # I riepiloghi per categoria (quartili, baffi e valori anomali limitati) si calcolano una volta per coppia di variabili.
+                riepiloghi = self._memo(('box_gruppi', cat_var, num_var), lambda: self._riepiloghi_box_gruppi(df_subset, cat_var, num_var))
+                self._disegna_riepiloghi_box(ax, riepiloghi)
                 ax.set_title(f'Distribuzione di {num_var} per {cat_var}'); ax.set_xlabel(cat_var); ax.set_ylabel(num_var)
                 ax.grid(True, linestyle='--', alpha=0.6); plt.xticks(rotation=45); fig.tight_layout()
                 
@@ -1201,15 +1991,8 @@ class App(customtkinter.CTk):
                 frame_info_biv = customtkinter.CTkFrame(container); frame_info_biv.pack(fill="x", padx=10, pady=10)
                 self._crea_titolo_sezione(frame_info_biv, "Analisi Categorica vs Categorica", info, guida)
                 
-                # Crea la tabella di contingenza.
-                crosstab = pd.crosstab(x_data, y_data)
-                
-                # Esegue il test del Chi-quadrato.
-                try:
-                    chi2, p_value_chi2, dof, expected = stats.chi2_contingency(crosstab)
-                    stats_text = f"Test Chi-quadrato: χ² = {chi2:.3f}, p-value = {p_value_chi2:.3g}, df = {dof}"
-                except:
-                    stats_text = "Test Chi-quadrato: Non calcolabile"
+                # Crea la tabella di contingenza ed esegue il test del Chi-quadrato (una volta per coppia di variabili).
+                crosstab, stats_text = self._memo(('contingenza', var_x, var_y), lambda: self._tabella_contingenza(x_data, y_data))
                 
                 customtkinter.CTkLabel(frame_info_biv, text=stats_text, justify="left").pack(pady=5, padx=10, anchor="w")
                 
@@ -1255,7 +2038,7 @@ class App(customtkinter.CTk):
 
     # --- FUNZIONE PER IL CALCOLO DELLA PROBABILITÀ DI POISSON ---
     def esegui_poisson(self):
-        if self.df is None: return
+        if self._nessun_dato(): return
         try:
             # Recupera gli input dell'utente.
             provincia = self.selettore_provincia_poisson.get()
@@ -1276,16 +2059,20 @@ class App(customtkinter.CTk):
             if not (0 <= ora_inizio <= 23 and 0 <= ora_fine <= 23 and ora_inizio <= ora_fine):
                 raise ValueError("Le ore devono essere valide (0-23) e l'inizio <= fine.")
             
-            # Filtra i dati per la provincia e calcola il numero di giorni unici con dati per quella provincia.
-            df_prov = self.df[self.df['Provincia'] == provincia]
-            # Usa 'Data_Ora_Incidente' per estrarre le date uniche e contarle.
-            giorni_osservati = df_prov['Data_Ora_Incidente'].dt.date.nunique()
+            if self.aggregati is not None:
+                # In modalità fuori memoria usa i conteggi provincia×ora e provincia×giorno accumulati durante la lettura.
+                incidenti_fascia, giorni_osservati = self.aggregati.conteggi_poisson(provincia, ora_inizio, ora_fine)
+            else:
+                # Filtra i dati per la provincia e calcola il numero di giorni unici con dati per quella provincia.
+                df_prov = self.df[self.df['Provincia'] == provincia]
+                # Usa 'Data_Ora_Incidente' per estrarre le date uniche e contarle.
+                giorni_osservati = df_prov['Data_Ora_Incidente'].dt.date.nunique()
+                # Calcola il numero totale di incidenti nella fascia oraria.
+                incidenti_fascia = df_prov[df_prov['Ora'].between(ora_inizio, ora_fine)].shape[0]
 
             if giorni_osservati == 0:
                 risultato = f"Nessun dato per la provincia di {provincia}."
             else:
-                # Calcola il numero totale di incidenti nella fascia oraria.
-                incidenti_fascia = df_prov[df_prov['Ora'].between(ora_inizio, ora_fine)].shape[0]
                 # Stima il parametro lambda (tasso medio) come incidenti totali / giorni osservati.
                 lambda_val = incidenti_fascia / giorni_osservati
                 # Calcola la probabilità di Poisson P(X=k) usando la funzione pmf (Probability Mass Function).
@@ -1303,10 +2090,13 @@ class App(customtkinter.CTk):
 
     # --- FUNZIONE PER IL T-TEST TRA GRUPPI INDIPENDENTI ---
     def esegui_ttest(self):
+        # In modalità fuori memoria il test usa i momenti per fascia oraria accumulati durante la lettura.
+        if self.aggregati is not None:
+            self._esegui_ttest_da_momenti(); return
         if self.df is None or 'Numero_Feriti' not in self.df.columns: return
         # Crea due gruppi: incidenti diurni (7-19) e notturni.
-        data_diurno = self.df[self.df['Ora'].between(7, 19)]['Numero_Feriti'].dropna()
-        data_notturno = self.df[~self.df['Ora'].between(7, 19)]['Numero_Feriti'].dropna()
+        data_diurno = a_tipo_numpy(self.df[self.df['Ora'].between(7, 19)]['Numero_Feriti'].dropna())
+        data_notturno = a_tipo_numpy(self.df[~self.df['Ora'].between(7, 19)]['Numero_Feriti'].dropna())
 
         if len(data_diurno) < 2 or len(data_notturno) < 2:
             risultato = "Dati insufficienti: necessari almeno 2 campioni per gruppo (diurno e notturno)."
@@ -1323,9 +2113,25 @@ class App(customtkinter.CTk):
                                               "Il p-value è alto (p >= 0.05). Non abbiamo sufficiente evidenza statistica per concludere che esista una vera differenza nel numero medio di feriti tra incidenti diurni e notturni. La differenza osservata potrebbe essere dovuta al caso."))
         self._update_textbox(self.risultato_ttest_textbox, risultato)
 
+    # --- FUNZIONE PER IL T-TEST IN MODALITÀ FUORI MEMORIA ---
+    def _esegui_ttest_da_momenti(self):
+        diurno, notturno = self.aggregati.feriti_fascia['diurno'], self.aggregati.feriti_fascia['notturno']
+        if diurno.n < 2 or notturno.n < 2:
+            risultato = "Dati insufficienti: necessari almeno 2 campioni per gruppo (diurno e notturno)."
+        else:
+            # Il test di Welch richiede solo media, deviazione standard e numerosità di ciascun gruppo.
+            ttest_res = stats.ttest_ind_from_stats(diurno.media, diurno.dev_std(ddof=1), diurno.n,
+                                                   notturno.media, notturno.dev_std(ddof=1), notturno.n, equal_var=False)
+            risultato = ("CONFRONTO NUMERO MEDIO FERITI: DIURNO vs. NOTTURNO (modalità fuori memoria)\n"
+                         "--------------------------------------------------\n"
+                         f"Gruppo Diurno (7-19), n={diurno.n}: Media Feriti = {diurno.media:.3f}\n"
+                         f"Gruppo Notturno (<7, >19), n={notturno.n}: Media Feriti = {notturno.media:.3f}\n\n"
+                         f"RISULTATI DEL TEST T DI WELCH:\n  - Statistica t = {ttest_res.statistic:.4f}\n  - p-value = {ttest_res.pvalue:.4f}")
+        self._update_textbox(self.risultato_ttest_textbox, risultato)
+
     # --- FUNZIONE PER IL CALCOLO DELL'INTERVALLO DI CONFIDENZA ---
     def esegui_ci(self):
-        if self.df is None: return
+        if self._nessun_dato(): return
         try:
             # Recupera gli input.
             provincia = self.selettore_provincia_ci.get()
@@ -1336,7 +2142,11 @@ class App(customtkinter.CTk):
 
             # Aggrega i dati per calcolare il numero di incidenti per ogni giorno.
             # Usa 'Data_Ora_Incidente' per estrarre le date uniche e raggruppare.
-            incidenti_giorno = self.df[self.df['Provincia'] == provincia].groupby(self.df['Data_Ora_Incidente'].dt.date).size()
+            if self.aggregati is not None:
+                # In modalità fuori memoria usa i conteggi provincia×giorno accumulati durante la lettura.
+                incidenti_giorno = self.aggregati.incidenti_giornalieri_provincia(provincia)
+            else:
+                incidenti_giorno = self.df[self.df['Provincia'] == provincia].groupby(self.df['Data_Ora_Incidente'].dt.date).size()
             if len(incidenti_giorno) < 2:
                 risultato = f"Dati insufficienti per la provincia di {provincia} (necessari almeno 2 giorni con incidenti per calcolare la variabilità)."
             else:
@@ -0,0 +1,173 @@
+# ==================================================================================
+# SCHEMA TIPIZZATO DEL DATAFRAME DEGLI INCIDENTI
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import numpy as np  # Libreria per il calcolo numerico, usata per scegliere i tipi interi più compatti.
+import pandas as pd  # Libreria per la manipolazione dei DataFrame.
+
+# --- SCHEMA DICHIARATO DELLE COLONNE ---
+# Per ogni colonna nota indica come deve essere memorizzata dopo il caricamento:
+# - 'datetime': data e ora dell'incidente;
+# - 'categoria': testo con pochi valori distinti, salvato come 'category' (codici interi + dizionario);
+# - 'conteggio': intero non negativo, salvato con il tipo intero più piccolo che lo contiene;
+# - 'float32': misura continua a precisione singola;
+# - 'ora': ora del giorno (0-23), salvata come int8.
+SCHEMA_INCIDENTI = {
+    'Data_Ora_Incidente': 'datetime',
+    'Provincia': 'categoria',
+    'Giorno_Settimana': 'categoria',
+    'Tipo_Strada': 'categoria',
+    'Numero_Feriti': 'conteggio',
+    'Numero_Morti': 'conteggio',
+    'Velocita_Media_Stimata': 'float32',
+    'Ora': 'ora',
+}
+
+# Colonne senza le quali un record non è utilizzabile.
+COLONNE_ESSENZIALI = ['Data_Ora_Incidente', 'Provincia']
+# Formati di data/ora provati sul campione, dal più comune al meno comune.
+FORMATI_DATA_ORA = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y/%m/%d %H:%M:%S',
+                    '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d-%m-%Y %H:%M:%S', '%Y-%m-%d']
+# Numero di valori usati per riconoscere il formato dominante della colonna.
+DIMENSIONE_CAMPIONE_FORMATO = 1000
+# Valore di 'formato' che chiede di riconoscere il formato sulla colonna stessa (altrimenti il formato è già noto,
+# es. riconosciuto una sola volta per tutti gli intervalli di un file letto in parallelo).
+FORMATO_AUTOMATICO = 'auto'
+# Tipi interi candidati, dal più piccolo al più grande, con il corrispondente tipo nullable di pandas.
+TIPI_INTERI = [(np.int8, 'Int8'), (np.int16, 'Int16'), (np.int32, 'Int32'), (np.int64, 'Int64')]
+
+
+# --- FUNZIONE PER MISURARE LA MEMORIA OCCUPATA DA UN DATAFRAME ---
+def memoria_dataframe(df):
+    # 'deep=True' conta anche le stringhe Python contenute nelle colonne 'object'.
+    return int(df.memory_usage(deep=True).sum())
+
+
+# --- FUNZIONE PER CONVERTIRE UNA COLONNA DI CONTEGGI NEL TIPO INTERO PIÙ PICCOLO ---
+def converti_conteggio(serie):
+    numerica = pd.to_numeric(serie, errors='coerce')
+    validi = numerica.dropna()
+    # Se ci sono valori non interi (es. 1.5) la colonna non è un vero conteggio: resta decimale.
+    if not validi.empty and not np.all(np.mod(validi.to_numpy(dtype=np.float64), 1) == 0):
+        return numerica.astype(np.float32)
+    minimo, massimo = (validi.min(), validi.max()) if not validi.empty else (0, 0)
+    for tipo_numpy, tipo_nullable in TIPI_INTERI:
+        info = np.iinfo(tipo_numpy)
+        if info.min <= minimo and massimo <= info.max:
+            # Con valori mancanti usa l'intero nullable di pandas, altrimenti l'intero NumPy.
+            return numerica.astype(tipo_nullable if numerica.isna().any() else tipo_numpy)
+    return numerica
+
+
+# --- FUNZIONE PER CONVERTIRE UNA COLONNA DI TESTO IN 'CATEGORY' ---
+def converti_categoria(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Elimina le categorie rimaste senza righe (es. dopo la rimozione dei record incompleti).
+        return serie.cat.remove_unused_categories()
+    return serie.astype('category')
+
+
+# --- FUNZIONE CHE APPLICA LO SCHEMA A TUTTE LE COLONNE PRESENTI ---
+def applica_schema(df):
+    for col, tipo in SCHEMA_INCIDENTI.items():
+        if col not in df.columns: continue
+        if tipo == 'categoria':
+            df[col] = converti_categoria(df[col])
+        elif tipo == 'conteggio':
+            df[col] = converti_conteggio(df[col])
+        elif tipo == 'float32':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float32)
+        elif tipo == 'ora':
+            df[col] = df[col].astype(np.int8)
+    return df
+
+
+# --- FUNZIONE PER RICONOSCERE IL FORMATO DOMINANTE DI UNA COLONNA DI DATE ---
+def rileva_formato_data_ora(serie, dimensione_campione=DIMENSIONE_CAMPIONE_FORMATO):
+    # Prende valori distribuiti su tutto il file, non solo le prime righe.
+    if len(serie) > dimensione_campione:
+        serie = serie.iloc[np.linspace(0, len(serie) - 1, dimensione_campione).astype(np.int64)]
+    campione = serie.dropna().astype(str).str.strip()
+    if campione.empty:
+        return None
+    # Per ogni formato conta quanti valori del campione vengono interpretati correttamente.
+    riusciti = {formato: pd.to_datetime(campione, format=formato, errors='coerce').notna().sum() for formato in FORMATI_DATA_ORA}
+    migliore = max(FORMATI_DATA_ORA, key=lambda formato: riusciti[formato])
+    return migliore if riusciti[migliore] > 0 else None
+
+
+# --- FUNZIONE CHE INTERPRETA UNO PER UNO VALORI IN FORMATI DIVERSI (PERCORSO LENTO) ---
+def _interpreta_valori_misti(serie):
+    testo = serie.astype(str).str.strip()
+    # Le date che iniziano con l'anno (es. 2024-03-01) sono lette così come sono; le altre
+    # seguono la convenzione italiana giorno/mese/anno per i casi ambigui (es. 01/02/2024).
+    anno_iniziale = testo.str.match(r'^\d{4}')
+    risultato = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+    if anno_iniziale.any():
+        risultato[anno_iniziale] = pd.to_datetime(testo[anno_iniziale], format='mixed', errors='coerce')
+    if (~anno_iniziale).any():
+        risultato[~anno_iniziale] = pd.to_datetime(testo[~anno_iniziale], format='mixed', dayfirst=True, errors='coerce')
+    return risultato
+
+
+# --- FUNZIONE PER CONVERTIRE LA COLONNA DELLE DATE (FORMATO FISSO + RECUPERO DEI VALORI DIVERSI) ---
+def converti_data_ora(serie, formato=FORMATO_AUTOMATICO):
+    # Restituisce la serie convertita e un dizionario con il numero di righe passate per ciascun percorso.
+    # 'formato' è FORMATO_AUTOMATICO, un formato già riconosciuto oppure None (nessun formato noto).
+    resoconto = {'formato': None, 'righe_formato_fisso': 0, 'righe_inferenza': 0}
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie, resoconto
+    if formato == FORMATO_AUTOMATICO:
+        formato = rileva_formato_data_ora(serie)
+    resoconto['formato'] = formato
+    if formato is None:
+        # Nessun formato noto: tutta la colonna passa per l'interpretazione valore per valore.
+        resoconto['righe_inferenza'] = int(serie.notna().sum())
+        return _interpreta_valori_misti(serie), resoconto
+    # Percorso veloce: tutta la colonna viene convertita in modo vettoriale con il formato riconosciuto.
+    convertita = pd.to_datetime(serie, format=formato, errors='coerce')
+    falliti = convertita.isna() & serie.notna()
+    resoconto['righe_formato_fisso'] = int(convertita.notna().sum())
+    if falliti.any():
+        # Percorso lento: solo le righe in un formato diverso vengono reinterpretate una per una.
+        convertita[falliti] = _interpreta_valori_misti(serie[falliti])
+        resoconto['righe_inferenza'] = int(falliti.sum())
+    return convertita, resoconto
+
+
+# --- FUNZIONE CHE RIPORTA UNA SERIE NUMERICA A UN TIPO NUMPY STANDARD ---
+def a_tipo_numpy(serie):
+    # I tipi nullable (es. 'Int8') non sono gestiti da matplotlib e scipy: dopo un dropna()
+    # vengono riportati al tipo NumPy equivalente, o a float64 se restano valori mancanti.
+    if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.astype(serie.dtype.numpy_dtype if not serie.isna().any() else np.float64)
+    return serie
+
+
+# --- FUNZIONE DI PULIZIA E TIPIZZAZIONE DEL DATAFRAME DEGLI INCIDENTI ---
+def prepara_incidenti(df, misura_memoria=True, formato_data=FORMATO_AUTOMATICO):
+    # Il DataFrame ricevuto viene modificato sul posto: il chiamante deve passarne una copia se gli serve l'originale.
+    # Restituisce il DataFrame pulito e un dizionario con le informazioni per il resoconto.
+    # 'misura_memoria=False' evita il conteggio (lento) della memoria, inutile per i blocchi in streaming.
+    # 'formato_data' è passato a converti_data_ora.
+    resoconto = {'memoria_prima': memoria_dataframe(df)} if misura_memoria else {}
+    # Se esiste la colonna 'Data_Ora_Incidente', la converte in formato datetime di pandas.
+    # Le date non valide diventano 'NaT' (Not a Time), senza bloccare il programma.
+    if 'Data_Ora_Incidente' in df.columns:
+        df['Data_Ora_Incidente'], resoconto['date'] = converti_data_ora(df['Data_Ora_Incidente'], formato_data)
+
+    original_rows = len(df)  # Salva il numero di righe originali.
+    # Rimuove le righe che hanno valori mancanti ('NaT' o 'NaN') nelle colonne essenziali.
+    df.dropna(subset=COLONNE_ESSENZIALI, inplace=True)
+    resoconto['righe_rimosse'] = original_rows - len(df)  # Calcola quante righe sono state eliminate.
+    if df.empty:
+        if misura_memoria: resoconto['memoria_dopo'] = memoria_dataframe(df)
+        return df, resoconto
+
+    # Estrae l'ora da 'Data_Ora_Incidente' e la salva in una nuova colonna per facilitare le analisi.
+    df['Ora'] = df['Data_Ora_Incidente'].dt.hour
+    # Converte ogni colonna nel tipo dichiarato dallo schema.
+    df = applica_schema(df)
+    if misura_memoria: resoconto['memoria_dopo'] = memoria_dataframe(df)
+    return df, resoconto
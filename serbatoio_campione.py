@@ -0,0 +1,140 @@
+# ==================================================================================
+# CAMPIONE A SERBATOIO (RESERVOIR SAMPLING) LETTO IN STREAMING DA UN FILE CSV
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import numpy as np  # Libreria per generare le chiavi casuali e scegliere le righe da conservare.
+import pandas as pd  # Libreria per i blocchi letti dal CSV e per il campione finale.
+from schema_incidenti import prepara_incidenti, COLONNE_ESSENZIALI  # Pulizia e tipizzazione (modulo del progetto).
+from campionamento import allocazione  # Allocazione proporzionale tra gli strati (modulo del progetto).
+
+# Tipi di campione: uniforme, pesato con una colonna numerica (probabilità proporzionale al valore), stratificato per provincia.
+MODI_SERBATOIO = ('uniforme', 'pesato', 'stratificato')
+# Colonna usata per gli strati nel campione stratificato.
+COLONNA_STRATI_SERBATOIO = 'Provincia'
+
+
+# --- CLASSE CHE CONSERVA UN CAMPIONE CASUALE DI n RIGHE DI UN FILE LETTO A BLOCCHI ---
+class SerbatoioCampione:
+    # Ogni riga riceve una chiave casuale e il serbatoio conserva le n righe con la chiave più piccola: alla fine
+    # è un campione casuale semplice senza reinserimento, qualunque sia la lunghezza del file. La memoria occupata
+    # è quella di un blocco più n righe (n per ogni strato nel campione stratificato).
+    # - 'uniforme': chiave U(0, 1);
+    # - 'pesato': chiave esponenziale -ln(U) / peso (Efraimidis-Spirakis): ogni estrazione successiva sceglie una
+    #   riga con probabilità proporzionale al peso; le righe con peso mancante o non positivo non vengono mai scelte;
+    # - 'stratificato': un serbatoio di n righe per provincia; al termine, noti i totali di ogni provincia, ne vengono
+    #   tenute n_h proporzionali (le n_h chiavi più piccole di uno strato sono ancora un campione casuale semplice).
+    # Solo le righe candidate a entrare nel serbatoio passano per prepara_incidenti, non tutto il file.
+    def __init__(self, n, modo='uniforme', colonna_pesi=None, seed=None):
+        if modo not in MODI_SERBATOIO:
+            raise ValueError(f"tipo di campione sconosciuto: {modo}")
+        if modo == 'pesato' and not colonna_pesi:
+            raise ValueError("il campione pesato richiede una colonna dei pesi.")
+        self.n = n
+        self.modo = modo
+        self.colonna_pesi = colonna_pesi
+        self._rng = np.random.default_rng(seed)
+        self.campione = None  # Righe conservate, così come lette dal file.
+        self.chiavi = np.empty(0)  # Chiave di ciascuna riga conservata.
+        self.posizioni = np.empty(0, dtype=np.int64)  # Posizione nel file di ciascuna riga conservata.
+        self.righe_lette = 0  # Righe lette dal file.
+        self.righe_valide = 0  # Righe con data e provincia presenti: la popolazione da cui si estrae.
+        self.totali_strati = pd.Series(dtype=np.int64)  # Righe valide di ogni provincia (solo campione stratificato).
+
+    # --- SOGLIA DI INGRESSO PER OGNI RIGA DEL BLOCCO ---
+    def _soglie(self, strati):
+        # Una riga entra nel serbatoio solo se la sua chiave è minore della più grande chiave conservata, quando
+        # il serbatoio (o, nel campione stratificato, la parte del suo strato) è già pieno; altrimenti entra sempre.
+        # Se il serbatoio contiene più di n righe la soglia è meno severa del necessario, ma sempre corretta: una riga
+        # scartata ha comunque almeno n chiavi più piccole della sua.
+        if self.campione is None:
+            return np.inf
+        if self.modo != 'stratificato':
+            return self.chiavi.max() if self.chiavi.size >= self.n else np.inf
+        codici, etichette = pd.factorize(self.campione[COLONNA_STRATI_SERBATOIO].to_numpy())
+        massime = np.full(len(etichette), -np.inf)
+        np.maximum.at(massime, codici, self.chiavi)
+        soglie = pd.Series(np.where(np.bincount(codici, minlength=len(etichette)) >= self.n, massime, np.inf), index=etichette)
+        return strati.map(soglie).fillna(np.inf).to_numpy(dtype=np.float64)
+
+    # --- INSERIMENTO DI UN BLOCCO DI RIGHE LETTE DAL FILE ---
+    def aggiorna(self, blocco):
+        if self.modo == 'pesato' and self.colonna_pesi not in blocco.columns:
+            raise ValueError(f"il file non contiene la colonna dei pesi '{self.colonna_pesi}'.")
+        inizio = self.righe_lette
+        self.righe_lette += len(blocco)
+        # Popolazione: righe con data e provincia presenti (le stesse che prepara_incidenti non scarta).
+        valide = blocco[[col for col in COLONNE_ESSENZIALI if col in blocco.columns]].notna().all(axis=1).to_numpy()
+        self.righe_valide += int(valide.sum())
+        u = self._rng.random(len(blocco))
+        if self.modo == 'pesato':
+            pesi = pd.to_numeric(blocco[self.colonna_pesi], errors='coerce').to_numpy(dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                chiavi = np.where(pesi > 0, -np.log1p(-u) / pesi, np.inf)
+        else:
+            chiavi = u
+        strati = None
+        if self.modo == 'stratificato':
+            # Le province restano testo (come nel file): i blocchi si uniscono senza allineare categorie.
+            strati = blocco[COLONNA_STRATI_SERBATOIO].where(valide)
+            self.totali_strati = self.totali_strati.add(strati[valide].value_counts(), fill_value=0).astype(np.int64)
+        candidate = np.flatnonzero(valide & (chiavi < self._soglie(strati)))
+        if candidate.size == 0:
+            return self
+        # Le righe candidate vengono pulite su una copia solo per scartare quelle con una data non interpretabile:
+        # il serbatoio conserva le righe originali, pulite e tipizzate una sola volta alla fine.
+        righe = blocco.iloc[candidate].reset_index(drop=True)
+        pulite, _ = prepara_incidenti(righe.copy(), misura_memoria=False)
+        tenute = pulite.index.to_numpy()
+        if tenute.size == 0:
+            return self
+        if self.campione is None:
+            self.campione = righe.iloc[tenute].reset_index(drop=True)
+            self.chiavi, self.posizioni = chiavi[candidate[tenute]], inizio + candidate[tenute]
+        else:
+            self.campione = pd.concat([self.campione, righe.iloc[tenute]], ignore_index=True)
+            self.chiavi = np.concatenate([self.chiavi, chiavi[candidate[tenute]]])
+            self.posizioni = np.concatenate([self.posizioni, inizio + candidate[tenute]])
+        # Il serbatoio viene ridotto solo quando supera il doppio della capacità: ogni riduzione riscrive tutte
+        # le righe conservate e farla a ogni blocco costerebbe più della lettura stessa.
+        capacita = self.n * (len(self.totali_strati) if self.modo == 'stratificato' else 1)
+        if len(self.campione) > 2 * capacita:
+            self._riduci(self.n)
+        return self
+
+    # --- RIDUZIONE DEL SERBATOIO ALLE n CHIAVI PIÙ PICCOLE (PER STRATO NEL CAMPIONE STRATIFICATO) ---
+    def _riduci(self, n):
+        # 'n' è un intero oppure, per il campione stratificato, una Series con il numero di righe di ogni provincia.
+        if self.modo == 'stratificato':
+            # Ordinamento per (strato, chiave): il rango nello strato indica quali righe restano.
+            codici, etichette = pd.factorize(self.campione[COLONNA_STRATI_SERBATOIO].to_numpy())
+            ordine = np.lexsort((self.chiavi, codici))
+            rango = pd.Series(codici[ordine]).groupby(codici[ordine]).cumcount().to_numpy()
+            limiti = n.reindex(etichette, fill_value=0).to_numpy() if isinstance(n, pd.Series) else np.full(len(etichette), n)
+            tenute = np.sort(ordine[rango < limiti[codici[ordine]]])
+        elif self.chiavi.size > n:
+            tenute = np.sort(np.argpartition(self.chiavi, n - 1)[:n])
+        else:
+            return
+        self.campione = self.campione.iloc[tenute].reset_index(drop=True)
+        self.chiavi, self.posizioni = self.chiavi[tenute], self.posizioni[tenute]
+
+    # --- CAMPIONE FINALE, NELL'ORDINE DEL FILE ---
+    def risultato(self):
+        # Restituisce il DataFrame pulito e tipizzato e il resoconto per inizializza_dati e per l'interfaccia.
+        if self.campione is None:
+            return pd.DataFrame(), {'righe_rimosse': 0, 'righe_lette': self.righe_lette, 'popolazione': self.righe_valide}
+        if self.modo == 'stratificato':
+            # Allocazione proporzionale ai totali delle province nel file.
+            n_h = allocazione(self.totali_strati.to_numpy(), min(self.n, self.righe_valide), 'proporzionale')
+            self._riduci(pd.Series(n_h, index=self.totali_strati.index))
+        else:
+            self._riduci(self.n)
+        ordine = np.argsort(self.posizioni, kind='stable')
+        campione, resoconto = prepara_incidenti(self.campione.iloc[ordine].reset_index(drop=True))
+        # Le righe scartate sono quelle del file senza data o provincia, non quelle del campione.
+        resoconto.update({'righe_rimosse': self.righe_lette - self.righe_valide, 'righe_lette': self.righe_lette,
+                          'popolazione': self.righe_valide, 'modo': self.modo, 'colonna_pesi': self.colonna_pesi})
+        if self.modo == 'stratificato':
+            resoconto['strati'] = {provincia: (int(totale), int(n)) for provincia, totale, n in zip(self.totali_strati.index, self.totali_strati, n_h)}
+        return campione, resoconto
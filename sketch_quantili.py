@@ -0,0 +1,157 @@
+# ==================================================================================
+# SKETCH DEI QUANTILI COMBINABILE (STILE KLL) PER DATI A BLOCCHI E FUORI MEMORIA
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import math  # Modulo per calcolare le capacità dei livelli.
+import numpy as np  # Libreria per ordinare e compattare i valori in modo vettoriale.
+
+# Parametro di precisione predefinito: più è grande, minore è l'errore e maggiore la memoria (circa 3·k valori).
+K_SKETCH_PREDEFINITO = 200
+# Rapporto tra la capacità di un livello e quella del livello superiore (valore proposto da Karnin, Lang e Liberty).
+FATTORE_CAPACITA = 2 / 3
+# Capacità minima di un livello.
+CAPACITA_MINIMA = 2
+
+
+# --- CLASSE CHE STIMA I QUANTILI CONSERVANDO SOLO UNA PARTE DEI VALORI ---
+class SketchQuantili:
+    # I valori entrano nel livello 0. Quando un livello supera la sua capacità viene ordinato e compattato:
+    # metà dei valori (quelli di posto pari o dispari, a caso) sale al livello successivo, dove ogni valore
+    # rappresenta il doppio delle osservazioni. Due sketch si uniscono concatenando i livelli e compattando.
+    # L'errore sul rango di un quantile è proporzionale a 1/k e non dipende dal numero di valori.
+    def __init__(self, k=K_SKETCH_PREDEFINITO, seed=None):
+        self.k = k
+        self.livelli = [np.empty(0, dtype=np.float64)]  # livelli[h]: valori di peso 2**h.
+        self.n = 0  # Numero di valori inseriti (esatto).
+        self.minimo, self.massimo = np.inf, -np.inf  # Estremi esatti.
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.n
+
+    # --- CAPACITÀ DI UN LIVELLO (i livelli più alti ne hanno di più) ---
+    def _capacita(self, h):
+        profondita = len(self.livelli) - 1 - h
+        return max(CAPACITA_MINIMA, math.ceil(self.k * FATTORE_CAPACITA ** profondita))
+
+    # --- INSERIMENTO DI UN BLOCCO DI VALORI ---
+    def aggiorna(self, valori):
+        valori = np.asarray(valori, dtype=np.float64)
+        valori = valori[~np.isnan(valori)]
+        if valori.size == 0: return self
+        self.n += valori.size
+        self.minimo, self.massimo = min(self.minimo, valori.min()), max(self.massimo, valori.max())
+        self.livelli[0] = np.concatenate([self.livelli[0], valori])
+        self._compatta()
+        return self
+
+    # --- UNIONE CON UNO SKETCH COSTRUITO SU UN'ALTRA PARTE DEI DATI ---
+    def unisci(self, altro):
+        if altro.n == 0: return self
+        while len(self.livelli) < len(altro.livelli):
+            self.livelli.append(np.empty(0, dtype=np.float64))
+        for h, valori in enumerate(altro.livelli):
+            self.livelli[h] = np.concatenate([self.livelli[h], valori])
+        self.n += altro.n
+        self.minimo, self.massimo = min(self.minimo, altro.minimo), max(self.massimo, altro.massimo)
+        self._compatta()
+        return self
+
+    # --- COMPATTAZIONE DEI LIVELLI PIENI ---
+    def _compatta(self):
+        h = 0
+        while h < len(self.livelli):
+            livello = self.livelli[h]
+            if livello.size > self._capacita(h):
+                if h + 1 == len(self.livelli):
+                    self.livelli.append(np.empty(0, dtype=np.float64))
+                livello = np.sort(livello)
+                # Con un numero dispari di valori, uno resta nel livello per conservare il peso totale.
+                resto = livello.size % 2
+                promossi = livello[resto + self._rng.integers(2)::2]
+                self.livelli[h] = livello[:resto]
+                self.livelli[h + 1] = np.concatenate([self.livelli[h + 1], promossi])
+            h += 1
+
+    # --- VALORI CONSERVATI E RELATIVI PESI, IN ORDINE CRESCENTE ---
+    def _valori_pesati(self):
+        valori = np.concatenate(self.livelli)
+        pesi = np.concatenate([np.full(livello.size, 2 ** h, dtype=np.int64) for h, livello in enumerate(self.livelli)])
+        ordine = np.argsort(valori, kind='stable')
+        return valori[ordine], np.cumsum(pesi[ordine])
+
+    # --- QUANTILE APPROSSIMATO (anche per un array di probabilità) ---
+    def quantile(self, p):
+        if self.n == 0: return np.nan
+        valori, cumulati = self._valori_pesati()
+        p = np.asarray(p, dtype=np.float64)
+        # Il rango cercato viene riportato al peso totale conservato (uguale a n a meno dei valori non ancora compattati).
+        posizioni = np.searchsorted(cumulati, p * (cumulati[-1] - 1), side='right')
+        risultato = valori[np.minimum(posizioni, valori.size - 1)]
+        # Gli estremi sono esatti.
+        risultato = np.where(p <= 0, self.minimo, np.where(p >= 1, self.massimo, risultato))
+        return float(risultato) if risultato.ndim == 0 else risultato
+
+    # --- FRAZIONE APPROSSIMATA DEI VALORI MINORI O UGUALI A x ---
+    def ripartizione(self, x):
+        if self.n == 0: return np.nan
+        valori, cumulati = self._valori_pesati()
+        cumulati = np.concatenate(([0], cumulati))
+        return cumulati[np.searchsorted(valori, x, side='right')] / cumulati[-1]
+
+    # --- MEMORIA E PRECISIONE ---
+    @property
+    def valori_conservati(self):
+        return sum(livello.size for livello in self.livelli)
+
+    def errore_rango_stimato(self):
+        # Errore tipico sul rango normalizzato (circa 1,3% per k=200), dalla formula empirica di Apache DataSketches.
+        return 2.296 / self.k ** 0.9723
+
+
+# --- FUNZIONE CHE CONFRONTA LO SKETCH CON I QUANTILI ESATTI ---
+def confronta_con_esatti(valori, k=K_SKETCH_PREDEFINITO, parti=8, probabilita=(0.01, 0.25, 0.5, 0.75, 0.99), seed=0):
+    # Costruisce uno sketch per ciascuna parte dei dati (come farebbero i blocchi o i processi), li unisce e
+    # misura, per ogni probabilità, la differenza tra il rango del quantile stimato e quello richiesto.
+    valori = np.asarray(valori, dtype=np.float64)
+    valori = valori[~np.isnan(valori)]
+    semi = np.random.SeedSequence(seed).spawn(parti)
+    sketch = SketchQuantili(k, seed=semi[0])
+    for parte, seme in zip(np.array_split(valori, parti), semi):
+        sketch.unisci(SketchQuantili(k, seed=seme).aggiorna(parte))
+    ordinati = np.sort(valori)
+    stimati = sketch.quantile(np.asarray(probabilita))
+    # Un valore ripetuto occupa un intervallo di ranghi: l'errore è la distanza di p da quell'intervallo.
+    rango_basso = np.searchsorted(ordinati, stimati, side='left') / ordinati.size
+    rango_alto = np.searchsorted(ordinati, stimati, side='right') / ordinati.size
+    errori = np.maximum(0, np.maximum(rango_basso - probabilita, np.asarray(probabilita) - rango_alto))
+    return {'k': k, 'n': valori.size, 'valori_conservati': sketch.valori_conservati,
+            'errore_rango_stimato': sketch.errore_rango_stimato(), 'errore_rango_massimo': float(errori.max()),
+            'esatti': np.quantile(ordinati, probabilita), 'stimati': stimati}
+
+
+# --- BENCHMARK: ERRORE RISPETTO AI QUANTILI ESATTI SU stress.csv E SU DATI CONTINUI PIÙ GRANDI ---
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+    import pandas as pd
+
+    percorso = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Dati', 'stress.csv')
+    velocita = pd.read_csv(percorso, usecols=['Velocita_Media_Stimata'])['Velocita_Media_Stimata'].to_numpy(dtype=np.float64)
+    # Dati continui di dimensione maggiore: la velocità ricampionata con un rumore, così quasi tutti i valori sono distinti.
+    rng = np.random.default_rng(0)
+    continui = rng.choice(velocita[~np.isnan(velocita)], size=10_000_000) + rng.normal(0, 2, size=10_000_000)
+
+    for nome, valori in ((os.path.basename(percorso), velocita), ('velocità continue (10M)', continui)):
+        print(f"\n{nome}: {np.count_nonzero(~np.isnan(valori))} valori")
+        print(f"{'k':>5} {'conservati':>11} {'err. stimato':>13} {'err. misurato':>14} {'secondi':>8}   Q1 / mediana / Q3 (esatti -> stimati)")
+        for k in (50, 100, 200, 400, 800):
+            inizio = time.perf_counter()
+            risultato = confronta_con_esatti(valori, k=k)
+            secondi = time.perf_counter() - inizio
+            esatti, stimati = risultato['esatti'][1:4], risultato['stimati'][1:4]
+            print(f"{k:>5} {risultato['valori_conservati']:>11} {risultato['errore_rango_stimato']:>13.2%} "
+                  f"{risultato['errore_rango_massimo']:>14.2%} {secondi:>8.2f}   "
+                  + " / ".join(f"{e:.2f} -> {s:.2f}" for e, s in zip(esatti, stimati)))
@@ -0,0 +1,308 @@
+# ==================================================================================
+# FUNZIONI STATISTICHE DI BASE (momenti combinabili e indici da tabelle di frequenza)
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import numpy as np  # Libreria per il calcolo numerico vettoriale.
+
+# Numero di valori elaborati insieme dal kernel dei momenti: un blocco (512 KB) resta nella cache del processore,
+# così i valori vengono letti dalla memoria una sola volta e gli scarti temporanei non occupano altra RAM.
+VALORI_PER_BLOCCO = 1 << 16
+# Valori anomali più bassi e più alti sempre mostrati quando quelli di un box plot vengono campionati.
+ANOMALI_ESTREMI = 10
+
+
+# --- CLASSE CHE ACCUMULA I MOMENTI DI UNA VARIABILE NUMERICA ---
+class AccumulatoreMomenti:
+    # Conserva numerosità, media, somme dei quadrati/cubi/quarte potenze degli scarti (M2, M3, M4),
+    # minimo, massimo e somma. Due accumulatori calcolati su parti diverse dei dati si possono unire
+    # (formule di Chan) ottenendo gli stessi valori che si avrebbero sui dati completi.
+    def __init__(self):
+        self.n = 0
+        self.somma = 0.0
+        self.media = 0.0
+        self.M2 = 0.0
+        self.M3 = 0.0
+        self.M4 = 0.0
+        self.minimo = np.inf
+        self.massimo = -np.inf
+
+    # --- COSTRUZIONE DA UN ARRAY DI VALORI ---
+    @classmethod
+    def da_array(cls, valori):
+        # Kernel a passaggio singolo: l'array viene percorso una volta a blocchi di VALORI_PER_BLOCCO valori;
+        # ogni blocco calcola i propri momenti mentre è in cache e viene unito ai precedenti con le formule di Chan.
+        valori = np.ascontiguousarray(valori, dtype=np.float64)
+        if np.isnan(valori).any():
+            valori = valori[~np.isnan(valori)]
+        acc = cls()
+        for inizio in range(0, valori.size, VALORI_PER_BLOCCO):
+            acc.unisci(cls._da_blocco(valori[inizio:inizio + VALORI_PER_BLOCCO]))
+        return acc
+
+    @classmethod
+    def _da_blocco(cls, valori):
+        acc = cls()
+        acc.n = valori.size
+        acc.somma = float(valori.sum())
+        acc.media = acc.somma / acc.n
+        scarti = valori - acc.media
+        scarti2 = scarti * scarti
+        acc.M2 = float(scarti2.sum())
+        acc.M3 = float((scarti2 * scarti).sum())
+        acc.M4 = float((scarti2 * scarti2).sum())
+        acc.minimo, acc.massimo = float(valori.min()), float(valori.max())
+        return acc
+
+    # --- UNIONE DI DUE ACCUMULATORI ---
+    def unisci(self, altro):
+        if altro.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(altro.__dict__)
+            return self
+        na, nb = self.n, altro.n
+        n = na + nb
+        delta = altro.media - self.media
+        delta2 = delta * delta
+        M2 = self.M2 + altro.M2 + delta2 * na * nb / n
+        M3 = (self.M3 + altro.M3 + delta * delta2 * na * nb * (na - nb) / (n * n)
+              + 3.0 * delta * (na * altro.M2 - nb * self.M2) / n)
+        M4 = (self.M4 + altro.M4 + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / (n ** 3)
+              + 6.0 * delta2 * (na * na * altro.M2 + nb * nb * self.M2) / (n * n)
+              + 4.0 * delta * (na * altro.M3 - nb * self.M3) / n)
+        self.n, self.media, self.M2, self.M3, self.M4 = n, self.media + delta * nb / n, M2, M3, M4
+        self.somma += altro.somma
+        self.minimo, self.massimo = min(self.minimo, altro.minimo), max(self.massimo, altro.massimo)
+        return self
+
+    # --- INDICI DERIVATI (stesse convenzioni di pandas) ---
+    def varianza(self, ddof=1):
+        return self.M2 / (self.n - ddof) if self.n > ddof else np.nan
+
+    def dev_std(self, ddof=1):
+        return np.sqrt(self.varianza(ddof))
+
+    def asimmetria(self):
+        # Coefficiente di asimmetria corretto (Fisher-Pearson), come Series.skew().
+        if self.n < 3: return np.nan
+        if self.M2 == 0: return 0.0
+        n = self.n
+        return (n * (n - 1) ** 0.5 / (n - 2)) * (self.M3 / self.M2 ** 1.5)
+
+    def curtosi(self):
+        # Curtosi in eccesso corretta, come Series.kurtosis().
+        if self.n < 4: return np.nan
+        if self.M2 == 0: return 0.0
+        n = self.n
+        correzione = 3.0 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        return n * (n + 1) * (n - 1) * self.M4 / ((n - 2) * (n - 3) * self.M2 ** 2) - correzione
+
+    def coeff_variazione(self):
+        # Deviazione standard divisa per la media (0 se la media è nulla, come nella scheda "Calcolo Dati").
+        if self.n == 0: return np.nan
+        return self.dev_std(ddof=1) / self.media if self.media != 0 else 0.0
+
+    # --- TUTTI GLI INDICI IN UN DIZIONARIO ---
+    def indici(self):
+        # Gli stessi valori si ottengono dai dati interi, da blocchi letti in sequenza o da parti lette da
+        # processi diversi e poi unite con unisci(): dipendono solo dai momenti accumulati.
+        if self.n == 0:
+            return {'n': 0, 'somma': 0.0, 'media': np.nan, 'M2': 0.0, 'M3': 0.0, 'M4': 0.0, 'minimo': np.nan, 'massimo': np.nan,
+                    'varianza': np.nan, 'dev_std': np.nan, 'coeff_variazione': np.nan, 'asimmetria': np.nan, 'curtosi': np.nan}
+        return {'n': self.n, 'somma': self.somma, 'media': self.media, 'M2': self.M2, 'M3': self.M3, 'M4': self.M4,
+                'minimo': self.minimo, 'massimo': self.massimo, 'varianza': self.varianza(ddof=1), 'dev_std': self.dev_std(ddof=1),
+                'coeff_variazione': self.coeff_variazione(), 'asimmetria': self.asimmetria(), 'curtosi': self.curtosi()}
+
+
+# --- KERNEL DEGLI INDICI DESCRITTIVI BASATI SUI MOMENTI ---
+def scarto_medio_assoluto(valori, media):
+    # Media degli scarti assoluti dalla media, calcolata a blocchi senza creare l'array completo degli scarti.
+    valori = np.ascontiguousarray(valori, dtype=np.float64)
+    if valori.size == 0: return np.nan
+    totale = 0.0
+    for inizio in range(0, valori.size, VALORI_PER_BLOCCO):
+        totale += float(np.abs(valori[inizio:inizio + VALORI_PER_BLOCCO] - media).sum())
+    return totale / valori.size
+
+
+# --- CLASSE CHE RICAVA TUTTE LE STATISTICHE D'ORDINE DA UN SOLO ORDINAMENTO ---
+class StatisticheOrdine:
+    # I valori vengono ordinati una volta sola; mediana, quantili, IQR, recinti di Tukey, valori anomali,
+    # moda e funzione di ripartizione empirica (ECDF) si leggono poi dall'array ordinato senza riordinare.
+    def __init__(self, valori, coefficiente_tukey=1.5):
+        valori = np.asarray(valori)
+        if valori.dtype.kind == 'f':
+            valori = valori[~np.isnan(valori)]
+        self.valori = valori  # Valori nell'ordine originale, per restituire le posizioni dei valori anomali.
+        self.ordinati = np.sort(valori)  # Stesso tipo dei dati: la moda di una colonna intera resta intera.
+        self.n = self.ordinati.size
+        self.coefficiente_tukey = coefficiente_tukey
+
+    # --- QUANTILI (interpolazione lineare, come Series.quantile) ---
+    def quantile(self, p):
+        if self.n == 0: return np.nan
+        posizione = (self.n - 1) * np.asarray(p, dtype=np.float64)
+        inferiore = np.floor(posizione).astype(np.int64)
+        superiore = np.minimum(inferiore + 1, self.n - 1)
+        v_inf, v_sup = self.ordinati[inferiore].astype(np.float64), self.ordinati[superiore].astype(np.float64)
+        risultato = v_inf + (v_sup - v_inf) * (posizione - inferiore)
+        return float(risultato) if risultato.ndim == 0 else risultato
+
+    @property
+    def mediana(self):
+        return self.quantile(0.5)
+
+    @property
+    def q1(self):
+        return self.quantile(0.25)
+
+    @property
+    def q3(self):
+        return self.quantile(0.75)
+
+    @property
+    def iqr(self):
+        return self.q3 - self.q1
+
+    # --- RECINTI DI TUKEY E VALORI ANOMALI ---
+    def recinti(self):
+        # Limiti oltre i quali un valore è considerato anomalo: Q1 - k·IQR e Q3 + k·IQR.
+        q1, q3 = self.q1, self.q3
+        return q1 - self.coefficiente_tukey * (q3 - q1), q3 + self.coefficiente_tukey * (q3 - q1)
+
+    def _limiti_interni(self):
+        # Posizioni nell'array ordinato del primo e dell'ultimo (escluso) valore interno ai recinti.
+        basso, alto = self.recinti()
+        return np.searchsorted(self.ordinati, basso, side='left'), np.searchsorted(self.ordinati, alto, side='right')
+
+    def baffi(self):
+        # Estremi dei baffi: valori più piccolo e più grande ancora interni ai recinti.
+        inizio, fine = self._limiti_interni()
+        return self.ordinati[inizio], self.ordinati[fine - 1]
+
+    def valori_anomali(self):
+        inizio, fine = self._limiti_interni()
+        return np.concatenate([self.ordinati[:inizio], self.ordinati[fine:]])
+
+    def indici_anomali(self):
+        # Posizioni (nell'ordine originale dei valori) dei valori fuori dai recinti.
+        basso, alto = self.recinti()
+        return np.flatnonzero((self.valori < basso) | (self.valori > alto))
+
+    # --- MODA (lunghezza delle sequenze di valori uguali nell'array ordinato) ---
+    def moda(self):
+        # A parità di frequenza restituisce il valore più piccolo, come Series.mode().iloc[0].
+        if self.n == 0: return 'N/A'
+        inizi = np.flatnonzero(np.r_[True, self.ordinati[1:] != self.ordinati[:-1]])
+        lunghezze = np.diff(np.r_[inizi, self.n])
+        return self.ordinati[inizi[np.argmax(lunghezze)]]
+
+    # --- FUNZIONE DI RIPARTIZIONE EMPIRICA ---
+    def ecdf(self, x):
+        # Frazione dei valori minori o uguali a 'x' (anche per un array di punti).
+        return np.searchsorted(self.ordinati, x, side='right') / self.n
+
+    def quota_intervallo(self, basso, alto):
+        # Frazione dei valori nell'intervallo chiuso [basso, alto] (anche per array di estremi): due ricerche binarie.
+        if self.n == 0: return np.nan
+        dentro = np.searchsorted(self.ordinati, alto, side='right') - np.searchsorted(self.ordinati, basso, side='left')
+        return dentro / self.n
+
+    # --- RIEPILOGO PER Axes.bxp ---
+    def riepilogo_box(self, etichetta='', massimo_anomali=None):
+        # Dizionario con quartili, baffi e valori anomali già calcolati: il box plot non riordina i dati.
+        # Con 'massimo_anomali' i valori anomali disegnati vengono limitati; 'n_anomali' conserva il loro numero reale.
+        basso, alto = self.baffi()
+        anomali = self.valori_anomali()
+        return {'med': self.mediana, 'q1': self.q1, 'q3': self.q3, 'whislo': basso, 'whishi': alto,
+                'fliers': riduci_anomali(anomali, massimo_anomali), 'label': etichetta, 'n_anomali': anomali.size}
+
+
+# --- FUNZIONE CHE LIMITA I VALORI ANOMALI DA DISEGNARE ---
+def riduci_anomali(anomali, massimo, seed=0):
+    # 'anomali' in ordine crescente. Se sono più di 'massimo', tiene gli ANOMALI_ESTREMI più bassi e più alti
+    # e un campione casuale (con seme fisso, così il grafico non cambia a ogni disegno) di quelli intermedi.
+    anomali = np.asarray(anomali)
+    if massimo is None or anomali.size <= massimo: return anomali
+    estremi = min(ANOMALI_ESTREMI, massimo // 4)
+    intermedi = anomali[estremi:anomali.size - estremi]
+    scelti = np.sort(np.random.default_rng(seed).choice(intermedi.size, size=massimo - 2 * estremi, replace=False))
+    return np.concatenate([anomali[:estremi], intermedi[scelti], anomali[anomali.size - estremi:]])
+
+
+# --- FUNZIONE PER CALCOLARE UN QUANTILE DA UNA TABELLA DI FREQUENZA ---
+def quantile_da_frequenze(valori, conteggi, p):
+    # 'valori' ordinati in modo crescente, 'conteggi' il numero di osservazioni di ciascun valore.
+    # Il risultato coincide con Series.quantile(p) (interpolazione lineare) sui dati espansi.
+    valori = np.asarray(valori, dtype=np.float64)
+    cumulati = np.cumsum(conteggi)
+    n = cumulati[-1]
+    posizione = (n - 1) * p
+    inferiore, frazione = int(np.floor(posizione)), posizione - np.floor(posizione)
+    # searchsorted trova il valore che occupa la posizione 'inferiore' (e quella successiva) nei dati ordinati.
+    v_inf = valori[np.searchsorted(cumulati, inferiore, side='right')]
+    v_sup = valori[np.searchsorted(cumulati, min(inferiore + 1, n - 1), side='right')]
+    return v_inf + (v_sup - v_inf) * frazione
+
+
+# --- FUNZIONE PER CALCOLARE LA QUOTA DI DATI IN UN INTERVALLO DA UNA TABELLA DI FREQUENZA ---
+def quota_intervallo_da_frequenze(valori, conteggi, basso, alto):
+    # Come StatisticheOrdine.quota_intervallo, ma sui valori distinti ordinati pesati per i loro conteggi.
+    valori = np.asarray(valori, dtype=np.float64)
+    cumulati = np.concatenate(([0], np.cumsum(conteggi)))
+    dentro = cumulati[np.searchsorted(valori, alto, side='right')] - cumulati[np.searchsorted(valori, basso, side='left')]
+    return dentro / cumulati[-1]
+
+
+# --- VERIFICA: GLI INDICI COINCIDONO CON QUELLI CALCOLATI DA PANDAS ---
+def verifica_contro_pandas(tolleranza=1e-9):
+    # Confronta gli indici di _indici_numerici (AccumulatoreMomenti.indici() più scarto_medio_assoluto, sull'array
+    # intero e unendo due parti con unisci()) e i quartili di StatisticheOrdine con i metodi di pd.Series.
+    # Restituisce {caso: [differenze]}; un elenco vuoto per ogni caso significa che tutti gli indici coincidono.
+    # 'tolleranza' è la differenza relativa massima ammessa. Con dati molto mal condizionati (es. media 1e9 e
+    # deviazione standard 1e-3) asimmetria e curtosi dipendono dagli arrotondamenti di entrambi i calcoli.
+    import pandas as pd  # Solo per la verifica: il modulo non dipende da pandas.
+    rng = np.random.default_rng(0)
+    grandi = rng.lognormal(3, 1, size=1_000_000)  # Più blocchi del kernel, dati asimmetrici.
+    grandi[rng.random(grandi.size) < 0.05] = np.nan
+    casi = {'vuoto': [], 'solo NaN': [np.nan, np.nan], 'n = 1': [4.0], 'n = 2': [1.0, 3.0], 'n = 3 con NaN': [1.0, np.nan, 2.0, 7.0],
+            'n = 4': [2.0, 2.0, 5.0, 11.0], 'costante': [3.0] * 10, 'interi con NaN': [0, 1, 1, 2, np.nan, 5, 3, 1, 0, 8],
+            'velocità (1M, 5% NaN)': grandi, 'media grande, varianza piccola': 1e6 + rng.normal(0, 1, size=100_000)}
+
+    def uguali(a, b):
+        if np.isnan(a) or np.isnan(b): return np.isnan(a) and np.isnan(b)
+        return abs(a - b) <= tolleranza * max(1.0, abs(b))
+
+    esito = {}
+    for nome, valori in casi.items():
+        serie = pd.Series(valori, dtype=np.float64)
+        valori = serie.to_numpy()
+        momenti = AccumulatoreMomenti.da_array(valori)
+        unione = AccumulatoreMomenti.da_array(valori[:len(valori) // 3]).unisci(AccumulatoreMomenti.da_array(valori[len(valori) // 3:]))
+        validi = valori[~np.isnan(valori)]
+        ordine = StatisticheOrdine(valori)
+        for accumulatore, origine in ((momenti, 'intero'), (unione, 'unione')):
+            indici = accumulatore.indici()
+            calcolati = {'media': indici['media'], 'varianza': indici['varianza'], 'dev_std': indici['dev_std'],
+                         'asimmetria': indici['asimmetria'], 'curtosi': indici['curtosi'],
+                         'mad': scarto_medio_assoluto(validi, accumulatore.media) if accumulatore.n else np.nan,
+                         'minimo': indici['minimo'], 'massimo': indici['massimo']}
+            attesi = {'media': serie.mean(), 'varianza': serie.var(), 'dev_std': serie.std(), 'asimmetria': serie.skew(),
+                      'curtosi': serie.kurt(), 'mad': (serie - serie.mean()).abs().mean(), 'minimo': serie.min(), 'massimo': serie.max()}
+            if origine == 'intero':
+                calcolati.update({f'quantile {p}': ordine.quantile(p) for p in (0.25, 0.5, 0.75)})
+                attesi.update({f'quantile {p}': serie.quantile(p) for p in (0.25, 0.5, 0.75)})
+            esito[f"{nome} ({origine})"] = [f"{indice}: {calcolati[indice]!r} invece di {attesi[indice]!r}"
+                                            for indice in attesi if not uguali(calcolati[indice], attesi[indice])]
+    return esito
+
+
+if __name__ == "__main__":
+    import sys
+    esito = verifica_contro_pandas()
+    for caso, diversi in esito.items():
+        print(f"{caso}: " + ("ok" if not diversi else "; ".join(diversi)))
+    errori = sum(len(diversi) for diversi in esito.values())
+    print(f"\n{'Tutti gli indici coincidono con pandas.' if not errori else f'{errori} indici diversi da pandas.'}")
+    sys.exit(1 if errori else 0)
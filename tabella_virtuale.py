@@ -0,0 +1,246 @@
+# ==================================================================================
+# TABELLA VIRTUALE: MOSTRA UN DATAFRAME DI QUALSIASI DIMENSIONE IN UN ttk.Treeview
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+from tkinter import ttk  # Widget Treeview e Scrollbar di tkinter.
+import numpy as np  # Libreria per selezionare e formattare solo le righe visibili.
+import pandas as pd  # Libreria per riconoscere il tipo di ciascuna colonna.
+
+# Righe spostate da uno scatto della rotella del mouse.
+RIGHE_PER_SCATTO = 3
+# Altezza di riga usata se lo stile del Treeview non la specifica.
+ALTEZZA_RIGA_PREDEFINITA = 25
+
+
+# --- FUNZIONE CHE PREPARA LA FORMATTAZIONE DI UNA COLONNA ---
+def crea_formattatore(serie):
+    # Restituisce una funzione che, dato un array di posizioni, produce le stringhe delle sole righe richieste.
+    # I valori restano negli array colonnari del DataFrame: nessuna colonna viene convertita in testo per intero.
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Codici interi più un'etichetta vuota in coda, usata dal codice -1 (valore mancante).
+        codici = serie.cat.codes.to_numpy()
+        etichette = np.append(serie.cat.categories.astype(str).to_numpy(dtype=object), '')
+        return lambda posizioni: etichette[codici[posizioni]]
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        valori = serie.to_numpy(dtype='datetime64[s]')
+        return lambda posizioni: np.char.replace(np.datetime_as_string(valori[posizioni], unit='s'), 'T', ' ')
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        # I tipi interi con valori mancanti (Int8, Int16...) vengono letti come array NumPy più una maschera.
+        mancanti = serie.isna().to_numpy()
+        valori = serie.to_numpy(dtype=getattr(serie.dtype, 'numpy_dtype', serie.dtype), na_value=0) if mancanti.any() else serie.to_numpy()
+        return lambda posizioni: np.where(mancanti[posizioni], '', valori[posizioni].astype(str))
+    valori = serie.to_numpy(dtype=object)
+    return lambda posizioni: valori[posizioni].astype(str)
+
+
+# --- FUNZIONE CHE FORMATTA UN INTERO DataFrame IN RIGHE DI TESTO ---
+def formatta_righe(df, cifre_decimali=4):
+    # Ogni colonna viene convertita in un array di stringhe con un'unica operazione vettoriale
+    # (i numeri decimali con 'cifre_decimali' cifre), poi le colonne vengono affiancate in tuple di riga.
+    colonne = []
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_float_dtype(serie.dtype):
+            colonne.append(np.char.mod(f'%.{cifre_decimali}f', serie.to_numpy(dtype=np.float64, na_value=np.nan)))
+        else:
+            colonne.append(serie.astype(str).to_numpy(dtype=object))
+    return list(zip(*colonne))
+
+
+# --- FUNZIONE CHE CALCOLA IL RANGO DEI VALORI DI UNA COLONNA ---
+def calcola_ranghi(serie):
+    # Sostituisce ogni valore con la sua posizione tra i valori distinti ordinati (valori uguali, rango uguale).
+    # I ranghi sono interi anche per testi e date, quindi più colonne si ordinano insieme con np.lexsort.
+    # I valori mancanti ricevono tutti il rango più alto (il numero di valori distinti presenti).
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Le categorie vengono ordinate alfabeticamente, qualunque sia l'ordine in cui sono state definite.
+        categorie = serie.cat.categories
+        rango_categoria = np.empty(len(categorie) + 1, dtype=np.int64)
+        rango_categoria[np.argsort(categorie.astype(str).to_numpy(dtype=object), kind='stable')] = np.arange(len(categorie))
+        rango_categoria[-1] = len(categorie)  # Il codice -1 (mancante) legge l'ultima voce.
+        return rango_categoria[serie.cat.codes.to_numpy()]
+    mancanti = serie.isna().to_numpy()
+    presenti = serie[~mancanti] if mancanti.any() else serie
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        valori = presenti.to_numpy().view(np.int64)
+    elif pd.api.types.is_numeric_dtype(serie.dtype):
+        valori = presenti.to_numpy(dtype=np.float64)
+    else:
+        valori = presenti.astype(str).to_numpy(dtype=object)
+    distinti, rango_presenti = np.unique(valori, return_inverse=True)
+    rango = np.full(len(serie), len(distinti), dtype=np.int64)
+    rango[~mancanti] = rango_presenti.reshape(-1)
+    return rango
+
+
+# --- CLASSE CHE MOSTRA SOLO LA FINESTRA DI RIGHE VISIBILI ---
+class TabellaVirtuale:
+    # Il Treeview contiene sempre e solo tante voci quante sono le righe visibili: scorrendo, le stesse voci
+    # vengono riempite con le righe successive, formattate al momento dagli array colonnari.
+    # La barra di scorrimento verticale è gestita qui e rappresenta la posizione nell'intero DataFrame.
+    def __init__(self, master, colonne, larghezze=None):
+        self.colonne = list(colonne)
+        self.tabella = ttk.Treeview(master, columns=self.colonne, show='headings', selectmode='browse')
+        for col in self.colonne:
+            self.tabella.column(col, width=(larghezze or {}).get(col, 120), anchor='center')
+            # Clic sull'intestazione: ordina per quella colonna; Maiusc+clic: la aggiunge all'ordinamento corrente.
+            self.tabella.heading(col, text=col, command=lambda c=col: self.clic_intestazione(c))
+        self.barra_verticale = ttk.Scrollbar(master, orient="vertical", command=self._comando_barra)
+        self.barra_orizzontale = ttk.Scrollbar(master, orient="horizontal", command=self.tabella.xview)
+        self.tabella.configure(xscrollcommand=self.barra_orizzontale.set)
+        self.tabella.grid(row=0, column=0, sticky='nsew'); self.barra_verticale.grid(row=0, column=1, sticky='ns'); self.barra_orizzontale.grid(row=1, column=0, sticky='ew')
+
+        self.formattatori = {}  # Funzione di formattazione per ciascuna colonna mostrata.
+        self.ordine = None  # Permutazione delle righe (array di posizioni) o None per l'ordine originale.
+        self.num_righe = 0  # Righe totali del DataFrame.
+        self.prima_riga = 0  # Posizione (nell'ordine corrente) della prima riga visibile.
+        self.voci = []  # Identificativi delle voci del Treeview, una per riga visibile.
+        self.df = None  # Riferimento al DataFrame mostrato (mai copiato).
+        self.chiavi_ordinamento = []  # Colonne dell'ordinamento corrente: lista di (colonna, crescente).
+        self._ranghi = {}  # Cache dei ranghi per colonna.
+        self._permutazioni = {}  # Cache delle permutazioni stabili per (colonna, crescente).
+        self._ridisegno_in_attesa = False
+
+        # Ridimensionamento, rotella del mouse (Windows/macOS e Linux) e tasti di navigazione.
+        self.tabella.bind('<Configure>', self._ridimensiona)
+        self.tabella.bind('<MouseWheel>', lambda e: self.scorri(-RIGHE_PER_SCATTO if e.delta > 0 else RIGHE_PER_SCATTO))
+        self.tabella.bind('<Button-4>', lambda e: self.scorri(-RIGHE_PER_SCATTO))
+        self.tabella.bind('<Button-5>', lambda e: self.scorri(RIGHE_PER_SCATTO))
+        self.tabella.bind('<Prior>', lambda e: self.scorri(-len(self.voci)))
+        self.tabella.bind('<Next>', lambda e: self.scorri(len(self.voci)))
+        self.tabella.bind('<Home>', lambda e: self.vai_a(0))
+        self.tabella.bind('<End>', lambda e: self.vai_a(self.num_righe))
+        self.tabella.bind('<Shift-ButtonPress-1>', self._maiusc_clic)
+
+    # --- IMPOSTAZIONE DEI DATI ---
+    def imposta_dati(self, df, chiavi_ordinamento=()):
+        # Prepara i formattatori delle colonne presenti, svuota le cache degli ordinamenti e torna all'inizio.
+        self.df = df
+        self._ranghi, self._permutazioni = {}, {}
+        if df is None:
+            self.formattatori, self.num_righe = {}, 0
+        else:
+            self.formattatori = {col: crea_formattatore(df[col]) for col in self.colonne if col in df.columns}
+            self.num_righe = len(df)
+        self.ordina(chiavi_ordinamento)
+
+    def imposta_ordine(self, ordine):
+        self.ordine = ordine
+        self.prima_riga = 0
+        self._richiedi_ridisegno()
+
+    # --- ORDINAMENTO ---
+    def ordina(self, chiavi):
+        # 'chiavi' è una lista di (colonna, crescente): la prima colonna è la chiave principale.
+        # Si calcola solo una permutazione delle posizioni: il DataFrame non viene mai riordinato né copiato.
+        self.chiavi_ordinamento = [(col, crescente) for col, crescente in chiavi if self.df is not None and col in self.df.columns]
+        if not self.chiavi_ordinamento:
+            ordine = None
+        elif len(self.chiavi_ordinamento) == 1:
+            ordine = self._permutazione(*self.chiavi_ordinamento[0])
+        else:
+            # np.lexsort usa l'ultima chiave come principale ed è stabile.
+            ordine = np.lexsort([self._chiave(col, crescente) for col, crescente in reversed(self.chiavi_ordinamento)])
+        self._aggiorna_intestazioni()
+        self.imposta_ordine(ordine)
+
+    def clic_intestazione(self, col, aggiungi=False):
+        chiavi = list(self.chiavi_ordinamento)
+        posizione = next((i for i, (c, _) in enumerate(chiavi) if c == col), None)
+        if aggiungi:
+            # Maiusc+clic: inverte il verso della colonna se è già tra le chiavi, altrimenti la aggiunge in coda.
+            if posizione is None: chiavi.append((col, True))
+            else: chiavi[posizione] = (col, not chiavi[posizione][1])
+        elif posizione == 0 and len(chiavi) == 1:
+            chiavi = [(col, not chiavi[0][1])]
+        else:
+            chiavi = [(col, True)]
+        self.ordina(chiavi)
+
+    def _maiusc_clic(self, evento):
+        if self.tabella.identify_region(evento.x, evento.y) != 'heading': return None
+        indice = int(self.tabella.identify_column(evento.x).lstrip('#')) - 1
+        if 0 <= indice < len(self.colonne):
+            self.clic_intestazione(self.colonne[indice], aggiungi=True)
+        return "break"
+
+    def _rango(self, col):
+        # Ranghi della colonna e maschera dei valori mancanti.
+        if col not in self._ranghi:
+            self._ranghi[col] = calcola_ranghi(self.df[col]), self.df[col].isna().to_numpy()
+        return self._ranghi[col]
+
+    def _chiave(self, col, crescente):
+        # Chiave di ordinamento della colonna: i valori mancanti restano in fondo in entrambi i versi
+        # (come na_position='last' di pandas). Nel verso decrescente si negano solo i ranghi dei valori presenti
+        # (tutti <= 0), mentre i mancanti ricevono 1.
+        rango, mancanti = self._rango(col)
+        if crescente: return rango
+        return np.where(mancanti, 1, -rango)
+
+    def _permutazione(self, col, crescente):
+        # Permutazione stabile per una sola colonna, calcolata una volta e poi riutilizzata.
+        if (col, crescente) not in self._permutazioni:
+            self._permutazioni[(col, crescente)] = np.argsort(self._chiave(col, crescente), kind='stable')
+        return self._permutazioni[(col, crescente)]
+
+    def _aggiorna_intestazioni(self):
+        # Mostra accanto al nome della colonna il verso dell'ordinamento (e la priorità se le chiavi sono più di una).
+        for col in self.colonne:
+            testo = col
+            for i, (c, crescente) in enumerate(self.chiavi_ordinamento):
+                if c == col:
+                    testo += (" ▲" if crescente else " ▼") + (f"{i + 1}" if len(self.chiavi_ordinamento) > 1 else "")
+            self.tabella.heading(col, text=testo)
+
+    # --- SCORRIMENTO ---
+    def scorri(self, righe):
+        self.vai_a(self.prima_riga + righe)
+        return "break"  # Impedisce al Treeview di scorrere per conto suo.
+
+    def vai_a(self, riga):
+        self.prima_riga = int(max(0, min(riga, self.num_righe - len(self.voci))))
+        self._richiedi_ridisegno()
+        return "break"
+
+    def _comando_barra(self, azione, quantita, unita=None):
+        # Traduce i comandi della Scrollbar ('moveto' con una frazione, 'scroll' con righe o pagine).
+        if azione == 'moveto':
+            self.vai_a(round(float(quantita) * self.num_righe))
+        elif azione == 'scroll':
+            self.scorri(int(quantita) * (len(self.voci) if unita == 'pages' else 1))
+
+    # --- RIDIMENSIONAMENTO E DISEGNO ---
+    def _ridimensiona(self, evento):
+        # Il numero di voci dipende dall'altezza disponibile: una riga per l'intestazione, le altre per i dati.
+        altezza_riga = int(ttk.Style().lookup('Treeview', 'rowheight') or ALTEZZA_RIGA_PREDEFINITA)
+        visibili = max(1, (evento.height - altezza_riga - 4) // altezza_riga)
+        if visibili == len(self.voci): return
+        while len(self.voci) < visibili:
+            self.voci.append(self.tabella.insert("", "end", values=()))
+        while len(self.voci) > visibili:
+            self.tabella.delete(self.voci.pop())
+        self.vai_a(self.prima_riga)
+
+    def _richiedi_ridisegno(self):
+        # Più eventi di scorrimento ravvicinati producono un solo ridisegno.
+        if self._ridisegno_in_attesa: return
+        self._ridisegno_in_attesa = True
+        self.tabella.after_idle(self._disegna)
+
+    def _disegna(self):
+        self._ridisegno_in_attesa = False
+        fine = min(self.prima_riga + len(self.voci), self.num_righe)
+        posizioni = np.arange(self.prima_riga, fine)
+        if self.ordine is not None: posizioni = self.ordine[posizioni]
+        # Formatta colonna per colonna solo le righe della finestra visibile.
+        testi = [self.formattatori[col](posizioni) if col in self.formattatori else np.full(len(posizioni), '') for col in self.colonne]
+        for i, voce in enumerate(self.voci):
+            self.tabella.item(voce, values=[testo[i] for testo in testi] if i < len(posizioni) else ())
+        self.tabella.selection_set(())
+        # Aggiorna la barra con la frazione del DataFrame attualmente visibile.
+        if self.num_righe:
+            self.barra_verticale.set(self.prima_riga / self.num_righe, fine / self.num_righe)
+        else:
+            self.barra_verticale.set(0, 1)
@@ -0,0 +1,51 @@
+# ==================================================================================
+# MOTORE DELLE TABELLE DI FREQUENZA (np.bincount per codici interi, hash negli altri casi)
+# ==================================================================================
+
+# --- IMPORTAZIONE DELLE LIBRERIE NECESSARIE ---
+import numpy as np  # Libreria per contare i codici interi e calcolare le frequenze derivate.
+import pandas as pd  # Libreria per restituire conteggi e tabelle come Series e DataFrame.
+
+# Ampiezza massima (massimo - minimo + 1) per contare una colonna intera con bincount: l'array dei
+# conteggi occupa 8 byte per valore possibile, quindi oltre questa soglia si usa il conteggio tramite hash.
+AMPIEZZA_MASSIMA_BINCOUNT = 1 << 20
+
+
+# --- FUNZIONE CHE CONTA I VALORI DI UNA COLONNA, ORDINATI PER VALORE ---
+def conteggi_valori(serie):
+    # Restituisce una Series con indice i valori (in ordine crescente, o nell'ordine delle categorie)
+    # e valore il numero di occorrenze; i valori mancanti vengono ignorati come in value_counts().
+    # - colonne 'category': un solo bincount sui codici, con tutte le categorie (anche quelle assenti);
+    # - colonne intere con valori vicini (es. feriti, morti, ora): bincount sui valori meno il minimo;
+    # - tutte le altre: value_counts() di pandas (tabella hash) e ordinamento dell'indice.
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codici = serie.cat.codes.to_numpy()
+        conteggi = np.bincount(codici[codici >= 0], minlength=len(serie.cat.categories))
+        indice = pd.CategoricalIndex(serie.cat.categories, dtype=serie.dtype, name=serie.name)
+        return pd.Series(conteggi, index=indice, name='count')
+    if pd.api.types.is_integer_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        # Gli interi NumPy non hanno mancanti e si contano senza copie; quelli nullable di pandas perdono prima i mancanti.
+        valori = serie.to_numpy() if isinstance(serie.dtype, np.dtype) else serie.dropna().to_numpy(dtype=np.int64)
+        if valori.size == 0:
+            return pd.Series(np.empty(0, dtype=np.int64), index=pd.Index(valori, name=serie.name), name='count')
+        minimo, massimo = int(valori.min()), int(valori.max())
+        # Valori piccoli e non negativi si contano direttamente dallo 0, senza copie; negli altri casi i conteggi
+        # partono dal minimo (sottratto in int64, per non uscire dal tipo originale).
+        base = 0 if 0 <= minimo and massimo < AMPIEZZA_MASSIMA_BINCOUNT else minimo
+        if massimo - base < AMPIEZZA_MASSIMA_BINCOUNT:
+            conteggi = np.bincount(valori if base == 0 else valori.astype(np.int64) - base)
+            presenti = np.flatnonzero(conteggi)
+            return pd.Series(conteggi[presenti], index=pd.Index(presenti + base, name=serie.name), name='count')
+    return serie.value_counts().sort_index()
+
+
+# --- FUNZIONE CHE COSTRUISCE LA TABELLA CON FREQUENZE RELATIVE E CUMULATE ---
+def tabella_frequenze(conteggi, totale=None):
+    # 'conteggi' è una Series già ordinata (es. il risultato di conteggi_valori o di un raggruppamento in classi).
+    # Le colonne derivate si calcolano con operazioni vettoriali sull'array dei conteggi.
+    assolute = conteggi.to_numpy(dtype=np.int64)
+    totale = assolute.sum() if totale is None else totale
+    relative = assolute / totale if totale else np.zeros(assolute.size)
+    return pd.DataFrame({'Frequenza Assoluta': assolute, 'Frequenza Relativa': relative,
+                         'Freq. Ass. Cumulata': np.cumsum(assolute), 'Freq. Rel. Cumulata': np.cumsum(relative)},
+                        index=conteggi.index)